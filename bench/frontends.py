@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+#########################################################################
+# parse throughput of the two frontends
+#
+# parses every program of the benchmark corpus (see suite.py) with the
+# PLY frontend and with the hand-written one (logo_rdparse), without the
+# AST cache, and prints the time of each as the fastest of several runs,
+# the throughput in KiB and statements per second and the speedup of the
+# hand-written frontend.
+#
+# the two frontends must build the same AST with the same source spans:
+# the results are compared for every program and the benchmark fails
+# (exit status 1) when they differ.
+#
+#   python bench/frontends.py [--runs N] [--programs NAME,...]
+#
+#########################################################################
+
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logo_parse
+from logo_parse import parse_text, statements
+from suite import corpus
+
+#########################################################################
+def measure(text, frontend, runs):
+    # the fastest time in seconds and the result of parsing a program
+    logo_parse.frontend = frontend
+    try:
+        best = None
+        for i in range(runs):
+            start = time.perf_counter()
+            result = parse_text(text, spans=True)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        logo_parse.frontend = 'ply'
+    return (best, result)
+
+#########################################################################
+if __name__ == "__main__":
+    aparser = ArgumentParser()
+    aparser.add_argument('--runs', type=int, default=5,
+                         help='timed runs per frontend (default: 5)')
+    aparser.add_argument('--programs',
+                         help='programs to parse, separated by commas (default: all)')
+    args = vars(aparser.parse_args())
+
+    if args['runs'] < 1:
+        aparser.error("the number of runs must be at least 1")
+
+    programs = corpus()
+    if args['programs']:
+        names = args['programs'].split(',')
+        unknown = set(names) - set(name for (name, text) in programs)
+        if unknown:
+            aparser.error("unknown programs: {}".format(', '.join(sorted(unknown))))
+        programs = [(name, text) for (name, text) in programs if name in names]
+
+    print("{:16} {:>8} {:>10} {:>10} {:>10} {:>10} {:>12} {:>8}  {}".format(
+          'program', 'KiB', 'ply ms', 'rd ms', 'ply KiB/s', 'rd KiB/s', 'rd stmts/s', 'speedup', 'AST'))
+
+    different = 0
+    for (name, text) in programs:
+        (ply_time, ply_result) = measure(text, 'ply', args['runs'])
+        (rd_time, rd_result) = measure(text, 'rd', args['runs'])
+
+        same = ply_result == rd_result
+        different += not same
+
+        kib = len(text.encode('utf-8'))/1024.0
+        count = sum(1 for stmt in statements(rd_result[0]))
+        print("{:16} {:8.1f} {:10.2f} {:10.2f} {:10.0f} {:10.0f} {:12.0f} {:7.1f}x  {}".format(
+              name, kib, 1000.0*ply_time, 1000.0*rd_time, kib/ply_time, kib/rd_time,
+              count/rd_time, ply_time/rd_time, 'same' if same else 'DIFFERENT'))
+
+    print("{} programs with different ASTs".format(different))
+    sys.exit(1 if different else 0)
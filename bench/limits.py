@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+#########################################################################
+# runaway programs under resource limits
+#
+# runs programs that never finish on their own with the quotas of
+# logo_limits and checks that each one is stopped with LimitExceeded
+# soon after its quota runs out.  every program runs in its own
+# interpreter process, which is killed after GRACE seconds: a program that
+# is not stopped in time fails the check (exit status 1) instead of
+# hanging it.
+#
+#   python bench/limits.py [--programs NAME,...]
+#
+#########################################################################
+
+import os
+import sys
+import time
+import subprocess
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTERP = os.path.join(ROOT, 'logo_interp.py')
+
+# seconds a program may run past its time quota before it is killed
+GRACE = 10.0
+
+# (name, program, command line quotas)
+PROGRAMS = [
+    ('steps', 'repeat 1000000000 [ x = 1 ]\n', ['--max-steps', '100000']),
+    ('segments', 'repeat 1000000000 [ fd 1 rt 1 ]\n', ['--max-segments', '10000']),
+    # the call is not in tail position, which would reuse the frame
+    ('depth', 'to f n\n  f: n + 1\n  fd 1\nend\nf: 0\n', ['--max-depth', '100']),
+    ('time', 'repeat 1000000000 [ x = 1 ]\n', ['--max-time', '1']),
+    # squaring doubles the size of the number, one multiplication of the
+    # last rounds would run for hours
+    ('squaring', 'x = 2 repeat 40 [ x = x * x ]\n', ['--max-time', '1']),
+]
+
+#########################################################################
+def check(program, quotas):
+    # (stopped, seconds) of running a program with quotas
+    quota_time = 0.0
+    if '--max-time' in quotas:
+        quota_time = float(quotas[quotas.index('--max-time') + 1])
+
+    start = time.perf_counter()
+    try:
+        result = subprocess.run([sys.executable, INTERP, '-'] + quotas, input=program,
+                                capture_output=True, text=True, timeout=quota_time + GRACE)
+    except subprocess.TimeoutExpired:
+        return (False, time.perf_counter() - start)
+    return ('LimitExceeded' in result.stderr, time.perf_counter() - start)
+
+#########################################################################
+if __name__ == "__main__":
+    aparser = ArgumentParser()
+    aparser.add_argument('--programs',
+                         help='programs to run, separated by commas (default: all)')
+    args = vars(aparser.parse_args())
+
+    programs = PROGRAMS
+    if args['programs']:
+        names = args['programs'].split(',')
+        unknown = set(names) - set(name for (name, program, quotas) in programs)
+        if unknown:
+            aparser.error("unknown programs: {}".format(', '.join(sorted(unknown))))
+        programs = [p for p in programs if p[0] in names]
+
+    print("{:16} {:28} {:>8}  {}".format('program', 'quotas', 'seconds', 'status'))
+
+    failed = 0
+    for (name, program, quotas) in programs:
+        (stopped, seconds) = check(program, quotas)
+        failed += not stopped
+        print("{:16} {:28} {:8.2f}  {}".format(name, ' '.join(quotas), seconds,
+                                               'stopped' if stopped else 'NOT STOPPED'))
+
+    print("{} programs not stopped".format(failed))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+#########################################################################
+# startup benchmark for the LOGO interpreter
+#
+# measures, in fresh Python processes:
+#
+#   import - python -c 'import logo_interp'
+#   cold   - python logo_interp.py program.logo with an empty cache
+#   warm   - the same run again, the program comes from the AST cache
+#
+# every measurement is the median of several runs.  the benchmark fails
+# (exit status 1) when a median is over its budget, so it can guard
+# against changes that make startup slow again, e.g. importing Tk or
+# building the parser tables at import time.
+#
+#   python bench/startup.py [--runs N] [--import-budget MS]
+#                           [--cold-budget MS] [--warm-budget MS]
+#
+#########################################################################
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import statistics
+import subprocess
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAM = """
+to square size
+  repeat 4 [ fd size rt 90 ]
+end
+to spiral n
+  if n <= 0 [ stop ]
+  square: n
+  rt 10
+  spiral: n - 2
+end
+setcolor 0 127 0
+spiral: 60
+"""
+
+#########################################################################
+def timed(args, env):
+    # wall clock time of a command in milliseconds
+    start = time.perf_counter()
+    subprocess.run(args, cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    return 1000.0*(time.perf_counter() - start)
+
+#########################################################################
+def measure(runs):
+    tmp = tempfile.mkdtemp()
+    try:
+        program = os.path.join(tmp, 'program.logo')
+        f = open(program, 'w')
+        f.write(PROGRAM)
+        f.close()
+
+        env = dict(os.environ)
+        cache = os.path.join(tmp, 'cache')
+        env['LOGO_CACHE_DIR'] = cache
+        run = [sys.executable, 'logo_interp.py', program]
+
+        times = {'import': [], 'cold': [], 'warm': []}
+        for i in range(runs):
+            times['import'].append(timed([sys.executable, '-c', 'import logo_interp'], env))
+            shutil.rmtree(cache, ignore_errors=True)
+            times['cold'].append(timed(run, env))
+            times['warm'].append(timed(run, env))
+
+        return {name: statistics.median(t) for (name, t) in times.items()}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+#########################################################################
+if __name__ == "__main__":
+    aparser = ArgumentParser()
+    aparser.add_argument('--runs', type=int, default=5,
+                         help='runs per measurement (default: 5)')
+    aparser.add_argument('--import-budget', type=float, default=100.0,
+                         help='budget for the import in ms (default: 100)')
+    aparser.add_argument('--cold-budget', type=float, default=300.0,
+                         help='budget for a run with an empty cache in ms (default: 300)')
+    aparser.add_argument('--warm-budget', type=float, default=200.0,
+                         help='budget for a run with a cached program in ms (default: 200)')
+    args = vars(aparser.parse_args())
+
+    medians = measure(args['runs'])
+
+    over = False
+    for name in ('import', 'cold', 'warm'):
+        budget = args[name + '_budget']
+        status = 'ok' if medians[name] <= budget else 'OVER BUDGET'
+        over = over or medians[name] > budget
+        print("{:8} {:8.1f} ms  (budget {:.0f} ms)  {}".format(name, medians[name], budget, status))
+
+    sys.exit(1 if over else 0)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+#########################################################################
+# benchmark suite for the LOGO interpreter
+#
+# runs every program of the corpus through the phases of the interpreter
+# and times each phase separately:
+#
+#   parse       - lexing and parsing with the PLY parser, without the
+#                 AST cache
+#   run:MODE    - executing the parsed AST in an execution mode on the
+#                 headless backend
+#   render      - rasterizing the drawing (needs NumPy, left out without
+#                 it)
+#
+# the corpus is bench/corpus/*.logo (deep recursion, nested loops, many
+# small procedures, arithmetic) and a long straight-line program that is
+# generated here.  every phase is timed as the fastest of several runs,
+# which is the least disturbed by other load on the machine, and run
+# once more under tracemalloc for its peak memory.
+#
+# the results are compared against bench/baseline.json: a phase is a
+# regression when its time is more than --time-threshold percent and
+# MIN_MS over the baseline, or its peak memory more than
+# --memory-threshold percent over the baseline.  the suite fails (exit status 1) when there is a regression.
+# the execution and render phases of an optimization level other than 0
+# have their own baselines.
+# baselines are specific to a machine; --update writes the results of
+# this machine as the new baseline.
+#
+#   python bench/suite.py [--runs N] [--modes walk,compile] [-O LEVEL]
+#                         [--programs NAME,...] [--update]
+#                         [--baseline FILE] [--time-threshold PCT]
+#                         [--memory-threshold PCT]
+#
+#########################################################################
+
+import io
+import os
+import sys
+import json
+import time
+import tracemalloc
+import contextlib
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS = os.path.join(ROOT, 'bench', 'corpus')
+BASELINE = os.path.join(ROOT, 'bench', 'baseline.json')
+
+# time differences below this many ms are never regressions, the times of
+# the short phases vary more than that between runs
+MIN_MS = 1.0
+
+sys.path.insert(0, ROOT)
+
+from logo_state import state
+from logo_backend import HeadlessBackend
+from logo_optimize import optimize, MAX_LEVEL
+from logo_interp import modes, mode_function
+
+#########################################################################
+def straight_line(n):
+    # a long program without loops or procedures
+    lines = ['setcolor 90 90 90']
+    for i in range(n):
+        lines.append('fd {} rt {}'.format(1 + i % 7, 3 + i % 11))
+        if i % 100 == 99:
+            lines.append('x{} = {} * {} + {}'.format(i % 17, i, i % 5, i % 3))
+    return '\n'.join(lines) + '\n'
+
+#########################################################################
+def corpus():
+    # the programs of the suite as (name, text) pairs
+    programs = []
+    for name in sorted(os.listdir(CORPUS)):
+        if name.endswith('.logo'):
+            f = open(os.path.join(CORPUS, name), 'r')
+            programs.append((os.path.splitext(name)[0], f.read()))
+            f.close()
+    programs.append(('straight_line', straight_line(20000)))
+    return programs
+
+#########################################################################
+def parse_phase(text):
+    import logo_lex
+    import logo_interp_gram
+
+    logo_lex.lexer.lineno = 1
+    logo_interp_gram.spans = None
+    logo_interp_gram.parser.parse(text, lexer=logo_lex.lexer)
+    return state.AST
+
+def run_phase(AST, mode):
+    state.initialize(HeadlessBackend())
+    state.AST = AST
+    with contextlib.redirect_stdout(io.StringIO()):
+        mode_function(mode)(AST)
+    return state.backend
+
+def render_phase(backend):
+    from logo_raster import render
+    return render(backend)
+
+#########################################################################
+def measure(phase, args, runs):
+    # the fastest time in ms and the peak memory in KiB of a phase, and
+    # its result
+    times = []
+    for i in range(runs):
+        start = time.perf_counter()
+        result = phase(*args)
+        times.append(1000.0*(time.perf_counter() - start))
+
+    tracemalloc.start()
+    try:
+        phase(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return (min(times), peak/1024.0, result)
+
+#########################################################################
+def run_suite(programs, run_modes, level, runs):
+    # results by program and phase as {'ms': ..., 'kib': ...}
+    try:
+        import numpy
+        rendering = True
+    except ImportError:
+        rendering = False
+
+    # phases after the optimizer have a baseline per level
+    suffix = ' -O{}'.format(level) if level > 0 else ''
+
+    results = {}
+    for (name, text) in programs:
+        phases = results[name] = {}
+
+        (ms, kib, AST) = measure(parse_phase, (text,), runs)
+        phases['parse'] = {'ms': ms, 'kib': kib}
+        AST = optimize(AST, level)
+
+        for mode in run_modes:
+            (ms, kib, backend) = measure(run_phase, (AST, mode), runs)
+            phases['run:' + mode + suffix] = {'ms': ms, 'kib': kib}
+
+        if rendering:
+            (ms, kib, image) = measure(render_phase, (backend,), runs)
+            phases['render' + suffix] = {'ms': ms, 'kib': kib}
+
+    return results
+
+#########################################################################
+def compare(results, baseline, time_threshold, memory_threshold):
+    # print the results next to the baseline, returns the number of
+    # regressions
+    regressions = 0
+    print("{:16} {:18} {:>10} {:>10} {:>10} {:>8} {:>10} {:>8}  {}".format(
+          'program', 'phase', 'ms', 'base ms', 'change', 'KiB', 'base KiB', 'change', 'status'))
+
+    for (name, phases) in results.items():
+        for (phase, result) in phases.items():
+            base = baseline.get(name, {}).get(phase)
+            if base is None:
+                print("{:16} {:18} {:10.2f} {:>10} {:>10} {:8.0f} {:>10} {:>8}  new".format(
+                      name, phase, result['ms'], '-', '-', result['kib'], '-', '-'))
+                continue
+
+            time_change = 100.0*(result['ms'] - base['ms'])/base['ms'] if base['ms'] > 0 else 0.0
+            memory_change = 100.0*(result['kib'] - base['kib'])/base['kib'] if base['kib'] > 0 else 0.0
+
+            status = 'ok'
+            slower = time_change > time_threshold and result['ms'] - base['ms'] > MIN_MS
+            if slower or memory_change > memory_threshold:
+                status = 'REGRESSION'
+                regressions += 1
+
+            print("{:16} {:18} {:10.2f} {:10.2f} {:9.1f}% {:8.0f} {:10.0f} {:7.1f}%  {}".format(
+                  name, phase, result['ms'], base['ms'], time_change,
+                  result['kib'], base['kib'], memory_change, status))
+
+    return regressions
+
+#########################################################################
+if __name__ == "__main__":
+    aparser = ArgumentParser()
+    aparser.add_argument('--runs', type=int, default=5,
+                         help='timed runs per phase (default: 5)')
+    aparser.add_argument('--modes', default='walk,compile',
+                         help='execution modes to run, separated by commas (default: walk,compile)')
+    aparser.add_argument('-O', dest='level', type=int, choices=range(MAX_LEVEL+1), default=0,
+                         help='optimization level (default: 0)')
+    aparser.add_argument('--programs',
+                         help='programs to run, separated by commas (default: all)')
+    aparser.add_argument('--baseline', default=BASELINE,
+                         help='baseline file (default: bench/baseline.json)')
+    aparser.add_argument('--update', action='store_true',
+                         help='write the results as the new baseline')
+    aparser.add_argument('--time-threshold', type=float, default=25.0,
+                         help='allowed time increase over the baseline in percent (default: 25)')
+    aparser.add_argument('--memory-threshold', type=float, default=10.0,
+                         help='allowed memory increase over the baseline in percent (default: 10)')
+    args = vars(aparser.parse_args())
+
+    run_modes = args['modes'].split(',')
+    for mode in run_modes:
+        if mode not in modes:
+            aparser.error("unknown execution mode: {}".format(mode))
+    if args['runs'] < 1:
+        aparser.error("the number of runs must be at least 1")
+
+    programs = corpus()
+    if args['programs']:
+        names = args['programs'].split(',')
+        unknown = set(names) - set(name for (name, text) in programs)
+        if unknown:
+            aparser.error("unknown programs: {}".format(', '.join(sorted(unknown))))
+        programs = [(name, text) for (name, text) in programs if name in names]
+
+    results = run_suite(programs, run_modes, args['level'], args['runs'])
+
+    baseline = {}
+    if os.path.exists(args['baseline']):
+        f = open(args['baseline'], 'r')
+        baseline = json.load(f)
+        f.close()
+
+    regressions = compare(results, baseline, args['time_threshold'], args['memory_threshold'])
+
+    if args['update']:
+        # keep the baselines of the programs and phases that did not run
+        for (name, phases) in results.items():
+            baseline.setdefault(name, {}).update(phases)
+        f = open(args['baseline'], 'w')
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+        f.close()
+        print("baseline written to {}".format(args['baseline']))
+        sys.exit(0)
+
+    print("{} regressions".format(regressions))
+    sys.exit(1 if regressions else 0)
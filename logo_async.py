@@ -0,0 +1,94 @@
+# Cooperative execution of LOGO programs for asyncio applications
+#
+# run executes a program on the tree walker in slices of a bounded number
+# of statements and gives control back to the event loop between slices,
+# so a long loop or a deep recursion does not block the other tasks.  a
+# statement counts as one step however large its expressions are; loops,
+# conditionals and procedure calls count once per statement executed in
+# their bodies.
+#
+# a program stops cleanly between two slices when
+#
+#   - the deadline passes: deadline is a time of the event loop clock,
+#     e.g. loop.time() + 2.0
+#   - the cancel event is set
+#
+# and run returns the partial drawing with the reason it stopped.  when
+# the task running the program is cancelled the program stops the same
+# way and CancelledError is raised as usual; the partial drawing stays in
+# the backend passed to run.
+#
+# programs running at the same time on one event loop do not share their
+# symbol tables or backends: each has its own state (see Interpreter in
+# logo_interp) that is made current for each slice.
+
+import asyncio
+from logo_state import State, state
+from logo_parse import parse
+from logo_optimize import optimize
+from logo_interp_walk import steps
+
+# statements per slice
+SLICE = 1000
+
+#########################################################################
+class Result:
+    # the outcome of a program run: the backend with the drawing and
+    # 'done', 'deadline' or 'cancelled'
+    def __init__(self, backend, status):
+        self.backend = backend
+        self.status = status
+
+    def __repr__(self):
+        return "Result({}, {} segments)".format(self.status, len(self.backend))
+
+#########################################################################
+async def run(program, backend=None, level=0, slice=SLICE, deadline=None, cancel=None):
+    if slice < 1:
+        raise ValueError("slice must be at least 1")
+
+    loop = asyncio.get_running_loop()
+    own = State()
+    own.initialize(backend)
+
+    previous = []
+
+    def current():
+        # make the state of this program the current one until done
+        previous.append(state.copy())
+        state.load(own)
+
+    def done():
+        own.load(state)
+        state.load(previous.pop())
+
+    current()
+    try:
+        own.AST = optimize(parse(program), level)
+        program_steps = steps(own.AST, slice)
+    finally:
+        done()
+
+    status = 'done'
+    try:
+        while True:
+            if deadline is not None and loop.time() >= deadline:
+                status = 'deadline'
+                break
+            if cancel is not None and cancel.is_set():
+                status = 'cancelled'
+                break
+
+            current()
+            try:
+                next(program_steps)
+            except StopIteration:
+                break
+            finally:
+                done()
+
+            await asyncio.sleep(0)
+    finally:
+        program_steps.close()
+
+    return Result(own.backend, status)
@@ -0,0 +1,253 @@
+#########################################################################
+# drawing backends for LOGO
+#
+# the tree walker never talks to the turtle module directly, it sends
+# its drawing commands to the backend held in the state object.
+#
+# HeadlessBackend keeps track of the turtle itself and records every
+# drawn line in a compact segment buffer: four doubles per segment in
+# 'coords' and an index into 'palette' in 'colors'.  It never touches Tk.
+#
+# NumpyBackend (logo_geometry.py) draws the same picture as
+# HeadlessBackend but resolves the turtle motion in batches with NumPy.
+#
+# TkBackend forwards the commands to the turtle module and opens the
+# Tk screen the first time it is used.
+#
+# both backends use LOGO mode conventions: the turtle starts at (0,0)
+# facing north and angles are measured clockwise.
+#
+#########################################################################
+
+import math
+from array import array
+from logo_motion import trace, to_local, to_world
+
+BLACK = (0, 0, 0)
+
+#########################################################################
+def circle_steps(radius):
+    # the number of polygon edges turtle.circle uses for a full circle
+    return 1 + int(min(11 + abs(radius)/6.0, 59.0))
+
+#########################################################################
+class HeadlessBackend:
+
+    def __init__(self):
+        self.clearscreen()
+
+    def clearscreen(self):
+        # turtle pose and pen
+        self.x = 0.0
+        self.y = 0.0
+        self.heading = 0.0
+        self.pen = True
+        self.color = 0
+
+        # segment buffer: x0, y0, x1, y1 for each segment
+        self.coords = array('d')
+        self.colors = array('I')
+
+        # colors are stored once in the palette and referenced by index
+        self.palette = [BLACK]
+        self.palette_index = {BLACK: 0}
+
+    def __len__(self):
+        return len(self.colors)
+
+    def segments(self):
+        # iterate over the drawn segments as (x0, y0, x1, y1, (r, g, b))
+        coords = self.coords
+        palette = self.palette
+        for i in range(len(self.colors)):
+            j = 4*i
+            yield (coords[j], coords[j+1], coords[j+2], coords[j+3],
+                   palette[self.colors[i]])
+
+    def goto(self, x, y):
+        if self.pen:
+            self.coords.extend((self.x, self.y, x, y))
+            self.colors.append(self.color)
+        self.x = x
+        self.y = y
+
+    def forward(self, distance):
+        angle = math.radians(self.heading)
+        self.goto(self.x + distance*math.sin(angle),
+                  self.y + distance*math.cos(angle))
+
+    def backward(self, distance):
+        self.forward(-distance)
+
+    def right(self, angle):
+        self.heading = (self.heading + angle) % 360.0
+
+    def left(self, angle):
+        self.heading = (self.heading - angle) % 360.0
+
+    def circle(self, radius):
+        # same polygon approximation as turtle.circle so that both
+        # backends produce the same drawing
+        steps = circle_steps(radius)
+        w = 360.0/steps
+        w2 = 0.5*w
+        l = 2.0*radius*math.sin(math.radians(w2))
+        if radius < 0:
+            l, w, w2 = -l, -w, -w2
+        self.left(w2)
+        for i in range(steps):
+            self.forward(l)
+            self.left(w)
+        self.left(-w2)
+
+    def setx(self, x):
+        self.goto(x, self.y)
+
+    def sety(self, y):
+        self.goto(self.x, y)
+
+    def setheading(self, angle):
+        self.heading = angle % 360.0
+
+    def pendown(self):
+        self.pen = True
+
+    def penup(self):
+        self.pen = False
+
+    def repeat_motion(self, ops, count):
+        # draw 'count' repetitions of a motion program (see logo_motion)
+        # in bulk
+        (coords, self.x, self.y, self.heading, self.pen) = \
+            trace(ops, count, self.x, self.y, self.heading, self.pen)
+        self.coords.extend(coords)
+        self.colors.extend(array('I', [self.color]) * (len(coords)//4))
+
+    def mark(self):
+        # the state a drawing starts from, see record
+        return (len(self.colors), self.x, self.y, self.heading)
+
+    def record(self, mark):
+        # what was drawn since the mark, in the turtle frame of the mark,
+        # and the final turtle state relative to it
+        (start, x, y, heading) = mark
+        coords = to_local(self.coords[4*start:], x, y, heading)
+        (ux, uy) = to_local((self.x, self.y), x, y, heading)
+        return (coords, self.colors[start:], ux, uy, self.heading - heading,
+                self.pen, self.color)
+
+    def replay(self, record):
+        # draw a recorded drawing from the current turtle state
+        (coords, colors, ux, uy, turn, pen, color) = record
+        self.coords.extend(to_world(coords, self.x, self.y, self.heading))
+        self.colors.extend(colors)
+        (self.x, self.y) = to_world((ux, uy), self.x, self.y, self.heading)
+        self.heading = (self.heading + turn) % 360.0
+        self.pen = pen
+        self.color = color
+
+    def snapshot(self):
+        # the drawing and the turtle state, see restore
+        return (self.coords, self.colors, len(self.colors),
+                self.palette, len(self.palette),
+                self.x, self.y, self.heading, self.pen, self.color)
+
+    def restore(self, snapshot):
+        # go back to the state of a snapshot.  the buffers are truncated in
+        # place, snapshots taken after this one are no longer valid
+        (self.coords, self.colors, n, self.palette, npalette,
+         self.x, self.y, self.heading, self.pen, self.color) = snapshot
+        del self.coords[4*n:]
+        del self.colors[n:]
+        del self.palette[npalette:]
+        self.palette_index = {rgb: i for (i, rgb) in enumerate(self.palette)}
+
+    def setcolor(self, r, g, b):
+        rgb = (r, g, b)
+        for c in rgb:
+            if c < 0 or c > 255:
+                raise ValueError("bad color value {}".format(c))
+        if rgb not in self.palette_index:
+            self.palette_index[rgb] = len(self.palette)
+            self.palette.append(rgb)
+        self.color = self.palette_index[rgb]
+
+#########################################################################
+class TkBackend:
+
+    def __init__(self):
+        self.turtle = None
+
+    def screen(self):
+        # open the Tk screen on first use
+        if self.turtle is None:
+            import turtle
+            turtle.getscreen()
+            turtle.mode('logo')
+            turtle.speed('fastest')
+            self.turtle = turtle
+        return self.turtle
+
+    def clearscreen(self):
+        self.screen().clearscreen()
+
+    def forward(self, distance):
+        self.screen().forward(distance)
+
+    def backward(self, distance):
+        self.screen().backward(distance)
+
+    def right(self, angle):
+        self.screen().right(angle)
+
+    def left(self, angle):
+        self.screen().left(angle)
+
+    def circle(self, radius):
+        self.screen().circle(radius)
+
+    def setx(self, x):
+        self.screen().setx(x)
+
+    def sety(self, y):
+        self.screen().sety(y)
+
+    def setheading(self, angle):
+        self.screen().setheading(angle)
+
+    def pendown(self):
+        self.screen().down()
+
+    def penup(self):
+        self.screen().up()
+
+    def setcolor(self, r, g, b):
+        self.screen().pencolor(r/255, g/255, b/255)
+
+    def repeat_motion(self, ops, count):
+        # the screen animates every step, so run the program step by step
+        for i in range(count):
+            for op in ops:
+                if op[0] == 'fd':
+                    self.forward(op[1])
+                elif op[0] == 'rt':
+                    self.right(op[1])
+                elif op[0] == 'pu':
+                    self.penup()
+                else:
+                    self.pendown()
+
+#########################################################################
+def NumpyBackend():
+    # the vectorized engine lives in logo_geometry, it is only imported
+    # when it is used because NumPy is optional
+    from logo_geometry import NumpyBackend
+    return NumpyBackend()
+
+#########################################################################
+# backends selectable by name, e.g. from the command line
+backends = {
+    'headless' : HeadlessBackend,
+    'numpy'    : NumpyBackend,
+    'tk'       : TkBackend
+}
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+#########################################################################
+# batch rendering of LOGO programs
+#
+# renders every .logo file of a directory, or every file listed in a
+# manifest (one path per line, relative to the manifest, '#' starts a
+# comment), to a PNG file in the output directory.  the programs are
+# spread over a pool of worker processes and every job runs on its own
+# Interpreter with a headless backend.  text printed by a program goes to
+# a .txt file next to its image.
+#
+# a summary with the time each job took is printed at the end and
+# written to summary.csv in the output directory.  jobs that fail are
+# reported in the summary and the batch exits with status 1.
+#
+#   python logo_batch.py DIR|MANIFEST [-o OUTDIR] [-j WORKERS]
+#                        [--mode MODE] [-O LEVEL]
+#                        [--size WxH] [--scale S] [--antialias]
+#
+#########################################################################
+
+import io
+import os
+import sys
+import csv
+import time
+import contextlib
+import multiprocessing
+from logo_interp import Interpreter, modes
+from logo_optimize import MAX_LEVEL
+
+#########################################################################
+def find_inputs(source):
+    # the programs of a directory or a manifest as (path, name) pairs,
+    # name is the base name of the outputs
+    if os.path.isdir(source):
+        files = sorted(f for f in os.listdir(source) if f.endswith('.logo'))
+        return [(os.path.join(source, f), os.path.splitext(f)[0]) for f in files]
+
+    base = os.path.dirname(source)
+    inputs = []
+    f = open(source, 'r')
+    for line in f:
+        line = line.split('#')[0].strip()
+        if line:
+            name = os.path.splitext(os.path.normpath(line))[0]
+            inputs.append((os.path.join(base, line), name.replace(os.sep, '_')))
+    f.close()
+    return inputs
+
+#########################################################################
+def run_job(job):
+    # render one program, returns a row of the summary
+    (path, name, outdir, mode, level, size, scale, antialias) = job
+    row = {'input': path, 'output': '', 'segments': 0,
+           'run_ms': 0.0, 'render_ms': 0.0, 'status': 'ok'}
+
+    try:
+        from logo_raster import render, write_png
+
+        f = open(path, 'r')
+        input_stream = f.read()
+        f.close()
+
+        start = time.perf_counter()
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            backend = Interpreter(mode=mode, level=level).run(input_stream)
+        row['run_ms'] = 1000.0*(time.perf_counter() - start)
+        row['segments'] = len(backend)
+
+        start = time.perf_counter()
+        output = os.path.join(outdir, name + '.png')
+        write_png(output, render(backend, size[0], size[1], scale, antialias))
+        row['render_ms'] = 1000.0*(time.perf_counter() - start)
+        row['output'] = output
+
+        if printed.getvalue():
+            f = open(os.path.join(outdir, name + '.txt'), 'w')
+            f.write(printed.getvalue())
+            f.close()
+
+    except Exception as e:
+        row['status'] = "error: {}".format(e)
+
+    return row
+
+#########################################################################
+def run_batch(inputs, outdir, workers=None, mode='compile', level=0,
+              size=(800, 800), scale=1.0, antialias=False):
+    # render the (path, name) inputs, returns the summary rows in input
+    # order
+    os.makedirs(outdir, exist_ok=True)
+    jobs = [(path, name, outdir, mode, level, size, scale, antialias)
+            for (path, name) in inputs]
+
+    if workers == 1:
+        return [run_job(job) for job in jobs]
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        return pool.map(run_job, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+#########################################################################
+def write_summary(rows, path):
+    f = open(path, 'w', newline='')
+    writer = csv.DictWriter(f, fieldnames=['input', 'output', 'segments',
+                                           'run_ms', 'render_ms', 'status'])
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+    f.close()
+
+#########################################################################
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+    from logo_raster import parse_size
+
+    aparser = ArgumentParser()
+    aparser.add_argument('source', help='directory of .logo files or manifest')
+    aparser.add_argument('-o', dest='outdir', default='.',
+                         help='output directory (default: .)')
+    aparser.add_argument('-j', dest='workers', type=int, default=None,
+                         help='worker processes (default: number of CPUs)')
+    aparser.add_argument('--mode', choices=sorted(modes), default='compile',
+                         help='execution mode (default: compile)')
+    aparser.add_argument('-O', dest='level', type=int, choices=range(MAX_LEVEL+1), default=0,
+                         help='optimization level (default: 0)')
+    aparser.add_argument('--size', default='800x800',
+                         help='PNG canvas size in pixels, WIDTHxHEIGHT (default: 800x800)')
+    aparser.add_argument('--scale', type=float, default=1.0,
+                         help='PNG pixels per turtle step (default: 1.0)')
+    aparser.add_argument('--antialias', action='store_true',
+                         help='antialias the lines of the PNG')
+
+    args = vars(aparser.parse_args())
+
+    try:
+        size = parse_size(args['size'])
+    except ValueError as e:
+        aparser.error(str(e))
+    if args['workers'] is not None and args['workers'] < 1:
+        aparser.error("the number of workers must be at least 1")
+
+    inputs = find_inputs(args['source'])
+
+    start = time.perf_counter()
+    rows = run_batch(inputs, args['outdir'], args['workers'], args['mode'],
+                     args['level'], size, args['scale'], args['antialias'])
+    total = time.perf_counter() - start
+
+    write_summary(rows, os.path.join(args['outdir'], 'summary.csv'))
+
+    failed = 0
+    for row in rows:
+        print("{:40} {:8} segments {:9.1f} ms run {:9.1f} ms render  {}".format(
+              row['input'], row['segments'], row['run_ms'], row['render_ms'], row['status']))
+        failed += row['status'] != 'ok'
+    print("{} programs, {} failed, {:.2f} s".format(len(rows), failed, total))
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,74 @@
+#########################################################################
+# an on-disk cache for LOGO
+#
+# entries are marshalled Python objects, or raw bytes for formats of
+# their own (store_bytes), stored under a content hash.
+# the cache lives in $LOGO_CACHE_DIR or ~/.cache/logo_interp and every
+# kind of entry ('py', ...) gets its own subdirectory.
+#
+# the cache is an optimization only: unreadable, corrupt or unwritable
+# entries are treated as missing.
+#
+#########################################################################
+
+import os
+import sys
+import marshal
+import hashlib
+
+#########################################################################
+def cache_dir():
+    return os.environ.get('LOGO_CACHE_DIR') or \
+           os.path.join(os.path.expanduser('~'), '.cache', 'logo_interp')
+
+#########################################################################
+def cache_key(*parts):
+    # hash the parts together with the interpreter version since marshal
+    # formats and code objects are specific to it
+    h = hashlib.sha256(sys.implementation.cache_tag.encode())
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        h.update(b'\0')
+        h.update(part)
+    return h.hexdigest()
+
+#########################################################################
+def cache_path(kind, key):
+    return os.path.join(cache_dir(), kind, key)
+
+#########################################################################
+def load(kind, key):
+    # return the object stored under key or None
+    try:
+        with open(cache_path(kind, key), 'rb') as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+#########################################################################
+def store(kind, key, value):
+    # values marshal cannot serialize, e.g. ASTs nested too deeply, are
+    # not cached
+    try:
+        data = marshal.dumps(value)
+    except ValueError:
+        return
+    store_bytes(kind, key, data)
+
+#########################################################################
+def store_bytes(kind, key, data):
+    # write the entry to a temporary file first so that readers never
+    # see a partially written entry
+    path = cache_path(kind, key)
+    tmp = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except (OSError, ValueError):
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
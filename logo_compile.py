@@ -0,0 +1,776 @@
+# A compiler that turns the LOGO AST into nested Python closures
+#
+# every node is visited exactly once at compile time.  the node function
+# unpacks the tuple, compiles its children and returns a closure with the
+# operands and the child closures already bound.  running the program is
+# then just calling closures: no dispatch on tags and no pattern matching.
+#
+# the compiler works on the AST produced by logo_resolve, so every
+# variable already has a lexical address.  variables live in frames
+# (lists of slots, see logo_resolve) rather than in the symbol table and
+# every closure takes the current frame f as its only argument.
+#
+# expression closures return the value of the expression.  statements
+# compile to ops (KIND, a, b):
+#
+#   (SIMPLE, run, None)          - run(f) executes the statement
+#   (LOOP, count, block)         - a repeat whose body calls procedures or stops
+#   (BRANCH, test, block)        - an if whose body does the same
+#   (CALL, name, (fetch, args))  - a procedure call
+#   (STOP, None, None)           - return from the current procedure
+#
+# a statement list compiles to a block, a tuple of ops in which runs of
+# simple statements are merged into a single closure.  loops and
+# conditionals made of simple statements only become simple statements
+# themselves.  the remaining ops are run by execute on a stack of frames
+# that lives on the heap, so neither long programs nor deep recursion use
+# up the Python stack.  a call in tail position takes over the frame of
+# the call it ends, so tail recursion runs in constant space, and 'stop'
+# returns by unwinding the frames: no exceptions are raised.  execute
+# returns STOPPED when a 'stop' outside of a procedure ended the program.
+#
+# calls of pure procedures (see logo_memo) are memoized: the first call
+# with given arguments records its drawing and later ones replay it.
+#
+# a program with resource limits (see logo_limits) is compiled with
+# closures that charge its governor: every run of simple statements
+# charges their number of steps, every loop iteration one step, and
+# execute charges the other ops and tracks the procedure calls.  programs
+# without limits are compiled and run without any of these checks.
+
+from logo_state import state
+from logo_resolve import resolve
+from logo_motion import motion_ops
+from logo_memo import pure_procedures, MotionCache
+from logo_limits import Governor, CHECK_INTERVAL
+
+# op kinds, BLOCK is only used for frames
+SIMPLE = 0
+LOOP = 1
+BRANCH = 2
+CALL = 3
+STOP = 4
+BLOCK = 5
+
+# the results of execute: the block ran to its end, or a 'stop' outside
+# of a procedure ended it
+DONE = 0
+STOPPED = 1
+
+# the value of a slot whose name has not been declared yet
+UNSET = object()
+
+# numbers of the pure procedures of the program being compiled, by
+# id(declfunc node)
+pure = {}
+
+# the governor of the program being compiled, None without limits
+governor = None
+
+#########################################################################
+def compile_seq_list(seq_list):
+    # compile every element of a ('seq', [...]) list into a tuple
+    (SEQ, items) = seq_list
+    return tuple(compile_AST(item) for item in items)
+
+#########################################################################
+def merge(closures):
+    # a simple op that runs the statement closures one after the other
+    if governor is not None:
+        charge = governor.charge
+        n = len(closures)
+        closures = tuple(closures)
+
+        def run(f):
+            charge(n)
+            for stmt in closures:
+                stmt(f)
+
+        return (SIMPLE, run, None)
+
+    if len(closures) == 1:
+        return (SIMPLE, closures[0], None)
+
+    closures = tuple(closures)
+
+    def run(f):
+        for stmt in closures:
+            stmt(f)
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def block_closure(block):
+    # a closure running the block if it is made of simple statements only,
+    # None otherwise
+    if not block:
+        return nil(None)
+    if len(block) == 1 and block[0][0] == SIMPLE:
+        return block[0][1]
+    return None
+
+#########################################################################
+def fetch(name, coords):
+    # a closure that reads the variable with the given lexical address
+
+    if len(coords) == 1:
+        (depth, slot, bound) = coords[0]
+
+        if bound and depth == 0:
+            return lambda f: f[slot]
+        if bound and depth == 1:
+            return lambda f: f[0][slot]
+
+        if depth == 0:
+            def get(f):
+                value = f[slot]
+                if value is UNSET:
+                    raise ValueError("{} was not declared".format(name))
+                return value
+            return get
+
+        if depth == 1:
+            def get(f):
+                value = f[0][slot]
+                if value is UNSET:
+                    raise ValueError("{} was not declared".format(name))
+                return value
+            return get
+
+    def get(f):
+        # try the candidates from the innermost scope outwards
+        for (depth, slot, bound) in coords:
+            frame = f
+            for i in range(depth):
+                frame = frame[0]
+            value = frame[slot]
+            if value is not UNSET:
+                return value
+        raise ValueError("{} was not declared".format(name))
+
+    return get
+
+#########################################################################
+# node functions
+#########################################################################
+def seq(node):
+
+    (SEQ, stmts) = node
+    block = []
+    closures = []
+
+    for stmt in stmts:
+        op = compile_AST(stmt)
+        if op[0] == SIMPLE:
+            closures.append(op[1])
+        else:
+            if closures:
+                block.append(merge(closures))
+                closures = []
+            block.append(op)
+
+    if closures:
+        block.append(merge(closures))
+
+    return tuple(block)
+
+#########################################################################
+def nil(node):
+
+    def run(f):
+        pass
+
+    return run
+
+#########################################################################
+def fd_stmt(node):
+
+    (FD, exp) = node
+    val = compile_AST(exp)
+    forward = state.backend.forward
+
+    def run(f):
+        forward(val(f))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def bk_stmt(node):
+
+    (BK, exp) = node
+    val = compile_AST(exp)
+    backward = state.backend.backward
+
+    def run(f):
+        backward(val(f))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def rt_stmt(node):
+
+    (RT, exp) = node
+    val = compile_AST(exp)
+    right = state.backend.right
+
+    def run(f):
+        right(val(f))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def lt_stmt(node):
+
+    (LT, exp) = node
+    val = compile_AST(exp)
+    left = state.backend.left
+
+    def run(f):
+        left(val(f))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def circle_stmt(node):
+
+    (CIRCLE, exp) = node
+    val = compile_AST(exp)
+    circle = state.backend.circle
+
+    def run(f):
+        circle(val(f))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def setx_stmt(node):
+
+    (SETX, exp) = node
+    val = compile_AST(exp)
+    setx = state.backend.setx
+
+    def run(f):
+        setx(val(f))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def sety_stmt(node):
+
+    (SETY, exp) = node
+    val = compile_AST(exp)
+    sety = state.backend.sety
+
+    def run(f):
+        sety(val(f))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def setangle_stmt(node):
+
+    (SETANGLE, exp) = node
+    val = compile_AST(exp)
+    setheading = state.backend.setheading
+
+    def run(f):
+        setheading(val(f))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def pd_stmt(node):
+
+    pendown = state.backend.pendown
+
+    def run(f):
+        pendown()
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def pu_stmt(node):
+
+    penup = state.backend.penup
+
+    def run(f):
+        penup()
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def setcolor_stmt(node):
+
+    (SETCOLOR, exp1, exp2, exp3) = node
+    r = compile_AST(exp1)
+    g = compile_AST(exp2)
+    b = compile_AST(exp3)
+    setcolor = state.backend.setcolor
+
+    def run(f):
+        setcolor(int(r(f)), int(g(f)), int(b(f)))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def stop_stmt(node):
+
+    return (STOP, None, None)
+
+#########################################################################
+def repeat_stmt(node):
+
+    (REPEAT, exp, stmt_list) = node
+    count = compile_AST(exp)
+
+    # loops that only move the turtle by constant amounts are drawn in
+    # bulk by the backend
+    ops = motion_ops(stmt_list)
+    if ops is not None:
+        repeat_motion = state.backend.repeat_motion
+
+        if governor is not None:
+            # draw in chunks and charge each chunk before drawing it
+            charge = governor.charge
+            chunk = max(1, CHECK_INTERVAL // (len(ops) + 1))
+
+            def run(f):
+                n = count(f)
+                while n > 0:
+                    k = min(n, chunk)
+                    charge(k * (len(ops) + 1))
+                    repeat_motion(ops, k)
+                    n -= k
+
+            return (SIMPLE, run, None)
+
+        def run(f):
+            repeat_motion(ops, count(f))
+
+        return (SIMPLE, run, None)
+
+    block = compile_AST(stmt_list)
+    body = block_closure(block)
+
+    if body is None:
+        return (LOOP, count, block)
+
+    if governor is not None:
+        charge = governor.charge
+
+        def run(f):
+            for i in range(count(f)):
+                charge(1)
+                body(f)
+
+        return (SIMPLE, run, None)
+
+    def run(f):
+        for i in range(count(f)):
+            body(f)
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def assign_stmt(node):
+
+    (ASSIGN, name, exp, slot) = node
+    val = compile_AST(exp)
+
+    # assignments declare or update the name in the current scope
+    def run(f):
+        f[slot] = val(f)
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def print_stmt(node):
+
+    (PRINT, exp) = node
+    val = compile_AST(exp)
+
+    def run(f):
+        print(val(f))
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def cs_stmt(node):
+
+    clearscreen = state.backend.clearscreen
+
+    def run(f):
+        clearscreen()
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def declfunc_stmt(node):
+
+    (DECLFUNC, name, arglist, body, slot, nslots) = node
+    (SEQ, formals) = arglist
+    nformals = len(formals)
+    block = compile_AST(body)
+
+    # slots of the function frame that are not formals start out empty
+    pad = (UNSET,) * (nslots - nformals)
+
+    # pure procedures carry their number, the others None
+    memo_id = pure.get(id(node))
+
+    def run(f):
+        if f[slot] is not UNSET:
+            raise ValueError("symbol {} already declared".format(name))
+        # the current frame is the defining environment of the function
+        f[slot] = ('funval', nformals, block, pad, f, memo_id)
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def callfunc_stmt(node):
+
+    (CALLFUNC, name, actual_args, coords) = node
+    args = compile_seq_list(actual_args)
+
+    return (CALL, name, (fetch(name, coords), args))
+
+#########################################################################
+def end_stmt(node):
+
+    return (SIMPLE, nil(node), None)
+
+#########################################################################
+def if_stmt(node):
+
+    (IF, cond, stmt) = node
+    test = compile_AST(cond)
+    block = compile_AST(stmt)
+    body = block_closure(block)
+
+    if body is None:
+        return (BRANCH, test, block)
+
+    def run(f):
+        if test(f) != 0:
+            body(f)
+
+    return (SIMPLE, run, None)
+
+#########################################################################
+def plus_exp(node):
+
+    (PLUS, c1, c2) = node
+    v1 = compile_AST(c1)
+    v2 = compile_AST(c2)
+
+    return lambda f: v1(f) + v2(f)
+
+#########################################################################
+def minus_exp(node):
+
+    (MINUS, c1, c2) = node
+    v1 = compile_AST(c1)
+    v2 = compile_AST(c2)
+
+    return lambda f: v1(f) - v2(f)
+
+#########################################################################
+def times_exp(node):
+
+    (TIMES, c1, c2) = node
+    v1 = compile_AST(c1)
+    v2 = compile_AST(c2)
+
+    if governor is not None:
+        # products are the only values that can outgrow the clock checks
+        size = governor.size
+        return lambda f: size(v1(f) * v2(f))
+
+    return lambda f: v1(f) * v2(f)
+
+#########################################################################
+def divide_exp(node):
+
+    (DIVIDE, c1, c2) = node
+    v1 = compile_AST(c1)
+    v2 = compile_AST(c2)
+
+    return lambda f: v1(f) // v2(f)
+
+#########################################################################
+def leq_exp(node):
+
+    (LEQ, c1, c2) = node
+    v1 = compile_AST(c1)
+    v2 = compile_AST(c2)
+
+    return lambda f: 1 if v1(f) <= v2(f) else 0
+
+#########################################################################
+def eq_exp(node):
+
+    (EQ, c1, c2) = node
+    v1 = compile_AST(c1)
+    v2 = compile_AST(c2)
+
+    return lambda f: 1 if v1(f) == v2(f) else 0
+
+#########################################################################
+def geq_exp(node):
+
+    (GEQ, c1, c2) = node
+    v1 = compile_AST(c1)
+    v2 = compile_AST(c2)
+
+    return lambda f: 1 if v1(f) >= v2(f) else 0
+
+#########################################################################
+def integer_exp(node):
+
+    (INTEGER, value) = node
+
+    return lambda f: value
+
+#########################################################################
+def id_exp(node):
+
+    (ID, name, coords) = node
+
+    return fetch(name, coords)
+
+#########################################################################
+def paren_exp(node):
+
+    (PAREN, exp) = node
+
+    # parentheses only group, the inner closure computes the value
+    return compile_AST(exp)
+
+#########################################################################
+def uminus_exp(node):
+
+    (UMINUS, exp) = node
+    val = compile_AST(exp)
+
+    return lambda f: -val(f)
+
+#########################################################################
+# compile
+#########################################################################
+def compile_AST(node):
+    # node format: (TYPE, [child1[, child2[, ...]]])
+    type = node[0]
+    if type in compile_dict:
+        node_function = compile_dict[type]
+        return node_function(node)
+    else:
+        raise ValueError("compile: unknown tree node type: " + type)
+
+#########################################################################
+# execute
+#########################################################################
+def execute(block, f, memo=None, governor=None):
+    # run a block in frame f on an explicit stack of frames.  the current
+    # frame is kept in local variables:
+    #
+    #   stmts - the ops of the block being executed
+    #   pc    - the index of the next op
+    #   kind  - BLOCK, LOOP or CALL
+    #   data  - iterations left for LOOP, (key, mark, steps) for a CALL
+    #           that is being recorded in the memo cache, steps is the
+    #           step count of the governor when the call started
+    #   f     - the variable frame
+
+    backend = state.backend
+
+    def store(data):
+        # store the recording of a call that returns
+        (key, mark, steps) = data
+        if governor is not None:
+            steps = governor.steps - steps
+        memo.store(key, backend.record(mark), steps)
+
+    frames = []
+    stmts = block
+    pc = 0
+    kind = BLOCK
+    data = None
+
+    while True:
+        if pc == len(stmts):
+            # end of the block
+            if kind == LOOP and data > 0:
+                if governor is not None:
+                    governor.charge(1)
+                data -= 1
+                pc = 0
+                continue
+            if not frames:
+                return DONE
+            if kind == CALL:
+                if data is not None:
+                    store(data)
+                if governor is not None:
+                    governor.leave(len(f) - 1)
+            (stmts, pc, kind, data, f) = frames.pop()
+            continue
+
+        (op, a, b) = stmts[pc]
+        pc += 1
+
+        if op == SIMPLE:
+            a(f)
+            continue
+
+        if governor is not None:
+            governor.charge(1)
+
+        if op == CALL:
+            (get, args) = b
+            val = get(f)
+
+            if type(val) is not tuple:
+                raise ValueError("{} is not a function".format(a))
+
+            # unpack the funval tuple
+            (FUNVAL, nformals, body, pad, context, memo_id) = val
+
+            if nformals != len(args):
+                raise ValueError("function {} expects {} arguments".format(a, nformals))
+
+            # the new frame links to the defining environment for static
+            # scoping, the actuals are evaluated in the current frame
+            frame = [context]
+            for arg in args:
+                frame.append(arg(f))
+
+            record = None
+            if memo_id is not None and memo is not None:
+                key = (memo_id, tuple(frame[1:]), backend.pen, backend.color)
+                entry = memo.lookup(key)
+                if entry is not None:
+                    (drawing, steps) = entry
+                    backend.replay(drawing)
+                    if governor is not None:
+                        # a replay is charged the steps of the call it
+                        # replays, and it may draw a lot at once: the
+                        # drawing and the clock are checked right away
+                        governor.charge(steps)
+                        governor.check()
+                    continue
+                if memo.wanted(key):
+                    record = (key, backend.mark(), governor.steps if governor is not None else 0)
+
+            frame.extend(pad)
+
+            # leave the blocks and the last loop iterations that are done
+            while pc == len(stmts) and frames and (kind == BLOCK or kind == LOOP and data == 0):
+                (stmts, pc, kind, data, f) = frames.pop()
+
+            if pc == len(stmts) and kind == CALL and data is None:
+                # a tail call returns to where the current call returns.
+                # a call that is being recorded keeps its frame to store
+                # the recording when it returns
+                if governor is not None:
+                    governor.leave(len(f) - 1)
+            else:
+                frames.append((stmts, pc, kind, data, f))
+
+            if governor is not None:
+                governor.enter(len(frame) - 1)
+
+            (stmts, pc, kind, data, f) = (body, 0, CALL, record, frame)
+
+        elif op == LOOP:
+            count = a(f)
+            if count > 0:
+                if governor is not None:
+                    governor.charge(1)
+                frames.append((stmts, pc, kind, data, f))
+                (stmts, pc, kind, data) = (b, 0, LOOP, count - 1)
+
+        elif op == BRANCH:
+            if a(f) != 0:
+                frames.append((stmts, pc, kind, data, f))
+                (stmts, pc, kind, data) = (b, 0, BLOCK, None)
+
+        elif op == STOP:
+            # unwind to the innermost procedure call and return from it
+            while kind != CALL:
+                if not frames:
+                    # 'stop' outside of a procedure ends the program
+                    return STOPPED
+                (stmts, pc, kind, data, f) = frames.pop()
+            if data is not None:
+                store(data)
+            if governor is not None:
+                governor.leave(len(f) - 1)
+            (stmts, pc, kind, data, f) = frames.pop()
+
+#########################################################################
+def compile_program(AST, program_governor=None):
+    # compile a resolved program, with the checks of a governor if given
+    global pure, governor
+    pure = pure_procedures(AST)
+    governor = program_governor
+    try:
+        return compile_AST(AST)
+    finally:
+        governor = None
+
+#########################################################################
+def motion_cache():
+    # a memo cache for the pure procedures, None if the backend does not
+    # record its drawing and cannot replay it
+    if hasattr(state.backend, 'replay'):
+        return MotionCache(state.backend)
+    return None
+
+#########################################################################
+def run(AST):
+    # resolve and compile the whole program once and then execute it
+    (AST, scope) = resolve(AST)
+
+    program_governor = None
+    if state.limits is not None:
+        program_governor = Governor(state.limits, state.backend, scope.size())
+
+    block = compile_program(AST, program_governor)
+    execute(block, [None] + [UNSET] * scope.size(), motion_cache(), program_governor)
+
+# a dictionary to associate tree nodes with node functions
+compile_dict = {
+    'seq'     : seq,
+    'nil'     : nil,
+    'fd'      : fd_stmt,
+    'bk'      : bk_stmt,
+    'rt'      : rt_stmt,
+    'lt'      : lt_stmt,
+    'circle'  : circle_stmt,
+    'setx'    : setx_stmt,
+    'sety'    : sety_stmt,
+    'setangle': setangle_stmt,
+    'pd'      : pd_stmt,
+    'pu'      : pu_stmt,
+    'stop'    : stop_stmt,
+    'setcolor': setcolor_stmt,
+    'repeat'  : repeat_stmt,
+    'assign'  : assign_stmt,
+    'print'   : print_stmt,
+    'cs'      : cs_stmt,
+    'declfunc': declfunc_stmt,
+    'callfunc': callfunc_stmt,
+    'end'     : end_stmt,
+    'if'      : if_stmt,
+    '+'       : plus_exp,
+    '-'       : minus_exp,
+    '*'       : times_exp,
+    '/'       : divide_exp,
+    '<='      : leq_exp,
+    '=='      : eq_exp,
+    '>='      : geq_exp,
+    'integer' : integer_exp,
+    'id'      : id_exp,
+    'paren'   : paren_exp,
+    'uminus'  : uminus_exp
+}
@@ -0,0 +1,358 @@
+#########################################################################
+# a vectorized turtle geometry engine for LOGO
+#
+# NumpyBackend draws the same picture as HeadlessBackend but it does not
+# move the turtle one command at a time.  motion commands are appended
+# to a queue of (kind, value) pairs and the queue is resolved in one
+# batch when the drawing or the turtle pose is needed:
+#
+#   headings  - heading at the start of the batch plus the cumulative sum
+#               of the turns
+#   positions - start position plus the cumulative sum of the moves,
+#               each projected with the sine and cosine of its heading
+#   pen/color - the last pen and color change before each move, found
+#               with a running maximum over the indices of the changes
+#
+# circle is expanded into its polygon (the one turtle.circle draws) and
+# repeat_motion into copies of the motion program, so both end up in the
+# queue as plain moves and turns.  setx, sety and setheading are
+# absolute and resolve the queue before they are applied.
+#
+# headings use LOGO mode conventions like the other backends: 0 is north
+# and right turns are clockwise, so a move by d goes d*sin(h) along x and
+# d*cos(h) along y.
+#
+# the drawing is kept as NumPy arrays: 'coords' holds x0, y0, x1, y1 for
+# each segment and 'colors' the index of its color in 'palette'.
+#
+#########################################################################
+
+import math
+from array import array
+from logo_backend import BLACK, circle_steps
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# queue entry kinds
+MOVE = 0
+TURN = 1
+PEN = 2
+COLOR = 3
+
+# resolve the queue once it holds this many commands
+MAX_QUEUE = 1 << 20
+
+#########################################################################
+class NumpyBackend:
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("the numpy backend needs NumPy, install it with 'pip install numpy'")
+        self.clearscreen()
+
+    def clearscreen(self):
+        # turtle pose at the start of the queue
+        self._x = 0.0
+        self._y = 0.0
+        self._heading = 0.0
+
+        # pen and color are known at once, they are also queued so that
+        # each move knows the state it was drawn with
+        self.pen = True
+        self.color = 0
+        self._pen = True
+        self._color = 0
+
+        # queue of motion commands
+        self.kinds = array('b')
+        self.values = array('d')
+
+        # resolved segments, one pair of arrays per batch
+        self._coords = []
+        self._colors = []
+        self._count = 0
+
+        # colors are stored once in the palette and referenced by index
+        self.palette = [BLACK]
+        self.palette_index = {BLACK: 0}
+
+    #####################################################################
+    # resolving the queue
+
+    def flush(self):
+        if not self.kinds:
+            return
+
+        kinds = np.frombuffer(self.kinds, dtype=np.int8)
+        values = np.frombuffer(self.values, dtype=np.float64)
+        index = np.arange(len(kinds))
+
+        # heading in effect at every command
+        turns = np.where(kinds == TURN, values, 0.0)
+        headings = self._heading + np.cumsum(turns)
+        angles = np.radians(headings)
+
+        # position after every command
+        moves = np.where(kinds == MOVE, values, 0.0)
+        xs = self._x + np.cumsum(moves*np.sin(angles))
+        ys = self._y + np.cumsum(moves*np.cos(angles))
+
+        # pen and color in effect at every command: the value of the last
+        # change at or before it, or the state at the start of the queue
+        pens = self.state_at(kinds == PEN, values, self._pen, index)
+        colors = self.state_at(kinds == COLOR, values, self._color, index)
+
+        # segments for the moves made with the pen down
+        drawn = (kinds == MOVE) & (pens != 0)
+        x0 = np.concatenate(((self._x,), xs[:-1]))
+        y0 = np.concatenate(((self._y,), ys[:-1]))
+        self.append(np.column_stack((x0, y0, xs, ys))[drawn].ravel(),
+                    colors[drawn].astype(np.uint32))
+
+        self._x = float(xs[-1])
+        self._y = float(ys[-1])
+        self._heading = float(headings[-1]) % 360.0
+        self._pen = self.pen
+        self._color = self.color
+
+        self.kinds = array('b')
+        self.values = array('d')
+
+    def state_at(self, changes, values, initial, index):
+        last = np.maximum.accumulate(np.where(changes, index, -1))
+        return np.where(last >= 0, values[np.maximum(last, 0)], initial)
+
+    def append(self, coords, colors):
+        # add resolved segments to the drawing
+        self._coords.append(coords)
+        self._colors.append(colors)
+        self._count += len(colors)
+
+    def queue(self, kind, value):
+        self.kinds.append(kind)
+        self.values.append(value)
+        if len(self.kinds) >= MAX_QUEUE:
+            self.flush()
+
+    #####################################################################
+    # the turtle pose and the drawing, resolved on access
+
+    @property
+    def x(self):
+        self.flush()
+        return self._x
+
+    @property
+    def y(self):
+        self.flush()
+        return self._y
+
+    @property
+    def heading(self):
+        self.flush()
+        return self._heading
+
+    def join(self):
+        # resolve the queue and join the batches into one.  coords and
+        # colors always have the same batches
+        self.flush()
+        if len(self._colors) != 1:
+            self._coords = [np.concatenate([np.zeros(0)] + self._coords)]
+            self._colors = [np.concatenate([np.zeros(0, dtype=np.uint32)] + self._colors)]
+
+    @property
+    def coords(self):
+        self.join()
+        return self._coords[0]
+
+    @property
+    def colors(self):
+        self.join()
+        return self._colors[0]
+
+    def __len__(self):
+        return len(self.colors)
+
+    def segments(self):
+        # iterate over the drawn segments as (x0, y0, x1, y1, (r, g, b))
+        coords = self.coords.tolist()
+        colors = self.colors.tolist()
+        palette = self.palette
+        for i in range(len(colors)):
+            j = 4*i
+            yield (coords[j], coords[j+1], coords[j+2], coords[j+3],
+                   palette[colors[i]])
+
+    #####################################################################
+    # turtle commands
+
+    def forward(self, distance):
+        self.queue(MOVE, distance)
+
+    def backward(self, distance):
+        self.queue(MOVE, -distance)
+
+    def right(self, angle):
+        self.queue(TURN, angle)
+
+    def left(self, angle):
+        self.queue(TURN, -angle)
+
+    def circle(self, radius):
+        # same polygon approximation as turtle.circle
+        steps = circle_steps(radius)
+        w = 360.0/steps
+        w2 = 0.5*w
+        l = 2.0*radius*math.sin(math.radians(w2))
+        if radius < 0:
+            l, w, w2 = -l, -w, -w2
+        self.kinds.extend(array('b', (TURN,)) + array('b', (MOVE, TURN))*steps + array('b', (TURN,)))
+        self.values.extend(array('d', (-w2,)) + array('d', (l, -w))*steps + array('d', (w2,)))
+        if len(self.kinds) >= MAX_QUEUE:
+            self.flush()
+
+    def repeat_motion(self, ops, count):
+        # queue 'count' copies of a motion program (see logo_motion)
+        if count <= 0:
+            return
+        kinds = array('b')
+        values = array('d')
+        for op in ops:
+            if op[0] == 'fd':
+                kinds.append(MOVE)
+                values.append(op[1])
+            elif op[0] == 'rt':
+                kinds.append(TURN)
+                values.append(op[1])
+            else:
+                self.pen = op[0] == 'pd'
+                kinds.append(PEN)
+                values.append(self.pen)
+        if not kinds:
+            return
+
+        # queue the copies in chunks that fit the queue
+        chunk = max(1, MAX_QUEUE // len(kinds))
+        while count > 0:
+            n = min(count, chunk)
+            self.kinds.extend(kinds * n)
+            self.values.extend(values * n)
+            if len(self.kinds) >= MAX_QUEUE:
+                self.flush()
+            count -= n
+
+    def goto(self, x, y):
+        self.flush()
+        if self.pen:
+            self.append(np.array((self._x, self._y, x, y)),
+                        np.array((self.color,), dtype=np.uint32))
+        self._x = x
+        self._y = y
+
+    def setx(self, x):
+        self.goto(x, self.y)
+
+    def sety(self, y):
+        self.goto(self.x, y)
+
+    def setheading(self, angle):
+        self.flush()
+        self._heading = angle % 360.0
+
+    def pendown(self):
+        self.pen = True
+        self.queue(PEN, 1)
+
+    def penup(self):
+        self.pen = False
+        self.queue(PEN, 0)
+
+    def mark(self):
+        # the state a drawing starts from, see record
+        self.flush()
+        return (self._count, self._x, self._y, self._heading)
+
+    def record(self, mark):
+        # what was drawn since the mark, in the turtle frame of the mark,
+        # and the final turtle state relative to it
+        self.flush()
+        (start, x, y, heading) = mark
+
+        # collect the segments from the last batches
+        coords = []
+        colors = []
+        n = self._count - start
+        i = len(self._colors)
+        while n > 0:
+            i -= 1
+            k = min(n, len(self._colors[i]))
+            coords.insert(0, self._coords[i][len(self._coords[i]) - 4*k:])
+            colors.insert(0, self._colors[i][len(self._colors[i]) - k:])
+            n -= k
+        coords = np.concatenate([np.zeros(0)] + coords)
+        colors = np.concatenate([np.zeros(0, dtype=np.uint32)] + colors)
+
+        a = np.radians(heading)
+        c = np.cos(a)
+        s = np.sin(a)
+        points = coords.reshape(-1, 2) - (x, y)
+        local = np.column_stack((points[:, 0]*c - points[:, 1]*s,
+                                 points[:, 0]*s + points[:, 1]*c)).ravel()
+        (dx, dy) = (self._x - x, self._y - y)
+        return (local, colors, dx*c - dy*s, dx*s + dy*c, self._heading - heading,
+                self.pen, self.color)
+
+    def replay(self, record):
+        # draw a recorded drawing from the current turtle state
+        self.flush()
+        (coords, colors, ux, uy, turn, pen, color) = record
+
+        a = math.radians(self._heading)
+        c = math.cos(a)
+        s = math.sin(a)
+        points = coords.reshape(-1, 2)
+        world = np.column_stack((self._x + points[:, 0]*c + points[:, 1]*s,
+                                 self._y - points[:, 0]*s + points[:, 1]*c)).ravel()
+        self.append(world, colors)
+
+        (self._x, self._y) = (self._x + ux*c + uy*s, self._y - ux*s + uy*c)
+        self._heading = (self._heading + turn) % 360.0
+        self.pen = self._pen = pen
+        self.color = self._color = color
+
+    def snapshot(self):
+        # the drawing and the turtle state, see restore
+        self.flush()
+        return (self._coords, self._colors, len(self._colors), self._count,
+                self.palette, len(self.palette),
+                self._x, self._y, self._heading, self.pen, self.color)
+
+    def restore(self, snapshot):
+        # go back to the state of a snapshot.  the batch lists are
+        # truncated in place, snapshots taken after this one are no longer
+        # valid
+        (self._coords, self._colors, nbatches, self._count,
+         self.palette, npalette,
+         self._x, self._y, self._heading, self.pen, self.color) = snapshot
+        del self._coords[nbatches:]
+        del self._colors[nbatches:]
+        del self.palette[npalette:]
+        self.palette_index = {rgb: i for (i, rgb) in enumerate(self.palette)}
+        self._pen = self.pen
+        self._color = self.color
+        self.kinds = array('b')
+        self.values = array('d')
+
+    def setcolor(self, r, g, b):
+        rgb = (r, g, b)
+        for c in rgb:
+            if c < 0 or c > 255:
+                raise ValueError("bad color value {}".format(c))
+        if rgb not in self.palette_index:
+            self.palette_index[rgb] = len(self.palette)
+            self.palette.append(rgb)
+        self.color = self.palette_index[rgb]
+        self.queue(COLOR, self.color)
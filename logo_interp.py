@@ -1,33 +1,223 @@
 #!/usr/bin/env python
 # LOGO interpreter
 
-from argparse import ArgumentParser
-from logo_lex import lexer
-from logo_interp_gram import parser
-from logo_state import state
-from logo_interp_walk import walk
+import importlib
+import logo_parse
+from logo_parse import parse
+from logo_state import State, state
+from logo_optimize import optimize, MAX_LEVEL
+from logo_backend import backends
+from logo_vector import formats
 
-def interp(input_stream):
+# execution modes: 'compile' turns the AST into closures before running it,
+# 'vm' compiles it to bytecode for the stack machine, 'py' translates it
+# to Python, 'walk' is the reference tree walker and 'compact' runs the
+# tree walker on the compact form of the AST (see logo_compact).  each
+# mode is a (module, function) pair, the module is imported when the mode
+# is used
+modes = {
+    'compile' : ('logo_compile', 'run'),
+    'vm'      : ('logo_vm', 'run'),
+    'py'      : ('logo_transpile', 'run'),
+    'walk'    : ('logo_interp_walk', 'walk'),
+    'compact' : ('logo_compact', 'run')
+}
 
-    # initialize the state object
-    state.initialize()
+# the modes that cache what they run by program text, their modules have
+# a run_source function that only parses programs they have not seen
+# before
+source_modes = {'py', 'compact'}
 
-    # build the AST
-    parser.parse(input_stream, lexer=lexer)
+def mode_function(mode):
+    (module, function) = modes[mode]
+    return getattr(importlib.import_module(module), function)
 
-    # walk the AST
-    walk(state.AST)
+class Interpreter:
+    # an interpreter with its own symbol table, AST and drawing backend.
+    #
+    # the execution modes work on the shared state object: run makes the
+    # state of the interpreter the current one, saves it back when the
+    # program is done and puts back what the shared state held before, so
+    # any number of interpreters can be used one after the other in a
+    # process and a run nested in another one (e.g. started from a
+    # backend) leaves the outer run its state.  the shared state and the
+    # module globals of the parser and the compilers make interpreters
+    # not thread-safe: programs run one at a time in a process, logo_batch
+    # runs them in parallel in separate processes.
+    #
+    # limits (see logo_limits) bound the resources a program may use,
+    # they are enforced by the 'compile' mode only.
+
+    def __init__(self, backend=None, mode='compile', level=0, limits=None):
+        if mode not in modes:
+            raise ValueError("unknown execution mode: {}".format(mode))
+        if limits is not None and mode != 'compile':
+            raise ValueError("resource limits need the compile mode")
+
+        self.mode = mode
+        self.level = level
+        self.state = State()
+        self.state.initialize(backend, limits)
+
+    @property
+    def backend(self):
+        return self.state.backend
+
+    @property
+    def AST(self):
+        return self.state.AST
+
+    def run(self, input_stream):
+        # run a program on the backend of the interpreter with a fresh
+        # symbol table and return the backend
+        self.state.initialize(self.state.backend, self.state.limits)
+        previous = state.copy()
+        state.load(self.state)
+        try:
+            self.execute(input_stream)
+        finally:
+            self.state.load(state)
+            state.load(previous)
+        return self.state.backend
+
+    def execute(self, input_stream):
+        if self.mode in source_modes:
+            # the transpiler caches its code objects and the compact mode
+            # its compact ASTs by program text
+            module = importlib.import_module(modes[self.mode][0])
+            module.run_source(input_stream, self.level)
+            return
+
+        # build the AST, programs parsed before come from the AST cache
+        parse(input_stream)
+
+        # optimize the AST
+        state.AST = optimize(state.AST, self.level)
+
+        # execute the AST
+        mode_function(self.mode)(state.AST)
+
+def interp(input_stream, backend=None, mode='compile', level=0, limits=None):
+    # run a program on a new interpreter and return its backend
+    return Interpreter(backend, mode, level, limits).run(input_stream)
 
 if __name__ == "__main__":
+    from argparse import ArgumentParser
+
     # parse command line args
     aparser = ArgumentParser()
-    aparser.add_argument('input')
+    aparser.add_argument('input', help="program file, '-' for standard input")
+    aparser.add_argument('--backend', choices=sorted(backends), default='headless',
+                         help='drawing backend (default: headless)')
+    aparser.add_argument('--mode', choices=sorted(modes), default='compile',
+                         help='execution mode (default: compile)')
+    aparser.add_argument('-O', dest='level', type=int, choices=range(MAX_LEVEL+1), default=0,
+                         help='optimization level (default: 0)')
+    aparser.add_argument('--frontend', choices=logo_parse.FRONTENDS, default='ply',
+                         help='lexer and parser: PLY or the hand-written one (default: ply)')
+    aparser.add_argument('--png', metavar='FILE',
+                         help='write the drawing to a PNG file')
+    aparser.add_argument('--size', default='800x800',
+                         help='PNG canvas size in pixels, WIDTHxHEIGHT (default: 800x800)')
+    aparser.add_argument('--scale', type=float, default=1.0,
+                         help='PNG pixels per turtle step (default: 1.0)')
+    aparser.add_argument('--antialias', action='store_true',
+                         help='antialias the lines of the PNG')
+    aparser.add_argument('--output', metavar='FILE',
+                         help='write the drawing as vector data to FILE')
+    aparser.add_argument('--format', choices=sorted(formats),
+                         help='format of --output (default: from the extension of FILE, svg otherwise)')
+    aparser.add_argument('--max-steps', type=int, metavar='N',
+                         help='stop the program after N statements')
+    aparser.add_argument('--max-segments', type=int, metavar='N',
+                         help='stop the program when it draws more than N segments')
+    aparser.add_argument('--max-depth', type=int, metavar='N',
+                         help='stop the program when calls nest more than N deep')
+    aparser.add_argument('--max-symbols', type=int, metavar='N',
+                         help='stop the program when it holds more than N variables')
+    aparser.add_argument('--max-time', type=float, metavar='SECONDS',
+                         help='stop the program after SECONDS of wall clock time')
+    aparser.add_argument('--profile', action='store_true',
+                         help='run the program on the tree walker and report where the time goes')
+    aparser.add_argument('--stacks', metavar='FILE',
+                         help='with --profile, write the collapsed call stacks to FILE')
+    aparser.add_argument('--stream', action='store_true',
+                         help='run every top-level statement as soon as it has been read')
 
     args = vars(aparser.parse_args())
+    logo_parse.frontend = args['frontend']
+
+    # the streaming mode reads the program itself
+    import sys
+    if args['input'] == '-' and not args['stream']:
+        input_stream = sys.stdin.read()
+    elif not args['stream']:
+        f = open(args['input'], 'r')
+        input_stream = f.read()
+        f.close()
+
+    if args['png']:
+        # the rasterizer needs NumPy, only load it when it is used
+        from logo_raster import parse_size, render, write_png
+        if args['backend'] == 'tk':
+            aparser.error("--png needs a backend that records the drawing")
+        try:
+            (width, height) = parse_size(args['size'])
+        except ValueError as e:
+            aparser.error(str(e))
+
+    if args['format'] and not args['output']:
+        aparser.error("--format needs --output")
+    if args['output']:
+        if args['backend'] == 'tk':
+            aparser.error("--output needs a backend that records the drawing")
+        if not args['format']:
+            args['format'] = 'jsonl' if args['output'].endswith('.jsonl') else 'svg'
+
+    limits = None
+    quotas = [args['max_steps'], args['max_segments'], args['max_depth'],
+              args['max_symbols'], args['max_time']]
+    if any(quota is not None for quota in quotas):
+        from logo_limits import Limits
+        if args['mode'] != 'compile':
+            aparser.error("resource limits need the compile mode")
+        limits = Limits(*quotas)
+
+    if args['stacks'] and not args['profile']:
+        aparser.error("--stacks needs --profile")
+    if args['profile'] and limits is not None:
+        aparser.error("resource limits need the compile mode, --profile runs on the tree walker")
+
+    if args['stream'] and args['mode'] != 'compile':
+        aparser.error("--stream runs on the closure compiler, it needs the compile mode")
+    if args['stream'] and args['profile']:
+        aparser.error("--profile runs on the tree walker, it cannot be used with --stream")
 
-    f = open(args['input'], 'r')
-    input_stream = f.read()
-    f.close()
+    if args['stream']:
+        # the program is read and executed one top-level unit at a time
+        from logo_stream import run_stream
+        if args['input'] == '-':
+            backend = run_stream(sys.stdin.buffer, backend=backends[args['backend']](),
+                                 level=args['level'], limits=limits)
+        else:
+            f = open(args['input'], 'rb')
+            backend = run_stream(f, backend=backends[args['backend']](), level=args['level'],
+                                 limits=limits)
+            f.close()
+    elif args['profile']:
+        # the report goes to stderr, the program prints to stdout
+        from logo_profile import Profiler
+        profiler = Profiler(backend=backends[args['backend']](), level=args['level'])
+        backend = profiler.run(input_stream)
+        profiler.report(sys.stderr)
+        if args['stacks']:
+            profiler.write_stacks(args['stacks'])
+    else:
+        # execute interpreter
+        backend = interp(input_stream=input_stream, backend=backends[args['backend']](),
+                         mode=args['mode'], level=args['level'], limits=limits)
 
-    # execute interpreter
-    interp(input_stream=input_stream)
\ No newline at end of file
+    if args['png']:
+        write_png(args['png'], render(backend, width, height, args['scale'], args['antialias']))
+    if args['output']:
+        formats[args['format']](args['output'], backend)
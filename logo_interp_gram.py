@@ -1,5 +1,17 @@
-from ply import yacc
-from logo_lex import tokens, lexer
+# Parser for LOGO
+#
+# the parser is built the first time logo_interp_gram.parser is used,
+# importing this module does not load PLY
+#
+# the source span of every statement is recorded in spans by the id of
+# its node.  a span is (line, column, end line, end column) with lines
+# counted from 1, columns from 0 and the end column after the last
+# character of the statement, as in Python's ast module.  spans are only
+# recorded when the parser runs with tracking=True and spans is a
+# dictionary (see logo_parse).
+
+import re
+from logo_lex import tokens
 from logo_state import state
 
 precedence = (
@@ -17,13 +29,15 @@ def p_program(p):
 
 def p_stmt_list(p):
     '''
-    stmt_list : stmt stmt_list
+    stmt_list : stmt_list stmt
               | empty
     '''
+    # statement lists are flat: ('seq', [stmt, stmt, ...])
     if (len(p) == 3):
-        p[0] = ('seq', p[1], p[2])
-    elif (len(p) == 2):
+        p[1][1].append(p[2])
         p[0] = p[1]
+    elif (len(p) == 2):
+        p[0] = ('seq', [])
 
 def p_stmt(p):
     '''
@@ -47,12 +61,14 @@ def p_stmt(p):
          | ID ':' opt_actual_args
          | IF exp '[' stmt_list ']'
     '''
+    # every statement gets a node of its own, constant tuples like ('pu',)
+    # would be shared and spans are recorded by node
     if p[1] == 'cs':
-        p[0] = ('cs',)
+        p[0] = (p[1],)
     elif p[1] == 'pd':
-        p[0] = ('pd',)
+        p[0] = (p[1],)
     elif p[1] == 'pu':
-        p[0] = ('pu',)
+        p[0] = (p[1],)
     elif p[1] == 'fd':
         p[0] = ('fd', p[2])
     elif p[1] == 'bk':
@@ -70,7 +86,7 @@ def p_stmt(p):
     elif p[1] == 'setangle':
         p[0] = ('setangle', p[2])
     elif p[1] == 'stop':
-        p[0] = ('stop',)
+        p[0] = (p[1],)
     elif p[1] == 'setcolor':
         p[0] = ('setcolor', p[2], p[3], p[4])
     elif p[1] == 'repeat':
@@ -88,6 +104,31 @@ def p_stmt(p):
     else:
         raise ValueError("Unexpected instr value: %s" % p[1])
 
+    record_span(p)
+
+# the tokens a statement can end with
+TOKEN = re.compile(r'[a-zA-Z_0-9]+|[<>=]=|\S')
+
+# statement spans by id(node), None when they are not recorded
+spans = None
+
+def column(data, pos):
+    return pos - data.rfind('\n', 0, pos) - 1
+
+def record_span(p):
+    if spans is None:
+        return
+    last = len(p) - 1
+    if p.slice[last].type == 'opt_actual_args' and not p[last][1]:
+        # a call without arguments ends with its ':'
+        last -= 1
+
+    data = p.lexer.lexdata
+    start = p.lexpos(1)
+    end = TOKEN.match(data, p.lexspan(last)[1]).end()
+    spans[id(p[0])] = (p.lineno(1), column(data, start),
+                       p.linespan(last)[1], column(data, end))
+
 def p_exp(p):
     '''
     exp : exp PLUS exp
@@ -123,34 +164,44 @@ def p_opt_formal_args(p):
     opt_formal_args : formal_args
                     | empty
     '''
-    p[0] = p[1]
+    if p[1] == ('nil',):
+        p[0] = ('seq', [])
+    else:
+        p[0] = p[1]
     
 def p_formal_args(p):
     '''
-    formal_args : ID ',' formal_args
+    formal_args : formal_args ',' ID
                 | ID
     '''
+    # argument lists are flat: ('seq', [('id', name), ...])
     if (len(p) == 4):
-        p[0] = ('seq', ('id', p[1]), p[3])
+        p[1][1].append(('id', p[3]))
+        p[0] = p[1]
     elif (len(p) == 2):
-        p[0] = ('seq', ('id', p[1]), ('nil',))
+        p[0] = ('seq', [('id', p[1])])
 
 def p_opt_actual_args(p):
     '''
     opt_actual_args : actual_args
                     | empty
     '''
-    p[0] = p[1]        
+    if p[1] == ('nil',):
+        p[0] = ('seq', [])
+    else:
+        p[0] = p[1]
 
 def p_actual_args(p):
     '''
-    actual_args : exp ',' actual_args
+    actual_args : actual_args ',' exp
                 | exp
     '''
+    # argument lists are flat: ('seq', [exp, ...])
     if (len(p) == 4):
-        p[0] = ('seq', p[1], p[3])
+        p[1][1].append(p[3])
+        p[0] = p[1]
     elif (len(p) == 2):
-        p[0] = ('seq', p[1], ('nil',))   
+        p[0] = ('seq', [p[1]])
 
 def p_uminus_exp(p):
     '''
@@ -164,8 +215,25 @@ def p_empty(p):
     '''
     p[0] = ('nil',)
 
+# number of syntax errors seen, reset before every parse
+errors = 0
+
 def p_error(t):
-    print("Syntax error at '%s'" % t.value)
+    global errors
+    errors += 1
+    if t is None:
+        print("Syntax error at end of input")
+    else:
+        print("Syntax error at '%s'" % t.value)
 
-parser = yacc.yacc(debug=False, tabmodule='logoparsetab')
+def __getattr__(name):
+    # the LALR tables ship prebuilt in logoparsetab.py.  yacc only builds
+    # and writes them again when the grammar no longer matches their
+    # signature
+    global parser
+    if name == 'parser':
+        from ply import yacc
+        parser = yacc.yacc(debug=False, tabmodule='logoparsetab')
+        return parser
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
 
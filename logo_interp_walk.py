@@ -1,85 +1,207 @@
 # A tree walker to interpret LOGO programs
 
 from logo_state import state
-from grammar_stuff import assert_match
-import turtle
-
-s = turtle.getscreen()
-t = turtle.Turtle()
-turtle.mode('logo')
-turtle.speed('fastest')
 
 #########################################################################
-# Use the exception mechanism to return values from function calls
+def assert_match(input, expected):
+    # the node functions check the type of the node they were given
+    if input != expected:
+        raise ValueError("pattern match failed: expected {} but got {}".format(expected, input))
 
-class ReturnValue(Exception):
+#########################################################################
+def len_seq(seq_list):
 
-    def __init__(self, value):
-        self.value = value
+    (SEQ, items) = seq_list
+    assert_match(SEQ, 'seq')
 
-    def __str__(self):
-        return(repr(self.value))
+    return len(items)
 
 #########################################################################
-def len_seq(seq_list):
+def eval_actual_args(args):
 
-    if seq_list[0] == 'nil':
-        return 0
+    (SEQ, exps) = args
+    assert_match(SEQ, 'seq')
 
-    elif seq_list[0] == 'seq':
-        # unpack the seq node
-        (SEQ, p1, p2) = seq_list
+    return ('seq', [walk(exp) for exp in exps])
+    
+#########################################################################
+def declare_formal_args(formal_args, actual_val_args):
 
-        return 1 + len_seq(p2)
+    if len_seq(actual_val_args) != len_seq(formal_args):
+        raise ValueError("actual and formal argument lists do not match")
 
-    else:
-            raise ValueError("unknown node type: {}".format(seq_list[0]))
+    # unpack the args
+    (SEQ, formals) = formal_args
+    (SEQ, vals) = actual_val_args
+
+    # declare the variables
+    for ((ID, sym), val) in zip(formals, vals):
+        state.symbol_table.declare_scalar(sym, val)
 
 #########################################################################
-def eval_actual_args(args):
+def call_setup(node):
+    # evaluate the actual arguments and switch to the function scope;
+    # returns the function body and the symtab config to restore on return
 
-    if args[0] == 'nil':
-        return ('nil',)
+    (CALLFUNC, name, actual_args) = node
+    assert_match(CALLFUNC, 'callfunc')
+    
+    (form, val) = state.symbol_table.lookup_sym(name)
 
-    elif args[0] == 'seq':
-        # unpack the seq node
-        (SEQ, p1, p2) = args
+    if form != 'function':
+        raise ValueError("{} is not a function".format(name))
 
-        val = walk(p1)
+    # unpack the funval tuple
+    (FUNVAL, formal_arglist, body, context) = val
 
-        return ('seq', val, eval_actual_args(p2))
+    if len_seq(formal_arglist) != len_seq(actual_args):
+        raise ValueError("function {} expects {} arguments".format(name, len_seq(formal_arglist)))
 
-    else:
-        raise ValueError("unknown node type: {}".format(args[0]))
-    
-#########################################################################
-def declare_formal_args(formal_args, actual_val_args):
+    # set up the environment for static scoping
+    actual_val_args = eval_actual_args(actual_args)   # evaluate actuals in current symtab
+    save_symtab = state.symbol_table.get_config()        # save current symtab
+    state.symbol_table.set_config(context)               # make function context current symtab
+    state.symbol_table.push_scope()                      # push new function scope
+    declare_formal_args(formal_arglist, actual_val_args) # declare formals in function scope
 
-    if len_seq(actual_val_args) != len_seq(formal_args):
-        raise ValueError("actual and formal argument lists do not match")
+    return (body, save_symtab)
 
-    if formal_args[0] == 'nil':
-        return
+#########################################################################
+def tail_call(node):
+    # set up a call in tail position.  it returns straight to the caller
+    # of the current call, the symtab config of the current call is not
+    # saved
+    (body, save_symtab) = call_setup(node)
+    return body
 
-    # unpack the args
-    (SEQ, (ID, sym), p1) = formal_args
-    (SEQ, val, p2) = actual_val_args
+#########################################################################
+def call_return(save_symtab):
+    # return from a function to the symtab config of the caller
 
-    # declare the variable
-    state.symbol_table.declare_scalar(sym, val)
+    # NOTE: popping the function scope is not necessary because we
+    # are restoring the original symtab configuration
+    state.symbol_table.set_config(save_symtab)
+
+#########################################################################
+# statement lists and procedure calls do not use the Python stack: they
+# run on a stack of frames that lives on the heap.  the current frame is
+# kept in local variables:
+#
+#   stmts - the statements of the list being executed
+#   pc    - the index of the next statement
+#   kind  - 'block', 'repeat' or 'call'
+#   data  - iterations left for 'repeat', the caller's symtab config
+#           for 'call'
+#
+# repeat, if, procedure calls and stop are handled here, all other
+# statements are handed to walk.  'stop' unwinds the frames to the
+# innermost call and returns from it; outside of a procedure it ends the
+# program.  a call in tail position, the last thing a procedure does,
+# takes over the frame of the current call instead of pushing a new one,
+# so tail recursion runs in constant space.
+#
+# steps is a generator that runs a statement list and, when size is
+# given, yields after every size statements so that the caller can
+# interleave the program with other work (see logo_async).  execute runs
+# the list to the end.
+#
+# procedure calls go through call_setup, tail_call and call_return and
+# all other nodes through dispatch_dict, the profiler (logo_profile) hooks into
+# these while it runs.
+#########################################################################
+def execute(stmt_list):
+
+    for step in steps(stmt_list):
+        pass
+
+#########################################################################
+def steps(stmt_list, size=None):
+
+    (SEQ, stmts) = stmt_list
+    assert_match(SEQ, 'seq')
+
+    frames = []
+    pc = 0
+    kind = 'block'
+    data = None
+    count = 0
+
+    while True:
+        if pc == len(stmts):
+            # end of the statement list
+            if kind == 'repeat' and data > 0:
+                data -= 1
+                pc = 0
+                continue
+            if kind == 'call':
+                call_return(data)
+            if not frames:
+                return
+            (stmts, pc, kind, data) = frames.pop()
+            continue
+
+        if size is not None:
+            count += 1
+            if count > size:
+                count = 1
+                yield
+
+        stmt = stmts[pc]
+        pc += 1
+        type = stmt[0]
+
+        if type == 'repeat':
+            (REPEAT, exp, body) = stmt
+            val = walk(exp)
+            if val > 0:
+                frames.append((stmts, pc, kind, data))
+                (SEQ, stmts) = body
+                (pc, kind, data) = (0, 'repeat', val - 1)
+
+        elif type == 'if':
+            (IF, cond, body) = stmt
+            if walk(cond) != 0:
+                frames.append((stmts, pc, kind, data))
+                (SEQ, stmts) = body
+                (pc, kind, data) = (0, 'block', None)
+
+        elif type == 'callfunc':
+            # leave the blocks and the last loop iterations that are done
+            while pc == len(stmts) and frames and (kind == 'block' or kind == 'repeat' and data == 0):
+                (stmts, pc, kind, data) = frames.pop()
+
+            if pc == len(stmts) and kind == 'call':
+                # a tail call returns to where the current call returns
+                (SEQ, stmts) = tail_call(stmt)
+                pc = 0
+            else:
+                (body, save_symtab) = call_setup(stmt)
+                frames.append((stmts, pc, kind, data))
+                (SEQ, stmts) = body
+                (pc, kind, data) = (0, 'call', save_symtab)
+
+        elif type == 'stop':
+            # unwind to the innermost procedure call and return from it
+            while kind != 'call':
+                if not frames:
+                    # 'stop' outside of a procedure ends the program
+                    return
+                (stmts, pc, kind, data) = frames.pop()
+            call_return(data)
+            (stmts, pc, kind, data) = frames.pop()
+
+        else:
+            walk(stmt)
 
-    declare_formal_args(p1, p2)        
-        
 #########################################################################
 # node functions
 #########################################################################
 def seq(node):
     
-    (SEQ, stmt, stmt_list) = node
+    (SEQ, stmts) = node
     assert_match(SEQ, 'seq')
     
-    walk(stmt)
-    walk(stmt_list)
+    execute(node)
 
 #########################################################################
 def nil(node):
@@ -97,7 +219,7 @@ def fd_stmt(node):
     assert_match(FD, 'fd')
     
     val = walk(exp)
-    turtle.forward(val)
+    state.backend.forward(val)
 
 #########################################################################
 def bk_stmt(node):
@@ -106,7 +228,7 @@ def bk_stmt(node):
     assert_match(BK, 'bk')
     
     val = walk(exp)
-    turtle.backward(val)
+    state.backend.backward(val)
 
 #########################################################################
 def rt_stmt(node):
@@ -115,7 +237,7 @@ def rt_stmt(node):
     assert_match(RT, 'rt')
     
     val = walk(exp)
-    turtle.right(val)
+    state.backend.right(val)
 
 #########################################################################
 def lt_stmt(node):
@@ -124,7 +246,7 @@ def lt_stmt(node):
     assert_match(LT, 'lt')
     
     val = walk(exp)
-    turtle.left(val)
+    state.backend.left(val)
     
 #########################################################################
 def circle_stmt(node):
@@ -133,7 +255,7 @@ def circle_stmt(node):
     assert_match(CIRCLE, 'circle')
     
     val = walk(exp)
-    turtle.circle(val)
+    state.backend.circle(val)
     
 #########################################################################
 def setx_stmt(node):
@@ -142,7 +264,7 @@ def setx_stmt(node):
     assert_match(SETX, 'setx')
     
     val = walk(exp)
-    turtle.setx(val)
+    state.backend.setx(val)
 
 #########################################################################
 def sety_stmt(node):
@@ -151,7 +273,7 @@ def sety_stmt(node):
     assert_match(SETY, 'sety')
     
     val = walk(exp)
-    turtle.sety(val)
+    state.backend.sety(val)
     
 #########################################################################
 def setangle_stmt(node):
@@ -161,7 +283,7 @@ def setangle_stmt(node):
     
     val = walk(exp)
     
-    turtle.setheading(val)
+    state.backend.setheading(val)
     
 #########################################################################
 def pd_stmt(node):
@@ -169,7 +291,7 @@ def pd_stmt(node):
     (PD,) = node
     assert_match(PD, 'pd')
     
-    turtle.down()
+    state.backend.pendown()
     
 #########################################################################
 def pu_stmt(node):
@@ -177,7 +299,7 @@ def pu_stmt(node):
     (PU,) = node
     assert_match(PU, 'pu')
     
-    turtle.up()
+    state.backend.penup()
     
 #########################################################################
 def setcolor_stmt(node):
@@ -185,11 +307,11 @@ def setcolor_stmt(node):
     (SETCOLOR, exp1, exp2, exp3) = node
     assert_match(SETCOLOR, 'setcolor')
     
-    r = int(walk(exp1))/255
-    g = int(walk(exp2))/255
-    b = int(walk(exp3))/255
+    r = int(walk(exp1))
+    g = int(walk(exp2))
+    b = int(walk(exp3))
     
-    turtle.pencolor(r, g, b)
+    state.backend.setcolor(r, g, b)
     
 #########################################################################
 def stop_stmt(node):
@@ -197,7 +319,9 @@ def stop_stmt(node):
     (STOP,) = node
     assert_match(STOP, 'stop')
     
-    raise ReturnValue(None)
+    # outside of a procedure 'stop' ends the statement list, execute
+    # returns from procedures
+    execute(('seq', [node]))
 
 #########################################################################
 def repeat_stmt(node):
@@ -205,9 +329,8 @@ def repeat_stmt(node):
     (REPEAT, exp, stmt_list) = node
     assert_match(REPEAT, 'repeat')
     
-    val = walk(exp)
-    for i in range(val):
-        walk(stmt_list)
+    # loops are run by execute
+    execute(('seq', [node]))
 
 #########################################################################
 def assign_stmt(node):
@@ -236,65 +359,26 @@ def cs_stmt(node):
     (CS,) = node
     assert_match(CS, 'cs')
     
-    turtle.clearscreen()
+    state.backend.clearscreen()
 
 #########################################################################
 def declfunc_stmt(node):
-    try: # try the declfunc pattern without arglist
-        (DECLFUNC, name, (NIL,), body) = node
-        assert_match(DECLFUNC, 'declfunc')
-        assert_match(NIL, 'nil')
 
-    except ValueError: # try declfunc with arglist
-        (DECLFUNC, name, arglist, body) = node
-        assert_match(DECLFUNC, 'declfunc')
+    (DECLFUNC, name, arglist, body) = node
+    assert_match(DECLFUNC, 'declfunc')
 
-        context = state.symbol_table.get_config()
-        funval = ('funval', arglist, body, context)
-        state.symbol_table.declare_fun(name, funval)
+    context = state.symbol_table.get_config()
+    funval = ('funval', arglist, body, context)
+    state.symbol_table.declare_fun(name, funval)
 
-    else: # declfunc pattern matched
-        # no arglist is present
-        context = state.symbol_table.get_config()
-        funval = ('funval', ('nil',), body, context)
-        state.symbol_table.declare_fun(name, funval)
-
-    
 #########################################################################
 def callfunc_stmt(node):
     
     (CALLFUNC, name, actual_args) = node
     assert_match(CALLFUNC, 'callfunc')
     
-    (form, val) = state.symbol_table.lookup_sym(name)
-
-    if form != 'function':
-        raise ValueError("{} is not a function".format(name))
-
-    # unpack the funval tuple
-    (FUNVAL, formal_arglist, body, context) = val
-
-    if len_seq(formal_arglist) != len_seq(actual_args):
-        raise ValueError("function {} expects {} arguments".format(sym, len_seq(formal_arglist)))
-
-    # set up the environment for static scoping and then execute the function
-    actual_val_args = eval_actual_args(actual_args)   # evaluate actuals in current symtab
-    save_symtab = state.symbol_table.get_config()        # save current symtab
-    state.symbol_table.set_config(context)               # make function context current symtab
-    state.symbol_table.push_scope()                      # push new function scope
-    declare_formal_args(formal_arglist, actual_val_args) # declare formals in function scope
-
-    return_value = None
-    try:
-        walk(body)                                       # execute the function
-    except ReturnValue as val:
-        return_value = val.value
-
-    # NOTE: popping the function scope is not necessary because we
-    # are restoring the original symtab configuration
-    state.symbol_table.set_config(save_symtab)           # restore original symtab config
-
-    return return_value
+    # procedure calls are run by execute
+    execute(('seq', [node]))
     
 #########################################################################
 def end_stmt(node):
@@ -308,9 +392,8 @@ def if_stmt(node):
     (IF, cond, stmt) = node
     assert_match(IF, 'if')
     
-    value = walk(cond)
-    if value != 0:
-        walk(stmt)
+    # conditionals are run by execute
+    execute(('seq', [node]))
     
 #########################################################################
 def plus_exp(node):
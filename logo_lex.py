@@ -1,5 +1,7 @@
 # Lexer for LOGO
-from ply import lex
+#
+# the lexer is built the first time logo_lex.lexer is used, importing
+# this module does not load PLY
 
 reserved = {
     'fd' : 'FD',
@@ -47,15 +49,28 @@ def t_INTEGER(t):
 
 def t_NEWLINE(t):
     r'\n'
-    pass
+    t.lexer.lineno += 1
 
 def t_COMMENT(t):
     r'//.*'
     pass
     
+# number of illegal characters seen, reset before every parse
+errors = 0
+
 def t_error(t):
+    global errors
+    errors += 1
     print("Illegal character %s" % t.value[0])
     t.lexer.skip(1)
 
-# build the lexer
-lexer = lex.lex(debug=0)
+def __getattr__(name):
+    # build the lexer from the prebuilt table in logolextab.py.  the table
+    # is not checked against the rules above: delete it after changing
+    # them and it is written again when the lexer is built
+    global lexer
+    if name == 'lexer':
+        from ply import lex
+        lexer = lex.lex(debug=0, optimize=1, lextab='logolextab')
+        return lexer
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
@@ -0,0 +1,117 @@
+#########################################################################
+# resource limits for LOGO programs
+#
+# Limits holds the quotas of a run, None means unlimited:
+#
+#   steps    - statements executed; every loop iteration and every
+#              statement in a loop or procedure body counts
+#   segments - line segments drawn
+#   depth    - nested procedure calls
+#   symbols  - variable slots in the frames of the global scope and of
+#              the active procedure calls
+#   time     - wall clock seconds
+#
+# the closure compiler (logo_compile) charges a Governor as the program
+# runs.  the checks are counter comparisons: the step count is compared
+# on every charge, depth and symbols on every call, while the drawing
+# and the clock are looked at only every CHECK_INTERVAL steps.  a
+# program can therefore draw a few more segments or run a little longer
+# than its quota before it is stopped.  a memoized call that is replayed
+# (see logo_memo) is charged the steps of the call it replays and checked
+# right after it, since it can draw a whole recording at once.
+#
+# integers are not limited by a quota but by MAX_BITS: the closure
+# compiler checks the product of every multiplication, which is the only
+# operation that makes numbers grow faster than one bit per step.  a
+# handful of squarings would otherwise make a number so large that a
+# single multiplication runs for hours and the clock is never looked at
+# again.
+#
+# a program that goes over a quota is stopped with LimitExceeded, which
+# tells which limit was exceeded and what the quota was.
+#
+#########################################################################
+
+import time
+
+# steps between checks of the drawing size and the clock
+CHECK_INTERVAL = 1024
+
+# bits of the largest integer a multiplication may produce
+MAX_BITS = 1 << 16
+
+#########################################################################
+class LimitExceeded(ValueError):
+
+    def __init__(self, limit, quota):
+        ValueError.__init__(self, "{} limit of {} exceeded".format(limit, quota))
+        self.limit = limit
+        self.quota = quota
+
+#########################################################################
+class Limits:
+
+    def __init__(self, steps=None, segments=None, depth=None, symbols=None, time=None):
+        self.steps = steps
+        self.segments = segments
+        self.depth = depth
+        self.symbols = symbols
+        self.time = time
+
+#########################################################################
+class Governor:
+    # the resources used by a run so far
+
+    def __init__(self, limits, backend, symbols=0):
+        self.limits = limits
+        self.backend = backend
+        self.steps = 0
+        self.depth = 0
+        self.symbols = symbols
+        self.start = time.monotonic()
+        self.next_check = 0
+        self.check()
+
+    def charge(self, n):
+        # n more steps
+        self.steps += n
+        if self.steps >= self.next_check:
+            self.check()
+
+    def check(self):
+        limits = self.limits
+
+        if limits.steps is not None and self.steps > limits.steps:
+            raise LimitExceeded('steps', limits.steps)
+        if limits.segments is not None and len(self.backend) > limits.segments:
+            raise LimitExceeded('segments', limits.segments)
+        if limits.time is not None and time.monotonic() - self.start > limits.time:
+            raise LimitExceeded('time', limits.time)
+        if limits.symbols is not None and self.symbols > limits.symbols:
+            raise LimitExceeded('symbols', limits.symbols)
+
+        # check again after the interval, or right when the step quota
+        # runs out
+        self.next_check = self.steps + CHECK_INTERVAL
+        if limits.steps is not None:
+            self.next_check = min(self.next_check, limits.steps + 1)
+
+    def size(self, value):
+        # the result of a multiplication, if it is not too large
+        if value.bit_length() > MAX_BITS:
+            raise LimitExceeded('integer bits', MAX_BITS)
+        return value
+
+    def enter(self, slots):
+        # a procedure call with a frame of the given number of slots
+        self.depth += 1
+        self.symbols += slots
+        limits = self.limits
+        if limits.depth is not None and self.depth > limits.depth:
+            raise LimitExceeded('depth', limits.depth)
+        if limits.symbols is not None and self.symbols > limits.symbols:
+            raise LimitExceeded('symbols', limits.symbols)
+
+    def leave(self, slots):
+        self.depth -= 1
+        self.symbols -= slots
@@ -0,0 +1,194 @@
+# Relative-motion memoization of pure turtle procedures
+#
+# a procedure is pure when the only thing it does is drawing: moving and
+# turning the turtle, changing the pen and the color, and calling other
+# pure procedures.  it may only read its formals and its own variables.
+# what such a call draws, relative to the turtle pose it starts from,
+# depends only on its arguments and on the pen and color at the start.
+#
+# the closure compiler (logo_compile) records the drawing of a pure call
+# in the turtle frame of the call, keyed by (procedure, arguments, pen,
+# color), and later calls with the same key replay it with a rigid
+# motion instead of running the procedure again.  a call is only
+# recorded the second time its key comes up: recording costs time
+# proportional to the drawing and a chain of calls that never repeat,
+# like a spiral drawn by recursion, would otherwise record every suffix
+# of the chain.  recursive procedures
+# like a fern or a tree that call themselves with the same arguments
+# over and over are drawn in time linear in the number of distinct
+# calls.
+#
+# a procedure is not pure if it prints, clears the screen, sets an
+# absolute position or heading (setx, sety, setangle), declares
+# procedures, reads a variable of an enclosing scope (its value could
+# change between calls) or calls a procedure that is not pure or that
+# cannot be identified when the program is compiled.
+
+from itertools import count
+from collections import OrderedDict
+
+# bounds of the cache: number of entries and number of recorded segments
+MAX_ENTRIES = 4096
+MAX_SEGMENTS = 1 << 20
+
+# number of keys remembered as seen once
+MAX_SEEN = 1 << 16
+
+# procedure numbers are unique in the process, programs compiled in
+# parts (see logo_session) share one cache
+numbers = count()
+
+#########################################################################
+class ScopeInfo:
+    # the procedures and the assigned slots of a scope
+    def __init__(self, stmts):
+        self.procs = {}
+        self.assigned = set()
+        self.collect(stmts)
+
+    def collect(self, stmts):
+        # loops and conditionals belong to the scope of their statement
+        for stmt in stmts:
+            type = stmt[0]
+            if type == 'assign':
+                self.assigned.add(stmt[3])
+            elif type == 'declfunc':
+                self.procs.setdefault(stmt[4], []).append(stmt)
+            elif type == 'repeat' or type == 'if':
+                (SEQ, body) = stmt[2]
+                self.collect(body)
+
+    def target(self, slot):
+        # the procedure a slot always holds, None if there is no such
+        # procedure
+        procs = self.procs.get(slot, [])
+        if len(procs) != 1 or slot in self.assigned:
+            return None
+        return procs[0]
+
+#########################################################################
+def local_exp(node):
+    # true if an expression only reads variables of the current scope
+    if node[0] == 'id':
+        (ID, name, coords) = node
+        return all(depth == 0 for (depth, slot, bound) in coords)
+    return all(local_exp(c) for c in node[1:] if isinstance(c, tuple))
+
+#########################################################################
+def analyse(stmts, scopes, procs, summary):
+    # find the procedures declared in stmts and check whether the
+    # statements can be part of a pure procedure.  summary is [pure,
+    # callees] of the procedure the statements belong to, None for the
+    # main program
+    for stmt in stmts:
+        type = stmt[0]
+
+        if type == 'declfunc':
+            (DECLFUNC, name, arglist, body, slot, nslots) = stmt
+            (SEQ, body_stmts) = body
+            procs[id(stmt)] = [True, []]
+            analyse(body_stmts, scopes + [ScopeInfo(body_stmts)], procs, procs[id(stmt)])
+            if summary is not None:
+                summary[0] = False
+
+        elif type == 'repeat' or type == 'if':
+            (SEQ, body) = stmt[2]
+            if summary is not None and not local_exp(stmt[1]):
+                summary[0] = False
+            analyse(body, scopes, procs, summary)
+
+        elif summary is None:
+            pass
+
+        elif type in ('fd', 'bk', 'rt', 'lt', 'circle', 'setcolor', 'assign'):
+            if not all(local_exp(c) for c in stmt[1:] if isinstance(c, tuple)):
+                summary[0] = False
+
+        elif type == 'callfunc':
+            (CALLFUNC, name, actual_args, coords) = stmt
+            (SEQ, args) = actual_args
+            if not all(local_exp(arg) for arg in args):
+                summary[0] = False
+            target = None
+            if len(coords) == 1:
+                (depth, slot, bound) = coords[0]
+                if not bound:
+                    target = scopes[-1-depth].target(slot)
+            if target is None:
+                summary[0] = False
+            else:
+                summary[1].append(target)
+
+        elif type not in ('pu', 'pd', 'stop', 'end'):
+            summary[0] = False
+
+#########################################################################
+def pure_procedures(AST):
+    # number the pure procedures of a resolved program.  returns a
+    # dictionary from id(declfunc node) to the procedure number
+    (SEQ, stmts) = AST
+    procs = {}
+    analyse(stmts, [ScopeInfo(stmts)], procs, None)
+
+    # a procedure is pure only if all its callees are; start from all
+    # candidates and drop procedures until nothing changes, so that
+    # recursive procedures stay pure
+    changed = True
+    while changed:
+        changed = False
+        for summary in procs.values():
+            if summary[0] and not all(procs[id(c)][0] for c in summary[1]):
+                summary[0] = False
+                changed = True
+
+    return {key: next(numbers) for key in procs if procs[key][0]}
+
+#########################################################################
+class MotionCache:
+    # recorded drawings of pure calls with least recently used eviction
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.entries = OrderedDict()
+        self.segments = 0
+        self.seen = set()
+        self.palette = backend.palette
+
+    def lookup(self, key):
+        # colors are recorded as palette indices, clearing the screen
+        # makes a new palette and invalidates them
+        if self.palette is not self.backend.palette:
+            self.entries.clear()
+            self.segments = 0
+            self.seen.clear()
+            self.palette = self.backend.palette
+            return None
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def wanted(self, key):
+        # true if a call that missed the cache should be recorded
+        if key in self.seen:
+            return True
+        if len(self.seen) >= MAX_SEEN:
+            self.seen.clear()
+        self.seen.add(key)
+        return False
+
+    def store(self, key, record, steps=0):
+        # entries are (record, steps), steps is what the recorded call
+        # was charged under resource limits (see logo_limits) and what a
+        # replay of it is charged
+        size = len(record[1])
+        if size > MAX_SEGMENTS or self.palette is not self.backend.palette:
+            return
+        if key in self.entries:
+            self.segments -= len(self.entries.pop(key)[0][1])
+        self.entries[key] = (record, steps)
+        self.segments += size
+        while len(self.entries) > MAX_ENTRIES or self.segments > MAX_SEGMENTS:
+            (old, (evicted, evicted_steps)) = self.entries.popitem(last=False)
+            self.segments -= len(evicted[1])
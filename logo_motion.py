@@ -0,0 +1,158 @@
+#########################################################################
+# closed-form evaluation of pure-motion repeat loops
+#
+# a loop body made only of fd/bk/rt/lt with constant operands, pu, pd
+# and nested loops of the same kind with constant counts is a motion
+# program.  motion_ops turns such a body into a tuple of ops:
+#
+#   ('fd', distance)  - signed, bk d becomes ('fd', -d)
+#   ('rt', angle)     - signed, lt a becomes ('rt', -a)
+#   ('pu',) / ('pd',)
+#
+# trace computes the drawing of 'count' repetitions of a motion program
+# at once instead of interpreting every statement.  it traces the body
+# once in its own frame (start at the origin facing north) and then
+# places every iteration with a rigid motion: iteration k starts at
+# P(k) with heading H(k) = H(0) + k*T, where T is the net turn of the
+# body, and P(k+1) = P(k) + R(H(k)) D with D the net displacement of
+# the body.
+#
+# to_local and to_world move points between the world and the frame of
+# a turtle pose with the same rotation, they are used to replay the
+# drawings of memoized procedures (see logo_memo).
+#
+# tolerance: the coordinates differ from the step-by-step path only by
+# floating point rounding.  the error grows with the number of
+# iterations and the size of the drawing and stays below 1e-9 * n * L
+# for n iterations of a drawing spanning L units, e.g. below 1e-3 for a
+# million iterations of a drawing 1000 units across.
+#
+#########################################################################
+
+import math
+from array import array
+from logo_optimize import optimize_node, const
+
+# larger nested loops are not expanded into a single motion program
+MAX_OPS = 10000
+
+#########################################################################
+def motion_ops(stmt_list):
+    # the motion program of a statement list or None if it is not one
+    (SEQ, stmts) = stmt_list
+    ops = []
+
+    for stmt in stmts:
+        type = stmt[0]
+
+        if type in ('fd', 'bk', 'rt', 'lt'):
+            value = const(optimize_node(stmt[1], 1))
+            if value is None:
+                return None
+            if type == 'fd':
+                ops.append(('fd', value))
+            elif type == 'bk':
+                ops.append(('fd', -value))
+            elif type == 'rt':
+                ops.append(('rt', value))
+            else:
+                ops.append(('rt', -value))
+
+        elif type == 'pu' or type == 'pd':
+            ops.append((type,))
+
+        elif type == 'repeat':
+            count = const(optimize_node(stmt[1], 1))
+            body = motion_ops(stmt[2])
+            if count is None or body is None:
+                return None
+            if count > 0:
+                if len(ops) + count*len(body) > MAX_OPS:
+                    return None
+                ops.extend(body * count)
+
+        else:
+            return None
+
+    return tuple(ops)
+
+#########################################################################
+def trace(ops, count, x, y, heading, pen):
+    # run a motion program 'count' times from the given turtle state.
+    # returns (coords, x, y, heading, pen) where coords is a flat list of
+    # x0, y0, x1, y1 for every drawn segment and the rest is the final
+    # turtle state
+
+    # trace the body in its own frame.  pen states before the first pen
+    # op of the body are None: they depend on the iteration
+    ux = 0.0
+    uy = 0.0
+    angle = 0.0
+    body_pen = None
+    moves = []
+    for op in ops:
+        if op[0] == 'fd':
+            a = math.radians(angle)
+            ex = ux + op[1]*math.sin(a)
+            ey = uy + op[1]*math.cos(a)
+            moves.append((ux, uy, ex, ey, body_pen))
+            (ux, uy) = (ex, ey)
+        elif op[0] == 'rt':
+            angle += op[1]
+        elif op[0] == 'pu':
+            body_pen = False
+        else:
+            body_pen = True
+
+    # the segments drawn in the first and in all later iterations
+    first = [m[:4] for m in moves if (pen if m[4] is None else m[4])]
+    if body_pen is not None:
+        pen_after = body_pen
+    else:
+        pen_after = pen
+    later = [m[:4] for m in moves if (pen_after if m[4] is None else m[4])]
+
+    coords = []
+    h = heading
+    for k in range(count):
+        a = math.radians(h)
+        c = math.cos(a)
+        s = math.sin(a)
+        for (sx, sy, ex, ey) in (first if k == 0 else later):
+            coords.extend((x + sx*c + sy*s, y - sx*s + sy*c,
+                           x + ex*c + ey*s, y - ex*s + ey*c))
+        (x, y) = (x + ux*c + uy*s, y - ux*s + uy*c)
+        h = (heading + (k+1)*angle) % 360.0
+
+    if count > 0:
+        pen = pen_after
+
+    return (coords, x, y, h, pen)
+
+#########################################################################
+def to_local(coords, x, y, heading):
+    # flat x, y pairs in world coordinates -> frame of the turtle pose
+    a = math.radians(heading)
+    c = math.cos(a)
+    s = math.sin(a)
+    local = array('d', coords)
+    for i in range(0, len(local), 2):
+        dx = local[i] - x
+        dy = local[i+1] - y
+        local[i] = dx*c - dy*s
+        local[i+1] = dx*s + dy*c
+    return local
+
+#########################################################################
+def to_world(coords, x, y, heading):
+    # flat x, y pairs in the frame of the turtle pose -> world coordinates
+    a = math.radians(heading)
+    c = math.cos(a)
+    s = math.sin(a)
+    world = array('d', coords)
+    for i in range(0, len(world), 2):
+        ux = world[i]
+        uy = world[i+1]
+        world[i] = x + ux*c + uy*s
+        world[i+1] = y - ux*s + uy*c
+    return world
@@ -0,0 +1,205 @@
+# An optimizer for the LOGO AST
+#
+# the optimizer runs between the parser and the execution modes and
+# returns a new AST that computes the same drawing with fewer nodes.
+#
+# level 1: fold expressions with constant operands into 'integer' nodes
+#          and remove 'paren' nodes.  folding uses the same Python
+#          operators as the interpreter, so '/' stays a floor division,
+#          and a division by a constant zero is left for run time.
+#
+# level 2: also fuse adjacent 'fd'/'bk' and adjacent 'rt'/'lt'
+#          statements with constant operands and drop moves and turns by
+#          zero.  moves are only fused when they go in the same direction:
+#          'fd 5 bk 5' draws a line back and forth and is left alone.
+#
+# the statements of the new AST keep the source spans of the statements
+# they come from (state.spans, see logo_parse), a fused statement spans
+# the statements it replaces.
+
+# logo_state imports this module through the backends, the state is
+# looked up when optimize runs
+import logo_state
+
+# the highest optimization level
+MAX_LEVEL = 2
+
+# the spans of the AST being optimized and of the optimized AST
+spans = {}
+new_spans = {}
+
+#########################################################################
+def const(node):
+    # the value of an 'integer' node, None for anything else
+    if node[0] == 'integer':
+        return node[1]
+    return None
+
+#########################################################################
+def move(node):
+    # signed displacement of a constant fd/bk, None for anything else
+    if node[0] == 'fd' or node[0] == 'bk':
+        value = const(node[1])
+        if value is not None:
+            return value if node[0] == 'fd' else -value
+    return None
+
+#########################################################################
+def turn(node):
+    # signed angle of a constant rt/lt, None for anything else
+    if node[0] == 'rt' or node[0] == 'lt':
+        value = const(node[1])
+        if value is not None:
+            return value if node[0] == 'rt' else -value
+    return None
+
+#########################################################################
+def join_spans(first, last):
+    # the span from the start of one span to the end of another
+    if first is None or last is None:
+        return None
+    return (first[0], first[1], last[2], last[3])
+
+#########################################################################
+def peephole(stmts):
+    # fuse runs of constant moves and turns in a statement list
+    out = []
+    for stmt in stmts:
+        d = move(stmt)
+        a = turn(stmt)
+        prev = out[-1] if out else None
+        span = new_spans.get(id(stmt))
+
+        if d is not None and prev is not None and prev[0] == 'move' and prev[1]*d >= 0:
+            out[-1] = ('move', prev[1] + d, join_spans(prev[2], span))
+        elif d is not None:
+            out.append(('move', d, span))
+        elif a is not None and prev is not None and prev[0] == 'turn':
+            out[-1] = ('turn', prev[1] + a, join_spans(prev[2], span))
+        elif a is not None:
+            out.append(('turn', a, span))
+        else:
+            out.append(stmt)
+
+    # turn the fused runs back into statements, dropping the no-ops
+    stmts = []
+    for stmt in out:
+        if stmt[0] == 'move':
+            if stmt[1] > 0:
+                stmts.append(('fd', ('integer', stmt[1])))
+            elif stmt[1] < 0:
+                stmts.append(('bk', ('integer', -stmt[1])))
+        elif stmt[0] == 'turn':
+            if stmt[1] > 0:
+                stmts.append(('rt', ('integer', stmt[1])))
+            elif stmt[1] < 0:
+                stmts.append(('lt', ('integer', -stmt[1])))
+        else:
+            stmts.append(stmt)
+            continue
+
+        if stmt[1] != 0 and stmt[2] is not None:
+            new_spans[id(stmts[-1])] = stmt[2]
+
+    return stmts
+
+#########################################################################
+# node functions
+#########################################################################
+def seq(node, level):
+
+    (SEQ, items) = node
+    items = [optimize_node(item, level) for item in items]
+
+    if level >= 2:
+        items = peephole(items)
+
+    return ('seq', items)
+
+#########################################################################
+def generic(node, level):
+    # optimize the child nodes
+    return tuple(optimize_node(c, level) if isinstance(c, tuple) else c for c in node)
+
+#########################################################################
+def binary_exp(fold):
+    def node_function(node, level):
+        (OP, c1, c2) = node
+        c1 = optimize_node(c1, level)
+        c2 = optimize_node(c2, level)
+
+        v1 = const(c1)
+        v2 = const(c2)
+        if v1 is not None and v2 is not None:
+            value = fold(v1, v2)
+            if value is not None:
+                return ('integer', value)
+
+        return (OP, c1, c2)
+    return node_function
+
+#########################################################################
+def paren_exp(node, level):
+
+    (PAREN, exp) = node
+
+    # parentheses only group, the tree already has the right shape
+    return optimize_node(exp, level)
+
+#########################################################################
+def uminus_exp(node, level):
+
+    (UMINUS, exp) = node
+    exp = optimize_node(exp, level)
+
+    value = const(exp)
+    if value is not None:
+        return ('integer', -value)
+
+    return ('uminus', exp)
+
+#########################################################################
+def optimize_node(node, level):
+    type = node[0]
+    if type in optimize_dict:
+        new = optimize_dict[type](node, level)
+    else:
+        new = generic(node, level)
+
+    span = spans.get(id(node))
+    if span is not None:
+        new_spans[id(new)] = span
+    return new
+
+# a dictionary to associate tree nodes with node functions
+optimize_dict = {
+    'seq'     : seq,
+    '+'       : binary_exp(lambda v1, v2: v1 + v2),
+    '-'       : binary_exp(lambda v1, v2: v1 - v2),
+    '*'       : binary_exp(lambda v1, v2: v1 * v2),
+    '/'       : binary_exp(lambda v1, v2: v1 // v2 if v2 != 0 else None),
+    '<='      : binary_exp(lambda v1, v2: 1 if v1 <= v2 else 0),
+    '=='      : binary_exp(lambda v1, v2: 1 if v1 == v2 else 0),
+    '>='      : binary_exp(lambda v1, v2: 1 if v1 >= v2 else 0),
+    'paren'   : paren_exp,
+    'uminus'  : uminus_exp
+}
+
+#########################################################################
+def optimize(AST, level):
+    # optimize the program at the given level, 0 leaves it unchanged
+    if level < 0 or level > MAX_LEVEL:
+        raise ValueError("unknown optimization level: {}".format(level))
+
+    if level == 0:
+        return AST
+
+    global spans, new_spans
+    state = logo_state.state
+    (spans, new_spans) = (state.spans, {})
+    try:
+        AST = optimize_node(AST, level)
+        state.spans = new_spans
+    finally:
+        (spans, new_spans) = ({}, {})
+    return AST
@@ -0,0 +1,100 @@
+#########################################################################
+# parsing with an on-disk AST cache
+#
+# parse returns the AST of a program.  ASTs are stored in the cache (see
+# logo_cache) under a hash of the program text and GRAMMAR_VERSION, so a
+# program that has been parsed before is loaded without lexing and
+# parsing it.  marshal stores the nested tuples and lists of the AST
+# compactly.
+#
+# programs with illegal characters or syntax errors are not cached, the
+# errors are reported every time they are parsed.
+#
+# with spans=True parse also sets state.spans to the source spans of the
+# statements (see logo_interp_gram) by the id of their node, otherwise
+# state.spans is empty.  tracking the positions slows the parser down,
+# so spans are only recorded for the profiler (see logo_profile), which
+# names procedures after their declaration.  the cache keeps the spans
+# as a list in the order of statements(AST), or None for a program that
+# was parsed without them.
+#
+# the lexer and the parser are only imported when a program is not in the
+# cache.  parse_text parses without the cache.
+#
+# there are two frontends that build the same AST: 'ply' with the PLY
+# lexer and parser (logo_lex, logo_interp_gram) and 'rd' with the
+# hand-written lexer and recursive-descent parser of logo_rdparse, which
+# is faster but stops at the first syntax error.  frontend selects the
+# one programs are parsed with.
+#
+#########################################################################
+
+import logo_cache
+from logo_state import state
+
+# change the version whenever the lexer, the grammar or the AST changes
+GRAMMAR_VERSION = '2'
+
+FRONTENDS = ['ply', 'rd']
+frontend = 'ply'
+
+#########################################################################
+def statements(node):
+    # the statement nodes of an AST, each followed by the statements of
+    # its body
+    (SEQ, stmts) = node
+    for stmt in stmts:
+        yield stmt
+        if stmt[0] == 'repeat' or stmt[0] == 'if':
+            yield from statements(stmt[2])
+        elif stmt[0] == 'declfunc':
+            yield from statements(stmt[3])
+
+#########################################################################
+def parse_text(input_stream, spans=False):
+    # lex and parse a program without the cache.  returns the AST, the
+    # spans of its statements in the order of statements(AST) if spans
+    # is true and None otherwise, and whether the program was free of
+    # errors; a program the parser cannot recover from has an empty AST
+    if frontend == 'rd':
+        import logo_rdparse
+        (AST, stmt_spans, errors) = logo_rdparse.parse(input_stream, spans)
+        state.AST = AST
+        if spans:
+            stmt_spans = [stmt_spans.get(id(stmt)) for stmt in statements(AST)]
+        return (AST, stmt_spans if spans else None, errors == 0)
+
+    import logo_lex
+    import logo_interp_gram
+
+    logo_lex.errors = 0
+    logo_lex.lexer.lineno = 1
+    logo_interp_gram.errors = 0
+    logo_interp_gram.spans = {} if spans else None
+    state.AST = ('seq', [])
+    logo_interp_gram.parser.parse(input_stream, lexer=logo_lex.lexer, tracking=spans)
+    AST = state.AST
+    stmt_spans = None
+    if spans:
+        stmt_spans = [logo_interp_gram.spans.get(id(stmt)) for stmt in statements(AST)]
+    logo_interp_gram.spans = None
+    return (AST, stmt_spans, logo_lex.errors == 0 and logo_interp_gram.errors == 0)
+
+#########################################################################
+def parse(input_stream, spans=False):
+    key = logo_cache.cache_key(GRAMMAR_VERSION, input_stream)
+    entry = logo_cache.load('ast', key)
+
+    if entry is None or (spans and entry[1] is None):
+        # PLY is only loaded when a program has to be parsed
+        (AST, stmt_spans, ok) = parse_text(input_stream, spans)
+        if ok:
+            logo_cache.store('ast', key, (AST, stmt_spans))
+    else:
+        (AST, stmt_spans) = entry
+
+    state.AST = AST
+    state.spans = {}
+    if spans and stmt_spans is not None:
+        state.spans = dict(zip(map(id, statements(AST)), stmt_spans))
+    return AST
@@ -0,0 +1,316 @@
+#########################################################################
+# profiler for LOGO programs
+#
+# a Profiler is an interpreter that runs programs on the tree walker
+# (logo_interp_walk) with hooks in its dispatch table, its procedure
+# calls and the drawing backend, and measures
+#
+#   - the calls and the inclusive and exclusive time of every procedure;
+#     the exclusive time leaves out the procedures it calls and what it
+#     draws
+#   - the visits of every node type.  procedure calls are counted when
+#     they are set up; 'repeat' and 'if' run inside the frame loop of the
+#     walker and only their expressions and bodies are counted
+#   - the time spent parsing, drawing on the backend, setting up and
+#     returning from procedure calls and interpreting everything else
+#
+# report prints these as tables.  write_stacks writes the time of every
+# call stack in the collapsed stack format of flamegraph.pl, inferno or
+# speedscope: one line per stack with the frames separated by ';' and
+# the time in microseconds.  the time spent drawing is a '[draw]' frame
+# on top of the stack that drew.  a procedure appears once on a stack,
+# calls of it under its outermost call, directly or through other
+# procedures, are folded into that call.
+#
+# procedures are named 'name (line:column)' after the source span of
+# their declaration (see logo_parse).  the hooks are only installed while
+# a profiled program runs, the walker has no profiling code of its own.
+#
+#   profiler = Profiler()
+#   profiler.run(program)
+#   profiler.report()
+#   profiler.write_stacks('program.folded')
+#
+#########################################################################
+
+import sys
+from time import perf_counter
+import logo_interp_walk
+from logo_state import state
+from logo_parse import parse, statements
+from logo_optimize import optimize
+from logo_interp import Interpreter
+
+# the backend methods that draw
+DRAWING = ['forward', 'backward', 'right', 'left', 'circle', 'setx', 'sety',
+           'setheading', 'pendown', 'penup', 'setcolor', 'clearscreen',
+           'repeat_motion']
+
+MAIN = 'main'
+DRAW = '[draw]'
+
+#########################################################################
+class ProcedureStats:
+
+    def __init__(self):
+        self.calls = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+        # calls of the procedure that are running, the inclusive time of
+        # a recursive procedure is only counted for its outermost call
+        self.active = 0
+
+#########################################################################
+class Profiler(Interpreter):
+
+    def __init__(self, backend=None, level=0):
+        Interpreter.__init__(self, backend, 'walk', level)
+        self.reset()
+
+    def reset(self):
+        self.procedures = {}
+        self.visits = {}
+
+        # call stacks are numbered, a stack is its caller's number and the
+        # name on top of it.  stacks holds the time of every stack
+        self.paths = {}
+        self.path_list = []
+        self.stacks = {}
+        self.parsing = 0.0
+        self.drawing = 0.0
+        self.calling = 0.0
+        self.total = 0.0
+
+    def execute(self, input_stream):
+        self.reset()
+        start = perf_counter()
+
+        parse(input_stream, spans=True)
+        state.AST = optimize(state.AST, self.level)
+        self.parsing = perf_counter() - start
+
+        # procedure names by the id of their body
+        self.names = {}
+        for stmt in statements(state.AST):
+            if stmt[0] == 'declfunc':
+                span = state.spans.get(id(stmt))
+                name = stmt[1]
+                if span is not None:
+                    name = "{} ({}:{})".format(name, span[0], span[1])
+                self.names[id(stmt[3])] = name
+
+        # the running calls as [stack number, stats, start, time in
+        # callees]
+        self.frames = [[self.path(None, MAIN), self.stats(MAIN), perf_counter(), 0.0]]
+        self.frames[0][1].calls = 1
+        self.frames[0][1].active = 1
+
+        saved = self.install()
+        try:
+            logo_interp_walk.walk(state.AST)
+        finally:
+            self.uninstall(saved)
+            end = perf_counter()
+            while self.frames:
+                self.leave(end)
+            self.total = end - start
+
+    def path(self, caller, name):
+        # the number of the stack with name on top of caller.  a call of
+        # a procedure that is already on the stack, directly or through
+        # other procedures, goes back to the stack of its outermost call:
+        # the stacks of a deep recursion would otherwise take quadratic
+        # space.  stacks therefore hold every procedure once and are
+        # short, walking them is cheap
+        stack = caller
+        while stack is not None:
+            (below, top) = self.path_list[stack]
+            if top == name:
+                return stack
+            stack = below
+
+        key = (caller, name)
+        number = self.paths.get(key)
+        if number is None:
+            number = self.paths[key] = len(self.path_list)
+            self.path_list.append(key)
+        return number
+
+    def stats(self, name):
+        if name not in self.procedures:
+            self.procedures[name] = ProcedureStats()
+        return self.procedures[name]
+
+    #####################################################################
+    # hooks
+    #####################################################################
+    def install(self):
+        # replace the node functions, the call functions and the drawing
+        # methods of the backend by measuring versions, returns what has
+        # to be restored
+        dispatch = logo_interp_walk.dispatch_dict
+        saved = (dict(dispatch), logo_interp_walk.call_setup,
+                 logo_interp_walk.tail_call, logo_interp_walk.call_return)
+
+        # 'repeat', 'if' and 'callfunc' nodes only hand themselves to the
+        # frame loop, calls are counted by call_setup
+        for (type, node_function) in saved[0].items():
+            self.visits[type] = 0
+            if type not in ('repeat', 'if', 'callfunc'):
+                dispatch[type] = self.count(type, node_function)
+
+        logo_interp_walk.call_setup = self.call_setup(saved[1])
+        logo_interp_walk.tail_call = self.tail_call(saved[2])
+        logo_interp_walk.call_return = self.call_return(saved[3])
+
+        backend = state.backend
+        for method in DRAWING:
+            if hasattr(backend, method):
+                setattr(backend, method, self.draw(getattr(backend, method)))
+
+        return saved
+
+    def uninstall(self, saved):
+        (dispatch, call_setup, tail_call, call_return) = saved
+        logo_interp_walk.dispatch_dict.update(dispatch)
+        logo_interp_walk.call_setup = call_setup
+        logo_interp_walk.tail_call = tail_call
+        logo_interp_walk.call_return = call_return
+
+        backend = state.backend
+        for method in DRAWING:
+            if method in vars(backend):
+                delattr(backend, method)
+
+    def count(self, type, node_function):
+        visits = self.visits
+
+        def counted(node):
+            visits[type] += 1
+            return node_function(node)
+
+        return counted
+
+    def call_setup(self, call_setup):
+        names = self.names
+        frames = self.frames
+
+        def setup(node):
+            start = perf_counter()
+            (body, save_symtab) = call_setup(node)
+            now = perf_counter()
+            self.calling += now - start
+            self.visits['callfunc'] += 1
+
+            name = names.get(id(body), node[1])
+            stats = self.stats(name)
+            stats.calls += 1
+            stats.active += 1
+            frames.append([self.path(frames[-1][0], name), stats, now, 0.0])
+            return (body, save_symtab)
+
+        return setup
+
+    def tail_call(self, tail_call):
+
+        def tail(node):
+            # the current call ends here, tail_call sets up the new one
+            # through call_setup
+            self.leave(perf_counter())
+            return tail_call(node)
+
+        return tail
+
+    def call_return(self, call_return):
+
+        def returned(save_symtab):
+            self.leave(perf_counter())
+            start = perf_counter()
+            call_return(save_symtab)
+            self.calling += perf_counter() - start
+
+        return returned
+
+    def leave(self, now):
+        # end the innermost call
+        (stack, stats, start, callees) = self.frames.pop()
+        elapsed = now - start
+
+        stats.active -= 1
+        if stats.active == 0:
+            stats.inclusive += elapsed
+        stats.exclusive += elapsed - callees
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + elapsed - callees
+
+        if self.frames:
+            self.frames[-1][3] += elapsed
+
+    def draw(self, method):
+        frames = self.frames
+
+        def timed(*args):
+            start = perf_counter()
+            result = method(*args)
+            elapsed = perf_counter() - start
+
+            self.drawing += elapsed
+            frame = frames[-1]
+            frame[3] += elapsed
+            stack = self.path(frame[0], DRAW)
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + elapsed
+            return result
+
+        return timed
+
+    #####################################################################
+    # output
+    #####################################################################
+    def report(self, file=None):
+        if file is None:
+            file = sys.stdout
+
+        def ms(seconds):
+            return 1000.0*seconds
+
+        def percent(seconds):
+            return 100.0*seconds/self.total if self.total > 0 else 0.0
+
+        interpreting = self.total - self.parsing - self.drawing - self.calling
+        print("{:14} {:12} {:7}".format('phase', 'ms', '%'), file=file)
+        for (phase, seconds) in [('parsing', self.parsing), ('interpreting', interpreting),
+                                 ('calls', self.calling), ('drawing', self.drawing),
+                                 ('total', self.total)]:
+            print("{:14} {:12.3f} {:6.1f}%".format(phase, ms(seconds), percent(seconds)), file=file)
+
+        print(file=file)
+        print("{:30} {:>10} {:>14} {:>14}".format('procedure', 'calls', 'inclusive ms', 'exclusive ms'),
+              file=file)
+        procedures = sorted(self.procedures.items(), key=lambda item: -item[1].exclusive)
+        for (name, stats) in procedures:
+            print("{:30} {:10} {:14.3f} {:14.3f}".format(
+                  name, stats.calls, ms(stats.inclusive), ms(stats.exclusive)), file=file)
+
+        print(file=file)
+        print("{:30} {:>10}".format('node type', 'visits'), file=file)
+        visits = sorted(self.visits.items(), key=lambda item: -item[1])
+        for (type, count) in visits:
+            if count > 0:
+                print("{:30} {:10}".format(type, count), file=file)
+
+    def names_of(self, stack):
+        names = []
+        while stack is not None:
+            (stack, name) = self.path_list[stack]
+            names.append(name)
+        return reversed(names)
+
+    def write_stacks(self, path):
+        lines = []
+        for (stack, seconds) in self.stacks.items():
+            microseconds = int(round(1e6*seconds))
+            if microseconds > 0:
+                lines.append("{} {}\n".format(';'.join(self.names_of(stack)), microseconds))
+
+        f = open(path, 'w')
+        f.writelines(sorted(lines))
+        f.close()
@@ -0,0 +1,172 @@
+#########################################################################
+# a headless rasterizer for LOGO drawings
+#
+# render draws the segments recorded by a backend (HeadlessBackend or
+# NumpyBackend) into a NumPy RGBA framebuffer and write_png saves the
+# framebuffer as a PNG file, so images can be made without Tk or an X
+# server.  circles are already polygons in the segment buffer.
+#
+# the origin is the center of the canvas, y grows upwards and 'scale' is
+# the number of pixels per turtle step.
+#
+# lines are drawn without a Python loop: every segment is clipped to the
+# canvas, sampled at one point per pixel along its longer axis and all
+# samples are written at once, later segments on top of earlier ones.  with antialiasing each
+# sample is spread over its four neighbouring pixels with bilinear
+# weights and the pixel is blended with the background by its coverage.
+#
+#########################################################################
+
+import struct
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WHITE = (255, 255, 255)
+
+#########################################################################
+def parse_size(text):
+    # canvas size from the command line: 'WIDTHxHEIGHT' or 'SIZE'
+    try:
+        parts = [int(p) for p in text.lower().split('x')]
+    except ValueError:
+        parts = []
+    if len(parts) == 1:
+        parts = parts*2
+    if len(parts) != 2 or parts[0] <= 0 or parts[1] <= 0:
+        raise ValueError("bad canvas size: {}".format(text))
+    return tuple(parts)
+
+#########################################################################
+def clip(x0, y0, x1, y1, xmin, ymin, xmax, ymax):
+    # Liang-Barsky clipping of all segments to a box: the parameters
+    # t0 <= t1 of the part of every segment inside the box and a mask of
+    # the segments that have such a part
+    dx = x1 - x0
+    dy = y1 - y0
+    t0 = np.zeros(len(x0))
+    t1 = np.ones(len(x0))
+    keep = np.ones(len(x0), dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for (p, q) in ((-dx, x0 - xmin), (dx, xmax - x0), (-dy, y0 - ymin), (dy, ymax - y0)):
+            # a segment parallel to an edge is outside when it starts
+            # outside, otherwise the edge moves where it enters or leaves
+            keep &= (p != 0) | (q >= 0)
+            r = q / p
+            t0 = np.where(p < 0, np.maximum(t0, r), t0)
+            t1 = np.where(p > 0, np.minimum(t1, r), t1)
+    keep &= t0 <= t1
+    return (t0, t1, keep)
+
+#########################################################################
+def samples(coords, width, height, scale):
+    # sample points of all segments in pixel coordinates together with
+    # the index of the segment they belong to.  segments are clipped to
+    # the canvas, with a margin for the neighbours antialiasing writes
+    # to, so a line far longer than the canvas costs no more than one
+    # across it and lines off the canvas cost nothing
+    seg = np.asarray(coords, dtype=np.float64).reshape(-1, 4)
+    x0 = width/2.0 + seg[:, 0]*scale
+    y0 = height/2.0 - seg[:, 1]*scale
+    x1 = width/2.0 + seg[:, 2]*scale
+    y1 = height/2.0 - seg[:, 3]*scale
+
+    # one sample per pixel along the longer axis, both end points
+    # included; only the samples on the clipped part are made
+    (t0, t1, keep) = clip(x0, y0, x1, y1, -2.0, -2.0, width + 2.0, height + 2.0)
+    steps = np.maximum(np.ceil(np.maximum(np.abs(x1 - x0), np.abs(y1 - y0))), 1.0)
+    first = np.ceil(t0*steps)
+    last = np.floor(t1*steps)
+    index = np.nonzero(keep & (first <= last))[0]
+    first = first[index].astype(np.int64)
+    n = last[index].astype(np.int64) - first + 1
+
+    owner = np.repeat(np.arange(len(n)), n)
+    start = np.cumsum(n) - n
+    t = (np.arange(n.sum()) - start[owner] + first[owner]) / steps[index][owner]
+
+    segment = index[owner]
+    px = x0[segment] + t*(x1 - x0)[segment]
+    py = y0[segment] + t*(y1 - y0)[segment]
+    return (px, py, segment)
+
+#########################################################################
+def render(backend, width=800, height=800, scale=1.0, antialias=False,
+           background=WHITE):
+    if np is None:
+        raise ImportError("the rasterizer needs NumPy, install it with 'pip install numpy'")
+
+    image = np.empty((height, width, 4), dtype=np.uint8)
+    image[:, :, :3] = background
+    image[:, :, 3] = 255
+
+    if len(backend) == 0:
+        return image
+
+    palette = np.array(backend.palette, dtype=np.float64)
+    colors = np.asarray(backend.colors, dtype=np.int64)
+    (px, py, owner) = samples(backend.coords, width, height, scale)
+
+    if not antialias:
+        ix = np.floor(px).astype(np.int64)
+        iy = np.floor(py).astype(np.int64)
+        inside = (ix >= 0) & (ix < width) & (iy >= 0) & (iy < height)
+        # samples are in drawing order, so the last write to a pixel wins
+        image[iy[inside], ix[inside], :3] = palette[colors[owner[inside]]]
+        return image
+
+    # spread every sample over the four pixels around it; pixel centers
+    # are at half integer coordinates
+    fx = px - 0.5
+    fy = py - 0.5
+    ix = np.floor(fx).astype(np.int64)
+    iy = np.floor(fy).astype(np.int64)
+    wx = fx - ix
+    wy = fy - iy
+
+    coverage = np.zeros(height*width)
+    color = np.zeros(height*width, dtype=np.int64)
+    for (dx, dy, w) in ((0, 0, (1 - wx)*(1 - wy)), (1, 0, wx*(1 - wy)),
+                        (0, 1, (1 - wx)*wy), (1, 1, wx*wy)):
+        x = ix + dx
+        y = iy + dy
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height) & (w > 0)
+        pixel = y[inside]*width + x[inside]
+        np.maximum.at(coverage, pixel, w[inside])
+        color[pixel] = colors[owner[inside]]
+
+    # the two nearest samples of a line both cover a pixel it crosses,
+    # scale the coverage so that a pixel on the line is fully covered
+    alpha = np.minimum(1.0, 2.0*coverage).reshape(height, width, 1)
+    ink = palette[color].reshape(height, width, 3)
+    paper = np.array(background, dtype=np.float64)
+    image[:, :, :3] = np.rint(paper*(1 - alpha) + ink*alpha).astype(np.uint8)
+    return image
+
+#########################################################################
+def png_chunk(kind, data):
+    chunk = kind + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+#########################################################################
+def write_png(path, image):
+    # write an RGBA framebuffer as an 8 bit PNG file
+    (height, width, depth) = image.shape
+    if depth != 4:
+        raise ValueError("expected an RGBA image")
+
+    # every row starts with filter type 0 (none)
+    rows = np.zeros((height, 1 + 4*width), dtype=np.uint8)
+    rows[:, 1:] = image.reshape(height, 4*width)
+
+    png = b'\x89PNG\r\n\x1a\n'
+    png += png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+    png += png_chunk(b'IDAT', zlib.compress(rows.tobytes(), 6))
+    png += png_chunk(b'IEND', b'')
+
+    f = open(path, 'wb')
+    f.write(png)
+    f.close()
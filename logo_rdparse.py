@@ -0,0 +1,341 @@
+# A hand-written lexer and parser for LOGO
+#
+# an alternative to the PLY frontend (logo_lex and logo_interp_gram) that
+# accepts the same language and builds the same AST with the same source
+# spans, without PLY and a good deal faster:
+#
+#   - the lexer is a single compiled regular expression that skips
+#     blanks, newlines and comments and matches one token per match; the
+#     tokens go into parallel lists of kinds, texts and positions
+#   - statements are parsed by recursive descent and expressions by
+#     precedence climbing, statement lists are built as flat lists
+#     directly
+#
+# the parser resolves the conflicts of the grammar the way the LALR
+# tables of PLY do: an ID right after 'name:' is the first argument of
+# the call and an ID right after 'to name' is the first formal, even when
+# a statement could start there.  unary minus binds tighter than any
+# binary operator, except for a '-' between the expressions of setcolor
+# (see setcolor_exp).
+#
+# illegal characters are reported and skipped like the PLY lexer does.
+# the first syntax error is reported like the PLY parser reports it, but
+# parsing stops there: the AST holds the top-level statements before the
+# error, where PLY would try to recover and go on.  the parser recurses
+# once or twice per level of brackets and parentheses, input that nests
+# deeper than the Python stack allows (a few hundred levels) is reported
+# as a syntax error where PLY accepts it.
+#
+# logo_parse uses this frontend when logo_parse.frontend is 'rd'.
+#
+#########################################################################
+
+import re
+import gc
+from logo_lex import reserved
+from logo_interp_gram import TOKEN, column
+
+# one token per match, after any blanks, newlines and comments: an
+# identifier or keyword, an integer, an operator or literal, or a single
+# character that is none of these.  the end of the input matches as an
+# empty token, otherwise a failed match at the end would backtrack into
+# the last comment and find tokens in it
+LEXER = re.compile(r'(?:[ \t\n]|//[^\n]*)*'
+                   r'([a-zA-Z_][a-zA-Z_0-9]*|[0-9]+|>=|<=|==|[-+*/\[\]=():,]|.|\Z)',
+                   re.DOTALL)
+
+# token kinds: keywords and operators are their own kind
+ID = 'ID'
+INTEGER = 'INTEGER'
+EOF = 'EOF'
+
+# the kinds of the keywords, operators and literals
+KINDS = dict((token, token) for token in list(reserved) +
+             ['>=', '<=', '==', '-', '+', '*', '/', '[', ']', '=', '(', ')', ':', ','])
+
+ID_START = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+DIGITS = set('0123456789')
+ILLEGAL = 'ILLEGAL'
+
+# binding power of the binary operators, all of them are left associative
+BINARY = {'<=': 1, '==': 1, '>=': 1, '+': 2, '-': 2, '*': 3, '/': 3}
+
+# the tokens an expression can start with
+EXP_START = {ID, INTEGER, '(', '-'}
+
+# statements of a keyword and one expression
+UNARY_STMTS = {'fd', 'bk', 'rt', 'lt', 'circle', 'setx', 'sety', 'setangle', 'print'}
+
+# statements of a keyword only
+NULLARY_STMTS = {'pd', 'pu', 'stop', 'cs'}
+
+# the tokens a statement can end before
+STMT_END = set(reserved) | {']', EOF}
+
+#########################################################################
+class ParseError(Exception):
+    pass
+
+#########################################################################
+def tokenize(data):
+    # the kinds, texts and start positions of the tokens of a program,
+    # ending with an EOF token, and the number of illegal characters.
+    # the regular expression finds the tokens and their starts in two
+    # passes, each without a Python call per token
+    values = LEXER.findall(data)
+    starts = [m.start(1) for m in LEXER.finditer(data)]
+
+    # the empty tokens at the end of the input become the EOF token
+    end = values.index('')
+    del values[end+1:]
+    del starts[end+1:]
+
+    get = KINDS.get
+    kinds = [get(token) or (ID if token[0] in ID_START else INTEGER if token[0] in DIGITS else ILLEGAL)
+             for token in values[:end]]
+    kinds.append(EOF)
+
+    errors = kinds.count(ILLEGAL)
+    if errors:
+        # report and drop the illegal characters
+        tokens = ([], [], [])
+        for (kind, value, start) in zip(kinds, values, starts):
+            if kind == ILLEGAL:
+                print("Illegal character %s" % value)
+            else:
+                tokens[0].append(kind)
+                tokens[1].append(value)
+                tokens[2].append(start)
+        (kinds, values, starts) = tokens
+
+    return (kinds, values, starts, errors)
+
+#########################################################################
+class Parser:
+
+    def __init__(self, data):
+        self.data = data
+        (self.kinds, self.values, self.starts, self.errors) = tokenize(data)
+        self.pos = 0
+        # (node, first token, last token) of every statement in the order
+        # the statements start
+        self.records = []
+
+    #####################################################################
+    # tokens
+    #####################################################################
+    def expect(self, kind):
+        if self.kinds[self.pos] != kind:
+            self.error()
+        value = self.values[self.pos]
+        self.pos += 1
+        return value
+
+    def error(self):
+        value = self.values[self.pos]
+        if self.kinds[self.pos] == EOF:
+            print("Syntax error at end of input")
+        elif self.kinds[self.pos] == INTEGER:
+            print("Syntax error at '%s'" % int(value))
+        else:
+            print("Syntax error at '%s'" % value)
+        raise ParseError()
+
+    def spans(self):
+        # the spans of the statements by the id of their node, measured as
+        # logo_interp_gram measures them.  the statements are in the order
+        # they start, so their lines are counted in one pass
+        data = self.data
+        starts = self.starts
+        count = data.count
+        rfind = data.rfind
+        match = TOKEN.match
+
+        spans = {}
+        line = 1
+        line_start = 0
+        counted = 0
+        for record in self.records:
+            if record is None:
+                # a statement with a syntax error
+                continue
+            (node, first, last) = record
+            start = starts[first]
+            lines = count('\n', counted, start)
+            if lines:
+                line += lines
+                line_start = rfind('\n', counted, start) + 1
+            counted = start
+
+            end_start = starts[last]
+            end = match(data, end_start).end()
+            lines = count('\n', start, end_start)
+            if lines:
+                end_column = end - rfind('\n', start, end_start) - 1
+            else:
+                end_column = end - line_start
+            spans[id(node)] = (line, start - line_start, line + lines, end_column)
+        return spans
+
+    #####################################################################
+    # statements
+    #####################################################################
+    def program(self):
+        # the top-level statements before a syntax error are kept
+        stmts = []
+        try:
+            self.stmt_list(stmts)
+            if self.kinds[self.pos] != EOF:
+                self.error()
+        except ParseError:
+            self.errors += 1
+        except RecursionError:
+            # blocks and parentheses nest as deep as the Python stack
+            # allows, PLY keeps its own stack
+            print("Syntax error: nesting too deep")
+            self.errors += 1
+        return ('seq', stmts)
+
+    def stmt_list(self, stmts):
+        kinds = self.kinds
+        while True:
+            kind = kinds[self.pos]
+            if kind == ID or (kind in reserved and kind != 'end'):
+                stmts.append(self.stmt())
+            else:
+                return ('seq', stmts)
+
+    def block(self):
+        # '[' stmt_list ']'
+        self.expect('[')
+        body = self.stmt_list([])
+        self.expect(']')
+        return body
+
+    def stmt(self):
+        first = self.pos
+        kind = self.kinds[first]
+        self.pos += 1
+
+        # the record of a statement goes before those of its body
+        records = self.records
+        record = len(records)
+        records.append(None)
+
+        if kind in UNARY_STMTS:
+            node = (kind, self.exp(1))
+        elif kind in NULLARY_STMTS:
+            node = (kind,)
+        elif kind == 'setcolor':
+            exps = []
+            while len(exps) < 2:
+                exps.extend(self.setcolor_exp())
+            if len(exps) < 3:
+                exps.append(self.exp(1))
+            node = ('setcolor', exps[0], exps[1], exps[2])
+        elif kind == 'repeat' or kind == 'if':
+            node = (kind, self.exp(1), self.block())
+        elif kind == 'to':
+            name = self.expect(ID)
+            formals = []
+            if self.kinds[self.pos] == ID:
+                formals.append(('id', self.expect(ID)))
+                while self.kinds[self.pos] == ',':
+                    self.pos += 1
+                    formals.append(('id', self.expect(ID)))
+            body = self.stmt_list([])
+            self.expect('end')
+            node = ('declfunc', name, ('seq', formals), body)
+        else:
+            name = self.values[first]
+            if self.kinds[self.pos] == '=':
+                self.pos += 1
+                node = ('assign', name, self.exp(1))
+            elif self.kinds[self.pos] == ':':
+                self.pos += 1
+                args = []
+                if self.kinds[self.pos] in EXP_START:
+                    args.append(self.exp(1))
+                    while self.kinds[self.pos] == ',':
+                        self.pos += 1
+                        args.append(self.exp(1))
+                node = ('callfunc', name, ('seq', args))
+            else:
+                self.error()
+
+        records[record] = (node, first, self.pos - 1)
+        return node
+
+    #####################################################################
+    # expressions
+    #####################################################################
+    def exp(self, min_power):
+        # an expression of operators that bind at least min_power
+        left = self.unary()
+        kinds = self.kinds
+        while True:
+            op = kinds[self.pos]
+            power = BINARY.get(op)
+            if power is None or power < min_power:
+                return left
+            self.pos += 1
+            left = (op, left, self.exp(power + 1))
+
+    def setcolor_exp(self):
+        # the first or second expression of setcolor.  PLY merges the
+        # states after '-' as a binary and as a unary operator here: the
+        # operand is parsed up to its '*' and '/', and the '-' is unary
+        # and starts the next expression when the statement ends after
+        # the operand, binary otherwise.  returns the expression and the
+        # next one if it started
+        left = self.unary()
+        kinds = self.kinds
+        while True:
+            op = kinds[self.pos]
+            power = BINARY.get(op)
+            if power is None:
+                return [left]
+            self.pos += 1
+            if op != '-':
+                left = (op, left, self.exp(power + 1))
+                continue
+            right = self.exp(3)
+            if kinds[self.pos] in STMT_END:
+                return [left, ('uminus', right)]
+            left = ('-', left, right)
+
+    def unary(self):
+        pos = self.pos
+        kind = self.kinds[pos]
+        if kind == INTEGER:
+            self.pos = pos + 1
+            return ('integer', int(self.values[pos]))
+        if kind == ID:
+            self.pos = pos + 1
+            return ('id', self.values[pos])
+        if kind == '(':
+            self.pos = pos + 1
+            node = ('paren', self.exp(1))
+            self.expect(')')
+            return node
+        if kind == '-':
+            self.pos = pos + 1
+            return ('uminus', self.unary())
+        self.error()
+
+#########################################################################
+def parse(data, spans=True):
+    # returns the AST of a program, the spans of its statements by the id
+    # of their node (empty unless spans is true) and the number of errors.
+    # the AST has no reference
+    # cycles, the garbage collector is paused while it is built or it
+    # would walk the growing tree over and over
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        parser = Parser(data)
+        AST = parser.program()
+        return (AST, parser.spans() if spans else {}, parser.errors)
+    finally:
+        if collecting:
+            gc.enable()
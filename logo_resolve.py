@@ -0,0 +1,156 @@
+# A resolver that gives every variable of a LOGO program a lexical address
+#
+# every procedure body is a scope and gets a frame at run time.  a frame
+# is a list: element 0 is the frame of the enclosing scope (the defining
+# environment of the procedure) and the other elements are the slots of
+# the names declared in the scope, formals first and then assigned names
+# and declared procedures in the order they appear.
+#
+# the resolver rewrites the nodes that refer to names:
+#
+#   ('id', name)                   -> ('id', name, coords)
+#   ('assign', name, exp)          -> ('assign', name, exp, slot)
+#   ('declfunc', name, args, body) -> ('declfunc', name, args, body, slot, nslots)
+#   ('callfunc', name, args)       -> ('callfunc', name, args, coords)
+#
+# coords is a tuple of (depth, slot, bound) triples, one for every scope
+# that declares the name, innermost first.  depth is the number of parent
+# links to follow from the current frame.  a slot declared by an
+# assignment stays empty until the assignment runs and in the meantime
+# LOGO reads the variable of an enclosing scope, which is why a name can
+# have more than one candidate.  formals are always bound, so the search
+# ends at the first formal.
+#
+# names that are not declared in any enclosing scope are reported here,
+# before the program runs.  a program that is resolved in parts as it is
+# read (see logo_stream) has an extensible global scope instead: a name
+# may be declared by a part that comes later, so names that are not
+# declared yet get a global slot and are only reported when they are
+# read before anything is assigned to them.
+
+#########################################################################
+class Scope:
+
+    def __init__(self, parent, formals, extensible=False):
+        self.parent = parent
+        self.extensible = extensible
+        self.slots = {}
+        for name in formals:
+            if name in self.slots:
+                raise ValueError("symbol {} already declared".format(name))
+            self.declare(name)
+        self.formals = set(formals)
+
+    def declare(self, name):
+        # slot 0 holds the link to the enclosing frame
+        if name not in self.slots:
+            self.slots[name] = len(self.slots) + 1
+
+    def size(self):
+        return len(self.slots)
+
+    def coords(self, name):
+        coords = []
+        scope = self
+        depth = 0
+        while scope is not None:
+            if scope.extensible:
+                scope.declare(name)
+            if name in scope.slots:
+                bound = name in scope.formals
+                coords.append((depth, scope.slots[name], bound))
+                if bound:
+                    break
+            scope = scope.parent
+            depth += 1
+
+        if not coords:
+            raise ValueError("{} was not declared".format(name))
+
+        return tuple(coords)
+
+#########################################################################
+def declare_block(stmts, scope):
+    # enter the names a statement list declares into its scope; bodies of
+    # loops and conditionals belong to the same scope
+    for stmt in stmts:
+        type = stmt[0]
+        if type == 'assign' or type == 'declfunc':
+            scope.declare(stmt[1])
+        elif type == 'repeat' or type == 'if':
+            (SEQ, body) = stmt[2]
+            declare_block(body, scope)
+
+#########################################################################
+# node functions
+#########################################################################
+def seq(node, scope):
+
+    (SEQ, items) = node
+    return ('seq', [resolve_node(item, scope) for item in items])
+
+#########################################################################
+def generic(node, scope):
+    # nodes that do not refer to names: resolve the child nodes
+    return tuple(resolve_node(c, scope) if isinstance(c, tuple) else c for c in node)
+
+#########################################################################
+def assign_stmt(node, scope):
+
+    (ASSIGN, name, exp) = node
+    return ('assign', name, resolve_node(exp, scope), scope.slots[name])
+
+#########################################################################
+def declfunc_stmt(node, scope):
+
+    (DECLFUNC, name, arglist, body) = node
+    (SEQ, formals) = arglist
+
+    fscope = Scope(scope, [sym for (ID, sym) in formals])
+    (SEQ, stmts) = body
+    declare_block(stmts, fscope)
+    body = seq(body, fscope)
+
+    return ('declfunc', name, arglist, body, scope.slots[name], fscope.size())
+
+#########################################################################
+def callfunc_stmt(node, scope):
+
+    (CALLFUNC, name, actual_args) = node
+    return ('callfunc', name, seq(actual_args, scope), scope.coords(name))
+
+#########################################################################
+def id_exp(node, scope):
+
+    (ID, name) = node
+    return ('id', name, scope.coords(name))
+
+#########################################################################
+def resolve_node(node, scope):
+    type = node[0]
+    if type in resolve_dict:
+        return resolve_dict[type](node, scope)
+    else:
+        return generic(node, scope)
+
+# a dictionary to associate tree nodes with node functions
+resolve_dict = {
+    'seq'     : seq,
+    'assign'  : assign_stmt,
+    'declfunc': declfunc_stmt,
+    'callfunc': callfunc_stmt,
+    'id'      : id_exp
+}
+
+#########################################################################
+def resolve(AST, scope=None):
+    # resolve a program; returns the rewritten AST and the global scope.
+    # passing the scope of an earlier resolve adds to it, existing names
+    # keep their slots.
+    if scope is None:
+        scope = Scope(None, ())
+
+    (SEQ, stmts) = AST
+    declare_block(stmts, scope)
+
+    return (seq(AST, scope), scope)
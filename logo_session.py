@@ -0,0 +1,260 @@
+# Incremental execution of LOGO programs for notebook and REPL sessions
+#
+# a session runs a program and keeps what it needs to run an edited
+# version of the program quickly:
+#
+#   - the program is split into top-level units: every top-level
+#     statement is a unit, a 'to ... end' declaration or a 'repeat' with
+#     its body included.  units are parsed one by one and the ASTs of the
+#     units of the last run are kept by text, so only units whose text
+#     changed are parsed again.
+#
+#   - before each unit runs, the session takes a snapshot of the global
+#     variable frame and of the drawing.  running an edited program
+#     restores the snapshot taken before the first unit that changed and
+#     executes the program from there on.  the units before it are
+#     neither parsed nor executed again.
+#
+# units run on the closure compiler (logo_compile).  the global names
+# are resolved in one scope that lives as long as the session, so a name
+# keeps its slot in the global frame from one run to the next and the
+# procedures declared by units that are not executed again stay valid.
+# when an edit removes the last declaration of a name, the scope is
+# built again from the current units and the whole program runs again,
+# since the units before the edit may refer to the slot of that name.
+#
+# the session borrows the global state (see logo_state) while it runs
+# and leaves it as it was.
+#
+# a unit that fails, or that ends the program with a top-level 'stop',
+# did not run to the end and is executed again by the next run.  the
+# units after a top-level 'stop' are not executed.
+#
+# a backend without snapshots (Tk) is cleared and the whole program is
+# executed again on every run; the parsed units are still reused.
+#
+#   session = Session()
+#   session.run(program)        # runs everything
+#   session.run(edited_program) # runs from the first changed unit on
+
+import re
+from logo_state import state
+from logo_lex import reserved
+from logo_parse import parse
+from logo_optimize import optimize
+from logo_resolve import Scope, resolve, declare_block
+import logo_compile
+
+# tokens of the unit scanner: comments, names and keywords, integers,
+# two character operators and everything else one character at a time
+TOKEN = re.compile(r'//[^\n]*|[a-zA-Z_][a-zA-Z_0-9]*|[0-9]+|<=|>=|==|\S')
+
+# the last whitespace character of a text
+LAST_SPACE = re.compile(r'\s\S*\Z')
+
+#########################################################################
+class UnitScanner:
+    # splits a program that arrives in pieces into the texts of its
+    # top-level units.  a unit starts at a statement keyword or at a name
+    # followed by '=' or ':' (an assignment or a call) outside of
+    # brackets and declarations, so a unit is complete when the first
+    # token of the next one has been read.  feed returns the units that
+    # are complete and close the rest.  only the text of the current
+    # unit is kept.
+
+    def __init__(self):
+        self.text = ''
+        # where scanning goes on, where the current unit starts and where
+        # its last token ends
+        self.pos = 0
+        self.start = None
+        self.end = None
+        # the last token as (word, start, end), whether it starts a unit
+        # depends on the token after it
+        self.pending = None
+        self.brackets = 0
+        self.procs = 0
+
+    def feed(self, text):
+        self.text += text
+
+        # a token at the end of the text may go on in the next piece,
+        # scan up to the last whitespace only
+        m = LAST_SPACE.search(self.text, self.pos)
+        if m is None:
+            return []
+        units = self.scan(m.start(), False)
+
+        # drop the text of the units that are done
+        keep = self.pos
+        if self.pending is not None:
+            keep = self.pending[1]
+        if self.start is not None:
+            keep = self.start
+        if keep > 0:
+            self.text = self.text[keep:]
+            self.pos -= keep
+            if self.start is not None:
+                self.start -= keep
+                self.end -= keep
+            if self.pending is not None:
+                (word, start, end) = self.pending
+                self.pending = (word, start - keep, end - keep)
+
+        return units
+
+    def close(self):
+        units = self.scan(len(self.text), True)
+        if self.pending is not None:
+            self.token(self.pending, None, units)
+        if self.start is not None:
+            units.append(self.text[self.start:self.end])
+        self.__init__()
+        return units
+
+    def scan(self, endpos, final):
+        units = []
+        for m in TOKEN.finditer(self.text, self.pos, endpos):
+            word = m.group()
+            if word.startswith('//'):
+                # a comment ends at a newline, it may go on in the next
+                # piece if the scan stopped at another whitespace
+                if m.end() == endpos and not final and self.text[endpos] != '\n':
+                    break
+            else:
+                if self.pending is not None:
+                    self.token(self.pending, word, units)
+                self.pending = (word, m.start(), m.end())
+            self.pos = m.end()
+        return units
+
+    def token(self, token, following, units):
+        (word, start, end) = token
+        if self.start is None:
+            self.start = start
+        elif self.brackets == 0 and self.procs == 0:
+            if word in reserved or (word[0].isalpha() or word[0] == '_') and following in ('=', ':'):
+                units.append(self.text[self.start:self.end])
+                self.start = start
+
+        if word == '[':
+            self.brackets += 1
+        elif word == ']':
+            self.brackets = max(0, self.brackets - 1)
+        elif word == 'to':
+            self.procs += 1
+        elif word == 'end':
+            self.procs = max(0, self.procs - 1)
+        self.end = end
+
+#########################################################################
+def split_units(program):
+    # split a program into the texts of its top-level units
+    scanner = UnitScanner()
+    return scanner.feed(program) + scanner.close()
+
+#########################################################################
+class Session:
+
+    def __init__(self, backend=None, level=0):
+        # the global state is only borrowed, as Interpreter.run does
+        previous = state.copy()
+        try:
+            state.initialize(backend)
+            self.backend = state.backend
+        finally:
+            state.load(previous)
+        self.level = level
+
+        # optimized ASTs of the units by text
+        self.asts = {}
+
+        # the units of the last run, the number of units that ran to the
+        # end and the snapshots taken before the first unit and after each
+        # unit that ran to the end
+        self.units = []
+        self.done = 0
+        self.snapshots = []
+
+        # the global scope and frame
+        self.scope = Scope(None, ())
+        self.frame = [None]
+
+    def snapshot(self):
+        return (list(self.frame), self.backend.snapshot())
+
+    def restore(self, snapshot):
+        # the frame is restored in place, procedures declared at the top
+        # level hold on to it as their defining environment
+        (frame, drawing) = snapshot
+        self.frame[:] = frame + [logo_compile.UNSET] * (len(self.frame) - len(frame))
+        self.backend.restore(drawing)
+
+    def unit_AST(self, text):
+        if text not in self.asts:
+            self.asts[text] = optimize(parse(text), self.level)
+        return self.asts[text]
+
+    def run(self, program):
+        # run a program, executing only the units from the first one that
+        # changed since the last run.  returns the backend
+        units = split_units(program)
+        previous = state.copy()
+        try:
+            state.backend = self.backend
+            asts = [self.unit_AST(text) for text in units]
+            # the ASTs of units that were edited away are not needed again
+            self.asts = dict(zip(units, asts))
+            self.execute(units, asts)
+        finally:
+            state.load(previous)
+
+        return self.backend
+
+    def execute(self, units, asts):
+        # the global names of all units, declared first as a whole program
+        # run would
+        scope = Scope(None, ())
+        for (SEQ, stmts) in asts:
+            declare_block(stmts, scope)
+
+        if not hasattr(self.backend, 'snapshot') or any(name not in scope.slots for name in self.scope.slots):
+            # the units that ran may hold the slots of names that are no
+            # longer declared: run everything again in the scope of the
+            # current units, so that the frame does not keep them
+            start = 0
+            self.scope = scope
+        else:
+            # the first unit that changed or that did not run to the end.
+            # new names get slots after the existing ones
+            start = 0
+            limit = min(len(units), self.done)
+            while start < limit and units[start] == self.units[start]:
+                start += 1
+            for name in scope.slots:
+                self.scope.declare(name)
+
+        if hasattr(self.backend, 'snapshot'):
+            if not self.snapshots:
+                self.snapshots.append(self.snapshot())
+            self.restore(self.snapshots[start])
+            del self.snapshots[start+1:]
+        else:
+            self.backend.clearscreen()
+            self.frame[:] = [None]
+
+        self.units = units
+        self.done = start
+
+        del self.frame[self.scope.size() + 1:]
+        self.frame.extend([logo_compile.UNSET] * (self.scope.size() + 1 - len(self.frame)))
+
+        memo = logo_compile.motion_cache()
+        for i in range(start, len(units)):
+            (AST, scope) = resolve(asts[i], self.scope)
+            block = logo_compile.compile_program(AST)
+            if logo_compile.execute(block, self.frame, memo) == logo_compile.STOPPED:
+                break
+            self.done = i + 1
+            if self.snapshots:
+                self.snapshots.append(self.snapshot())
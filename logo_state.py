@@ -1,14 +1,40 @@
 from logo_symtab import SymTab
+from logo_backend import HeadlessBackend
 
 class State:
     def __init__(self):
         self.initialize()
 
-    def initialize(self):
+    def initialize(self, backend=None, limits=None):
         # symbol table to hold variable-value associations
         self.symbol_table = SymTab()
 
         # when done parsing this variable will hold our AST
         self.AST = None
 
-state = State()
\ No newline at end of file
+        # source spans of the statements of the AST by id(node), see
+        # logo_parse
+        self.spans = {}
+
+        # the drawing backend receives all turtle commands
+        self.backend = backend if backend is not None else HeadlessBackend()
+
+        # resource limits of the program (see logo_limits), None for none
+        self.limits = limits
+
+    def load(self, other):
+        # take over the symbol table, AST, spans, backend and limits of
+        # another state
+        self.symbol_table = other.symbol_table
+        self.AST = other.AST
+        self.spans = other.spans
+        self.backend = other.backend
+        self.limits = other.limits
+
+    def copy(self):
+        # a state with the same contents
+        other = State.__new__(State)
+        other.load(self)
+        return other
+
+state = State()
@@ -0,0 +1,92 @@
+# Streaming execution of LOGO programs
+#
+# run_stream reads a program from a file in chunks and executes every
+# top-level unit (a statement, a 'to ... end' declaration or a 'repeat'
+# with its body, see UnitScanner in logo_session) as soon as it is
+# complete.  a unit is parsed, resolved, compiled and run on the closure
+# compiler (logo_compile) and its AST is dropped before the next one is
+# read, so memory is bounded by the largest unit, the variables, the
+# procedures and the drawing however long the program is, and the first
+# units draw before the rest of the program has been generated.  a unit
+# is complete when the first token of the next one has been read.  the
+# units that are complete after a read are parsed and run together, they
+# are in memory already and each unit on its own would pay for setting
+# up the parser and the compiler.
+#
+# the units are resolved one after the other in a global scope that
+# grows as the program is read.  a procedure may use a global variable
+# that a later unit assigns, so the global scope is extensible (see
+# logo_resolve): a name that is not declared anywhere is reported when
+# it is read before anything is assigned to it, not before the program
+# runs.
+#
+# units are parsed without the AST cache.  a unit with syntax errors is
+# reported and runs as far as the parser recovered, as it would in the
+# whole program.  a top-level 'stop' ends the program and the rest of
+# the input is not read.
+#
+#   run_stream(sys.stdin.buffer)
+#   run_stream(open('program.logo', 'rb'))
+
+import codecs
+import logo_compile
+from logo_state import state
+from logo_parse import parse_text
+from logo_optimize import optimize
+from logo_resolve import Scope, resolve
+from logo_session import UnitScanner
+from logo_limits import Governor
+
+# bytes or characters read at a time
+CHUNK = 1 << 16
+
+#########################################################################
+def units(stream, size=CHUNK):
+    # the texts of the top-level units of a program read from a binary
+    # or text file, a list of the units that are complete after each
+    # read.  read1 returns what a pipe has available instead of waiting
+    # for a full chunk
+    read = getattr(stream, 'read1', stream.read)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    scanner = UnitScanner()
+
+    while True:
+        data = read(size)
+        if not data:
+            break
+        if isinstance(data, bytes):
+            data = decoder.decode(data)
+        yield scanner.feed(data)
+
+    yield scanner.feed(decoder.decode(b'', True)) + scanner.close()
+
+#########################################################################
+def run_stream(stream, backend=None, level=0, limits=None, size=CHUNK):
+    # run a program unit by unit as it is read and return the backend
+    state.initialize(backend, limits)
+
+    scope = Scope(None, (), extensible=True)
+    frame = [None]
+    memo = logo_compile.motion_cache()
+    governor = None
+    if limits is not None:
+        governor = Governor(limits, state.backend)
+
+    for batch in units(stream, size):
+        if not batch:
+            continue
+        (AST, spans, ok) = parse_text('\n'.join(batch))
+        (AST, scope) = resolve(optimize(AST, level), scope)
+
+        # the global frame grows with the scope, procedures declared by
+        # earlier units hold on to it as their defining environment
+        added = scope.size() + 1 - len(frame)
+        frame.extend([logo_compile.UNSET] * added)
+        if governor is not None:
+            governor.symbols += added
+
+        block = logo_compile.compile_program(AST, governor)
+        if logo_compile.execute(block, frame, memo, governor) == logo_compile.STOPPED:
+            break
+
+    return state.backend
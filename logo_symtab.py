@@ -1,83 +1,95 @@
 #########################################################################
 # symbol table for LOGO
 #
-# it is a scoped symbol table with a dictionary at each scope level
+# it is a scoped symbol table with a dictionary at each scope level.
+# the scopes form a chain of environments linked to their parent: the
+# current scope is the head of the chain and the global scope its tail.
+#
+# links are never changed once they are made, so a configuration is
+# simply a pointer to the head of a chain.  capturing the context of a
+# function, entering a call and returning from it are constant time.
 #
 #########################################################################
 
-CURR_SCOPE = 0
+class Env:
+    # one scope of the chain
+    __slots__ = ('symbols', 'parent')
+
+    def __init__(self, parent):
+        self.symbols = {}
+        self.parent = parent
 
 class SymTab:
 
     def __init__(self):
         # global scope dictionary must always be present
-        self.scoped_symtab = [{}]
+        self.env = Env(None)
 
     def get_config(self):
-        # we make a shallow copy of the symbol table
-        return list(self.scoped_symtab)
+        # the chain is never modified, sharing it is safe
+        return self.env
 
     def set_config(self, c):
-        self.scoped_symtab = c
+        self.env = c
 
     def push_scope(self):
-        # push a new dictionary onto the stack - stack grows to the left
-        self.scoped_symtab.insert(CURR_SCOPE,{})
+        # push a new dictionary onto the chain
+        self.env = Env(self.env)
 
     def pop_scope(self):
-        # pop the left most dictionary off the stack
-        if len(self.scoped_symtab) == 1:
+        # pop the current dictionary off the chain
+        if self.env.parent is None:
             raise ValueError("cannot pop the global scope")
         else:
-            self.scoped_symtab.pop(CURR_SCOPE)
+            self.env = self.env.parent
 
     def declare_scalar(self, sym, init):
-        # declare the scalar in the current scope: dict @ position 0
+        # declare the scalar in the current scope
 
         # first we need to check whether the symbol was already declared
         # at this scope
-        if sym in self.scoped_symtab[CURR_SCOPE]:
+        if sym in self.env.symbols:
             raise ValueError("symbol {} already declared".format(sym))
 
         # enter the symbol in the current scope
-        self.scoped_symtab[CURR_SCOPE].update({sym:('scalar', init)})
+        self.env.symbols[sym] = ('scalar', init)
 
     def declare_fun(self, sym, init):
-        # declare a function in the current scope: dict @ position 0
+        # declare a function in the current scope
 
         # first we need to check whether the symbol was already declared
         # at this scope
-        if sym in self.scoped_symtab[CURR_SCOPE]:
+        if sym in self.env.symbols:
             raise ValueError("symbol {} already declared".format(sym))
 
         # enter the function in the current scope
-        self.scoped_symtab[CURR_SCOPE].update({sym:('function', init)})
+        self.env.symbols[sym] = ('function', init)
 
     def lookup_sym(self, sym):
-        # find the first occurence of sym in the symtab stack
+        # find the first occurence of sym in the scope chain
         # and return the associated value
 
-        n_scopes = len(self.scoped_symtab)
-
-        for scope in range(n_scopes):
-            if sym in self.scoped_symtab[scope]:
-                val = self.scoped_symtab[scope].get(sym)
-                return val
+        env = self.env
+        while env is not None:
+            symbols = env.symbols
+            if sym in symbols:
+                return symbols[sym]
+            env = env.parent
 
         # not found
         raise ValueError("{} was not declared".format(sym))
 
     def update_sym(self, sym, val):
-        # find the first occurence of sym in the symtab stack
+        # find the first occurence of sym in the scope chain
         # and update the associated value
 
-        n_scopes = len(self.scoped_symtab)
-
-        for scope in range(n_scopes):
-            if sym in self.scoped_symtab[scope]:
-                scope_dict = self.scoped_symtab[scope]
-                scope_dict[sym] = val
+        env = self.env
+        while env is not None:
+            symbols = env.symbols
+            if sym in symbols:
+                symbols[sym] = val
                 return
+            env = env.parent
 
         # not found
         raise ValueError("{} was not declared".format(sym))
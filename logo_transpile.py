@@ -0,0 +1,499 @@
+# A transpiler from LOGO to Python
+#
+# every procedure becomes a Python function whose formals are Python
+# locals and the top-level program becomes the function _main.  'repeat'
+# becomes a for loop, 'stop' a return and arithmetic is plain Python
+# arithmetic, so the generated code runs at CPython speed.
+#
+# a procedure that calls itself in tail position runs its body in a
+# 'while True' loop: the tail call assigns the actuals to the formals and
+# continues the loop, so tail recursion does not grow the Python stack.
+#
+# LOGO names are prefixed with 'v_' so that they cannot clash with Python
+# keywords or with the helpers in the namespace of the generated code.
+# top-level names are globals of that namespace, names assigned in a
+# procedure are its locals and nested procedures see the names of the
+# enclosing ones through Python closures, which gives the same static
+# scoping as the symbol table.
+#
+# calls, declarations and errors behave like in the other modes: a call
+# that may not refer to a procedure with the right number of formals goes
+# through a check that raises the same ValueError, a declaration of a name
+# that may be bound already is checked at run time and the recursion
+# limit is raised while the program runs, so deep recursion does not stop
+# it early.
+#
+# a program is translated only if Python's scoping rules give the same
+# result as LOGO's, e.g. a procedure must not read one of its own locals
+# before it has certainly been assigned (LOGO would read the outer
+# variable in that case).  other programs run on the closure compiler.
+#
+# the compiled code object of a program is cached on disk under a hash of
+# the program text and the grammar and transpiler versions, so that
+# running a known program again skips both parsing and code generation.
+# programs with syntax errors are not cached.
+
+import sys
+import builtins
+from types import FunctionType
+import logo_cache
+import logo_compile
+from logo_optimize import optimize
+from logo_state import state
+
+# bump this whenever the generated code changes
+TRANSPILE_VERSION = '3'
+
+# calls between Python functions do not use the C stack from CPython 3.11
+# on, so the recursion limit can be raised while the generated code runs
+DEEP_CALLS = sys.version_info >= (3, 11)
+MAX_DEPTH = 1 << 22
+
+#########################################################################
+class Unsupported(ValueError):
+    pass
+
+#########################################################################
+def mangle(name):
+    return 'v_' + name
+
+#########################################################################
+def seq_list(node):
+    # the elements of a ('seq', [...]) list
+    if node[0] != 'seq':
+        raise ValueError("unknown node type: {}".format(node[0]))
+
+    (SEQ, items) = node
+    return items
+
+#########################################################################
+class Scope:
+
+    def __init__(self, parent, formals, body):
+        self.parent = parent
+        self.formals = set(formals)
+
+        # names this scope assigns to and procedures it declares;
+        # nested procedure bodies are scopes of their own
+        self.scalars = set()
+        self.functions = set()
+        self.declarations = {}
+        self.arity = {}
+        self.scan(body)
+
+        # the number of loops around the code being generated, see
+        # declfunc_stmt
+        self.loops = 0
+
+        # the self calls in tail position of a procedure by id(node), see
+        # declfunc_stmt
+        self.tail_calls = set()
+
+        # names that are certainly bound at the current point of the
+        # code generation
+        self.definite = set(formals)
+
+        if len(self.formals) != len(formals):
+            raise Unsupported("duplicate formal argument")
+
+    def scan(self, node):
+        type = node[0]
+        if type == 'seq':
+            for stmt in seq_list(node):
+                self.scan(stmt)
+        elif type == 'assign':
+            self.scalars.add(node[1])
+        elif type == 'declfunc':
+            self.functions.add(node[1])
+            self.declarations[node[1]] = self.declarations.get(node[1], 0) + 1
+            self.arity[node[1]] = len(seq_list(node[2]))
+        elif type == 'repeat' or type == 'if':
+            self.scan(node[2])
+
+    def local(self, name):
+        return name in self.formals or name in self.scalars or name in self.functions
+
+    def binding(self, name):
+        # the scope that binds name, None if no scope declares it
+        scope = self
+        while scope is not None and not scope.local(name):
+            scope = scope.parent
+        return scope
+
+    def arity_of(self, name):
+        # the number of formals of the procedure name refers to if it can
+        # only refer to one procedure declaration, None otherwise
+        scope = self.binding(name)
+        if scope is None or name not in scope.functions:
+            return None
+        if scope.declarations[name] > 1 or name in scope.scalars or name in scope.formals:
+            return None
+        return scope.arity[name]
+
+    def check(self, name):
+        # make sure that Python binds name to the same variable as LOGO
+        if self.parent is None:
+            # top-level names are globals of the generated code
+            return
+
+        if self.local(name):
+            if name not in self.definite:
+                raise Unsupported("{} may be read before it is assigned".format(name))
+            return
+
+        scope = self.parent
+        while scope.parent is not None:
+            if scope.local(name):
+                if name in scope.scalars and name not in scope.formals:
+                    raise Unsupported("{} is a local of an enclosing procedure".format(name))
+                return
+            scope = scope.parent
+
+#########################################################################
+# statement node functions
+#########################################################################
+def seq(node, scope, indent, out):
+
+    stmts = seq_list(node)
+    if not stmts:
+        out.append(indent + 'pass')
+
+    for stmt in stmts:
+        gen_stmt(stmt, scope, indent, out)
+
+#########################################################################
+def nil(node, scope, indent, out):
+
+    out.append(indent + 'pass')
+
+#########################################################################
+def unary_stmt(helper):
+    # statements that pass the value of one expression to a helper
+    def node_function(node, scope, indent, out):
+        (STMT, exp) = node
+        out.append(indent + '{}({})'.format(helper, gen_exp(exp, scope)))
+    return node_function
+
+#########################################################################
+def simple_stmt(helper):
+    # statements without operands
+    def node_function(node, scope, indent, out):
+        out.append(indent + '{}()'.format(helper))
+    return node_function
+
+#########################################################################
+def setcolor_stmt(node, scope, indent, out):
+
+    (SETCOLOR, exp1, exp2, exp3) = node
+    out.append(indent + '_setcolor(int({}), int({}), int({}))'.format(
+        gen_exp(exp1, scope), gen_exp(exp2, scope), gen_exp(exp3, scope)))
+
+#########################################################################
+def stop_stmt(node, scope, indent, out):
+
+    # 'stop' outside of a procedure returns from _main and ends the program
+    out.append(indent + 'return')
+
+#########################################################################
+def repeat_stmt(node, scope, indent, out):
+
+    (REPEAT, exp, stmt_list) = node
+    out.append(indent + 'for _ in range({}):'.format(gen_exp(exp, scope)))
+    scope.loops += 1
+    gen_nested(stmt_list, scope, indent, out)
+    scope.loops -= 1
+
+#########################################################################
+def assign_stmt(node, scope, indent, out):
+
+    (ASSIGN, name, exp) = node
+    out.append(indent + '{} = {}'.format(mangle(name), gen_exp(exp, scope)))
+    scope.definite.add(name)
+
+#########################################################################
+def tail_calls(stmts, name, nformals, calls):
+    # add the calls of name with nformals actuals in tail position of a
+    # statement list to calls: the last statement, the statement before a
+    # 'stop' and the tail calls of an 'if' in tail position.  the body of
+    # a 'repeat' is never in tail position
+    for (i, stmt) in enumerate(stmts):
+        if i + 1 < len(stmts) and stmts[i+1][0] != 'stop':
+            continue
+        if stmt[0] == 'callfunc' and stmt[1] == name and len(seq_list(stmt[2])) == nformals:
+            calls.add(id(stmt))
+        elif stmt[0] == 'if':
+            tail_calls(seq_list(stmt[2]), name, nformals, calls)
+
+#########################################################################
+def declfunc_stmt(node, scope, indent, out):
+
+    (DECLFUNC, name, arglist, body) = node
+    formals = [sym for (ID, sym) in seq_list(arglist)]
+    fscope = Scope(scope, formals, body)
+
+    # the name refers to this procedure in its body if the procedure does
+    # not bind the name itself and it is the only binding of the name in
+    # the declaring scope.  the loop keeps the locals of the call it
+    # replaces, so procedures that declare procedures, which must not be
+    # bound yet when they are declared, make real calls
+    if not fscope.local(name) and scope.declarations[name] == 1 and name not in scope.scalars \
+       and not fscope.functions:
+        tail_calls(seq_list(body), name, len(formals), fscope.tail_calls)
+    fscope.formal_list = formals
+
+    # a name can only be declared once in a scope.  the name may be bound
+    # already if it is a formal, if the scope assigns or declares it
+    # elsewhere or if the declaration runs more than once
+    if name in scope.formals or name in scope.scalars or scope.declarations[name] > 1 or scope.loops:
+        out.append(indent + 'try:')
+        out.append(indent + '    {}'.format(mangle(name)))
+        out.append(indent + 'except NameError:')
+        out.append(indent + '    pass')
+        out.append(indent + 'else:')
+        out.append(indent + '    _redeclared({!r})'.format(name))
+
+    out.append(indent + 'def {}({}):'.format(mangle(name), ', '.join(map(mangle, formals))))
+    if fscope.tail_calls:
+        out.append(indent + '    while True:')
+        seq(body, fscope, indent + '        ', out)
+        out.append(indent + '        return')
+    else:
+        seq(body, fscope, indent + '    ', out)
+    scope.definite.add(name)
+
+#########################################################################
+def callfunc_stmt(node, scope, indent, out):
+
+    (CALLFUNC, name, actual_args) = node
+    scope.check(name)
+    args = [gen_exp(arg, scope) for arg in seq_list(actual_args)]
+
+    if id(node) in scope.tail_calls:
+        # start the body again with the new actuals
+        if args:
+            out.append(indent + '{} = {}'.format(', '.join(map(mangle, scope.formal_list)), ', '.join(args)))
+        out.append(indent + 'continue')
+        return
+
+    if scope.binding(name) is None or scope.arity_of(name) == len(args):
+        # an undeclared name is reported when it is read, a procedure
+        # with the right number of formals needs no checks
+        out.append(indent + '{}({})'.format(mangle(name), ', '.join(args)))
+    else:
+        out.append(indent + '_function({}, {!r}, {})({})'.format(
+            mangle(name), name, len(args), ', '.join(args)))
+
+#########################################################################
+def if_stmt(node, scope, indent, out):
+
+    (IF, cond, stmt) = node
+    out.append(indent + 'if {} != 0:'.format(gen_exp(cond, scope)))
+    gen_nested(stmt, scope, indent, out)
+
+#########################################################################
+def gen_nested(stmt_list, scope, indent, out):
+    # assignments in a loop or conditional body do not count as certain
+    # once the body is done
+    definite = set(scope.definite)
+    seq(stmt_list, scope, indent + '    ', out)
+    scope.definite = definite
+
+#########################################################################
+# expression node functions
+#########################################################################
+def binary_exp(template):
+    def node_function(node, scope):
+        (OP, c1, c2) = node
+        return template.format(gen_exp(c1, scope), gen_exp(c2, scope))
+    return node_function
+
+#########################################################################
+def integer_exp(node, scope):
+
+    (INTEGER, value) = node
+    return repr(value)
+
+#########################################################################
+def id_exp(node, scope):
+
+    (ID, name) = node
+    scope.check(name)
+    return mangle(name)
+
+#########################################################################
+def paren_exp(node, scope):
+
+    (PAREN, exp) = node
+    return gen_exp(exp, scope)
+
+#########################################################################
+def uminus_exp(node, scope):
+
+    (UMINUS, exp) = node
+    return '(-{})'.format(gen_exp(exp, scope))
+
+#########################################################################
+# gen
+#########################################################################
+def gen_stmt(node, scope, indent, out):
+    type = node[0]
+    if type in stmt_dict:
+        return stmt_dict[type](node, scope, indent, out)
+    else:
+        raise ValueError("gen_stmt: unknown tree node type: " + type)
+
+def gen_exp(node, scope):
+    type = node[0]
+    if type in exp_dict:
+        return exp_dict[type](node, scope)
+    else:
+        raise ValueError("gen_exp: unknown tree node type: " + type)
+
+# dictionaries to associate tree nodes with node functions
+stmt_dict = {
+    'seq'     : seq,
+    'nil'     : nil,
+    'fd'      : unary_stmt('_forward'),
+    'bk'      : unary_stmt('_backward'),
+    'rt'      : unary_stmt('_right'),
+    'lt'      : unary_stmt('_left'),
+    'circle'  : unary_stmt('_circle'),
+    'setx'    : unary_stmt('_setx'),
+    'sety'    : unary_stmt('_sety'),
+    'setangle': unary_stmt('_setheading'),
+    'pd'      : simple_stmt('_pendown'),
+    'pu'      : simple_stmt('_penup'),
+    'stop'    : stop_stmt,
+    'setcolor': setcolor_stmt,
+    'repeat'  : repeat_stmt,
+    'assign'  : assign_stmt,
+    'print'   : unary_stmt('print'),
+    'cs'      : simple_stmt('_clearscreen'),
+    'declfunc': declfunc_stmt,
+    'callfunc': callfunc_stmt,
+    'end'     : nil,
+    'if'      : if_stmt
+}
+
+exp_dict = {
+    '+'       : binary_exp('({} + {})'),
+    '-'       : binary_exp('({} - {})'),
+    '*'       : binary_exp('({} * {})'),
+    '/'       : binary_exp('({} // {})'),
+    '<='      : binary_exp('(1 if {} <= {} else 0)'),
+    '=='      : binary_exp('(1 if {} == {} else 0)'),
+    '>='      : binary_exp('(1 if {} >= {} else 0)'),
+    'integer' : integer_exp,
+    'id'      : id_exp,
+    'paren'   : paren_exp,
+    'uminus'  : uminus_exp
+}
+
+#########################################################################
+def transpile(AST):
+    # generate the Python source for a program
+    scope = Scope(None, (), AST)
+    out = ['def _main():']
+
+    names = sorted(scope.scalars | scope.functions)
+    if names:
+        out.append('    global ' + ', '.join(map(mangle, names)))
+
+    seq(AST, scope, '    ', out)
+    return '\n'.join(out) + '\n'
+
+#########################################################################
+def compile_program(AST):
+    # programs that CPython cannot compile, e.g. with more than 20 nested
+    # loops or very deeply nested expressions, run on the closure compiler
+    try:
+        return compile(transpile(AST), '<logo>', 'exec')
+    except (SyntaxError, RecursionError, MemoryError) as e:
+        raise Unsupported("the generated code does not compile: {}".format(e))
+
+#########################################################################
+# the checks of the generated code, with the errors of the other modes
+#########################################################################
+def function(value, name, nargs):
+    # the procedure a call refers to
+    if type(value) is not FunctionType:
+        raise ValueError("{} is not a function".format(name))
+    nformals = value.__code__.co_argcount
+    if nformals != nargs:
+        raise ValueError("function {} expects {} arguments".format(name, nformals))
+    return value
+
+def redeclared(name):
+    raise ValueError("symbol {} already declared".format(name))
+
+#########################################################################
+def execute(code):
+    # run a code object produced by compile_program
+    backend = state.backend
+    namespace = {
+        '__builtins__' : builtins,
+        '_forward'     : backend.forward,
+        '_backward'    : backend.backward,
+        '_right'       : backend.right,
+        '_left'        : backend.left,
+        '_circle'      : backend.circle,
+        '_setx'        : backend.setx,
+        '_sety'        : backend.sety,
+        '_setheading'  : backend.setheading,
+        '_pendown'     : backend.pendown,
+        '_penup'       : backend.penup,
+        '_setcolor'    : backend.setcolor,
+        '_clearscreen' : backend.clearscreen,
+        '_function'    : function,
+        '_redeclared'  : redeclared
+    }
+    exec(code, namespace)
+
+    # procedure calls are Python calls, the other modes nest calls as
+    # deep as memory allows
+    limit = sys.getrecursionlimit()
+    if DEEP_CALLS:
+        sys.setrecursionlimit(max(limit, MAX_DEPTH))
+    try:
+        namespace['_main']()
+    except NameError as e:
+        # unbound names are undeclared LOGO variables
+        if e.name and e.name.startswith('v_'):
+            raise ValueError("{} was not declared".format(e.name[2:]))
+        raise
+    finally:
+        sys.setrecursionlimit(limit)
+
+#########################################################################
+def run(AST):
+    try:
+        code = compile_program(AST)
+    except Unsupported:
+        logo_compile.run(AST)
+    else:
+        execute(code)
+
+#########################################################################
+def run_source(input_stream, level=0):
+    # run a program from its text using the code object cache
+    from logo_parse import GRAMMAR_VERSION
+
+    key = logo_cache.cache_key(GRAMMAR_VERSION, TRANSPILE_VERSION, str(level), input_stream)
+    code = logo_cache.load('py', key)
+
+    if code is None:
+        from logo_parse import parse_text
+
+        # programs with errors are not cached so that the errors are
+        # reported every time they run
+        (AST, spans, ok) = parse_text(input_stream)
+        state.AST = optimize(AST, level)
+        try:
+            code = compile_program(state.AST)
+        except Unsupported:
+            logo_compile.run(state.AST)
+            return
+        if ok:
+            logo_cache.store('py', key, code)
+
+    execute(code)
@@ -0,0 +1,126 @@
+#########################################################################
+# vector output of LOGO drawings
+#
+# write_svg and write_jsonl write the segments recorded by a backend
+# (HeadlessBackend or NumpyBackend) as vector data, for tools that want
+# the lines themselves rather than the pixels of logo_raster:
+#
+#   svg   - an SVG document with one <polyline> per polyline, y grows
+#           upwards like in the turtle's world and the view box is the
+#           bounding box of the drawing
+#   jsonl - JSON Lines, one record per polyline:
+#           {"color":[r,g,b],"points":[x0,y0,x1,y1,...]}
+#
+# polylines joins segments of the same color that start where the one
+# before ended, so a run of moves becomes a single path.  the segment
+# buffer is read CHUNK segments at a time, polylines are cut after
+# MAX_POINTS points and the file is written through a large buffer, so
+# the writers take the same memory for a drawing of a hundred segments
+# and one of millions.
+#
+#########################################################################
+
+import json
+
+# segments read from the buffer at a time
+CHUNK = 1 << 16
+
+# points of the longest polyline
+MAX_POINTS = 1 << 12
+
+# output buffer size in bytes
+BUFFER = 1 << 20
+
+# room around the drawing in the SVG view box, in turtle steps
+MARGIN = 2.0
+
+#########################################################################
+def chunks(backend, size=CHUNK):
+    # the coordinates and color indices of the segments as lists, size
+    # segments at a time.  array.array and NumPy arrays both slice and
+    # convert with tolist
+    coords = backend.coords
+    colors = backend.colors
+    n = len(backend)
+    for start in range(0, n, size):
+        stop = min(start + size, n)
+        yield (coords[4*start:4*stop].tolist(), colors[start:stop].tolist())
+
+#########################################################################
+def polylines(backend, size=CHUNK, max_points=MAX_POINTS):
+    # the drawing as (color, points) in drawing order, color is an index
+    # into the palette and points a flat list x0, y0, x1, y1, ...
+    color = None
+    points = []
+    for (coords, colors) in chunks(backend, size):
+        for k in range(len(colors)):
+            (x0, y0, x1, y1) = coords[4*k:4*k+4]
+            c = colors[k]
+            if c != color or x0 != points[-2] or y0 != points[-1] or len(points) >= 2*max_points:
+                if points:
+                    yield (color, points)
+                color = c
+                points = [x0, y0]
+            points.append(x1)
+            points.append(y1)
+    if points:
+        yield (color, points)
+
+#########################################################################
+def bounds(backend, size=CHUNK):
+    # (xmin, ymin, xmax, ymax) of the drawing or None if it is empty
+    box = None
+    for (coords, colors) in chunks(backend, size):
+        xs = coords[0::2]
+        ys = coords[1::2]
+        if box is None:
+            box = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            box = (min(box[0], min(xs)), min(box[1], min(ys)),
+                   max(box[2], max(xs)), max(box[3], max(ys)))
+    return box
+
+#########################################################################
+def hex_color(rgb):
+    return '#{:02x}{:02x}{:02x}'.format(*(int(c) for c in rgb))
+
+#########################################################################
+def write_svg(path, backend):
+    box = bounds(backend) or (0.0, 0.0, 0.0, 0.0)
+    (xmin, ymin, xmax, ymax) = box
+    width = xmax - xmin + 2*MARGIN
+    height = ymax - ymin + 2*MARGIN
+
+    palette = [hex_color(rgb) for rgb in backend.palette]
+
+    f = open(path, 'w', buffering=BUFFER)
+    f.write('<svg xmlns="http://www.w3.org/2000/svg" width="{0:.3f}" height="{1:.3f}" '
+            'viewBox="{2:.3f} {3:.3f} {0:.3f} {1:.3f}">\n'.format(
+            width, height, xmin - MARGIN, -ymax - MARGIN))
+    f.write('<g fill="none" stroke-width="1" stroke-linecap="round" stroke-linejoin="round">\n')
+    for (color, points) in polylines(backend):
+        # SVG's y axis points down
+        flipped = list(points)
+        flipped[1::2] = [-y for y in points[1::2]]
+        f.write('<polyline stroke="{}" points="{}"/>\n'.format(
+                palette[color], ' '.join(['%.3f,%.3f'] * (len(points)//2)) % tuple(flipped)))
+    f.write('</g>\n</svg>\n')
+    f.close()
+
+#########################################################################
+def write_jsonl(path, backend):
+    palette = [list(rgb) for rgb in backend.palette]
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+
+    f = open(path, 'w', buffering=BUFFER)
+    for (color, points) in polylines(backend):
+        f.write(dumps({'color': palette[color], 'points': points}))
+        f.write('\n')
+    f.close()
+
+#########################################################################
+# output formats selectable by name, e.g. from the command line
+formats = {
+    'svg'   : write_svg,
+    'jsonl' : write_jsonl
+}
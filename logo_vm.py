@@ -0,0 +1,491 @@
+# A bytecode compiler and stack machine for LOGO programs
+#
+# the compiler turns the AST into code objects.  every code object holds a
+# flat instruction array of (opcode, argument) pairs together with its
+# constant and name tables.  each procedure declared with 'to ... end'
+# gets its own code object, stored in the constant table of the code
+# that declares it.
+#
+# the machine runs the instructions in a single dispatch loop over a value
+# stack.  procedure calls push a frame onto a frame stack that we manage
+# ourselves, so deep recursion in LOGO does not grow the Python stack.
+# a call right before a return is compiled to TAIL_CALL, which reuses the
+# frame of the current call, so tail recursion runs in constant space.
+# 'stop' outside of a procedure ends the program.
+
+from array import array
+from logo_state import state
+
+#########################################################################
+# opcodes
+#########################################################################
+LOAD_CONST = 0    # push consts[arg]
+LOAD_NAME = 1     # push the value of names[arg]
+STORE_NAME = 2    # pop a value and assign it to names[arg]
+ADD = 3
+SUB = 4
+MUL = 5
+DIV = 6           # integer (floor) division
+LEQ = 7
+EQ = 8
+GEQ = 9
+NEG = 10
+JUMP = 11         # continue at arg
+JUMP_IF_ZERO = 12 # pop a value and continue at arg if it is 0
+FOR_ITER = 13     # decrement the repeat counter on top of the stack,
+                  # pop it and continue at arg when it is used up
+CALL = 14         # call the procedure named by consts[arg] = (name, argc)
+RETURN = 15       # return from the current procedure
+MAKE_FUNCTION = 16 # declare the procedure in consts[arg]
+FD = 17
+BK = 18
+RT = 19
+LT = 20
+CIRCLE = 21
+SETX = 22
+SETY = 23
+SETANGLE = 24
+PENCOLOR = 25     # pop blue, green and red
+PD = 26
+PU = 27
+CS = 28
+PRINT = 29
+HALT = 30
+TAIL_CALL = 31    # call like CALL, returning to the caller of the current
+                  # procedure
+
+opnames = ['LOAD_CONST', 'LOAD_NAME', 'STORE_NAME', 'ADD', 'SUB', 'MUL',
+           'DIV', 'LEQ', 'EQ', 'GEQ', 'NEG', 'JUMP', 'JUMP_IF_ZERO',
+           'FOR_ITER', 'CALL', 'RETURN', 'MAKE_FUNCTION', 'FD', 'BK', 'RT', 'LT',
+           'CIRCLE', 'SETX', 'SETY', 'SETANGLE', 'PENCOLOR', 'PD', 'PU',
+           'CS', 'PRINT', 'HALT', 'TAIL_CALL']
+
+# opcodes whose argument is an instruction offset
+jump_ops = (JUMP, JUMP_IF_ZERO, FOR_ITER)
+
+#########################################################################
+class Code:
+
+    def __init__(self, name, formals):
+        self.name = name
+        self.formals = formals
+        # flat instruction array: opcode, argument, opcode, argument, ...
+        self.code = array('l')
+        self.consts = []
+        self.names = []
+        # the indices of the constants and names, the type is part of the
+        # key so that 1 and 1.0 stay apart
+        self.const_numbers = {}
+        self.name_numbers = {}
+
+    def emit(self, op, arg=0):
+        # append an instruction and return its offset
+        offset = len(self.code)
+        self.code.append(op)
+        self.code.append(arg)
+        return offset
+
+    def patch(self, offset, arg):
+        # fill in the argument of a forward jump
+        self.code[offset+1] = arg
+
+    def const(self, value):
+        # return the index of value in the constant table
+        key = (type(value), value)
+        i = self.const_numbers.get(key)
+        if i is None:
+            i = self.const_numbers[key] = len(self.consts)
+            self.consts.append(value)
+        return i
+
+    def name_index(self, name):
+        # return the index of name in the name table
+        i = self.name_numbers.get(name)
+        if i is None:
+            i = self.name_numbers[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+#########################################################################
+def seq_list(node):
+    # the elements of a ('seq', [...]) list
+    if node[0] != 'seq':
+        raise ValueError("unknown node type: {}".format(node[0]))
+
+    (SEQ, items) = node
+    return items
+
+#########################################################################
+# node functions
+#########################################################################
+def seq(node, code):
+
+    for stmt in seq_list(node):
+        emit(stmt, code)
+
+#########################################################################
+def nil(node, code):
+
+    pass
+
+#########################################################################
+def unary_stmt(op):
+    # statements that pop one value and hand it to the turtle
+    def node_function(node, code):
+        (STMT, exp) = node
+        emit(exp, code)
+        code.emit(op)
+    return node_function
+
+#########################################################################
+def simple_stmt(op):
+    # statements without operands
+    def node_function(node, code):
+        code.emit(op)
+    return node_function
+
+#########################################################################
+def setcolor_stmt(node, code):
+
+    (SETCOLOR, exp1, exp2, exp3) = node
+    emit(exp1, code)
+    emit(exp2, code)
+    emit(exp3, code)
+    code.emit(PENCOLOR)
+
+#########################################################################
+def repeat_stmt(node, code):
+
+    (REPEAT, exp, stmt_list) = node
+    emit(exp, code)
+    loop = code.emit(FOR_ITER)
+    emit(stmt_list, code)
+    code.emit(JUMP, loop)
+    code.patch(loop, len(code.code))
+
+#########################################################################
+def assign_stmt(node, code):
+
+    (ASSIGN, name, exp) = node
+    emit(exp, code)
+    code.emit(STORE_NAME, code.name_index(name))
+
+#########################################################################
+def declfunc_stmt(node, code):
+
+    (DECLFUNC, name, arglist, body) = node
+    formals = tuple(sym for (ID, sym) in seq_list(arglist))
+
+    fcode = Code(name, formals)
+    emit(body, fcode)
+    fcode.emit(RETURN)
+
+    # a call that is followed by a return is a tail call
+    for pc in range(0, len(fcode.code) - 2, 2):
+        if fcode.code[pc] == CALL and fcode.code[pc+2] == RETURN:
+            fcode.code[pc] = TAIL_CALL
+
+    code.emit(MAKE_FUNCTION, code.const(fcode))
+
+#########################################################################
+def callfunc_stmt(node, code):
+
+    (CALLFUNC, name, actual_args) = node
+    args = seq_list(actual_args)
+    for arg in args:
+        emit(arg, code)
+    code.emit(CALL, code.const((name, len(args))))
+
+#########################################################################
+def if_stmt(node, code):
+
+    (IF, cond, stmt) = node
+    emit(cond, code)
+    jump = code.emit(JUMP_IF_ZERO)
+    emit(stmt, code)
+    code.patch(jump, len(code.code))
+
+#########################################################################
+def binary_exp(op):
+    def node_function(node, code):
+        (OP, c1, c2) = node
+        emit(c1, code)
+        emit(c2, code)
+        code.emit(op)
+    return node_function
+
+#########################################################################
+def integer_exp(node, code):
+
+    (INTEGER, value) = node
+    code.emit(LOAD_CONST, code.const(value))
+
+#########################################################################
+def id_exp(node, code):
+
+    (ID, name) = node
+    code.emit(LOAD_NAME, code.name_index(name))
+
+#########################################################################
+def paren_exp(node, code):
+
+    (PAREN, exp) = node
+    emit(exp, code)
+
+#########################################################################
+def uminus_exp(node, code):
+
+    (UMINUS, exp) = node
+    emit(exp, code)
+    code.emit(NEG)
+
+#########################################################################
+# emit
+#########################################################################
+def emit(node, code):
+    # node format: (TYPE, [child1[, child2[, ...]]])
+    type = node[0]
+    if type in emit_dict:
+        node_function = emit_dict[type]
+        return node_function(node, code)
+    else:
+        raise ValueError("emit: unknown tree node type: " + type)
+
+# a dictionary to associate tree nodes with node functions
+emit_dict = {
+    'seq'     : seq,
+    'nil'     : nil,
+    'fd'      : unary_stmt(FD),
+    'bk'      : unary_stmt(BK),
+    'rt'      : unary_stmt(RT),
+    'lt'      : unary_stmt(LT),
+    'circle'  : unary_stmt(CIRCLE),
+    'setx'    : unary_stmt(SETX),
+    'sety'    : unary_stmt(SETY),
+    'setangle': unary_stmt(SETANGLE),
+    'pd'      : simple_stmt(PD),
+    'pu'      : simple_stmt(PU),
+    'stop'    : simple_stmt(RETURN),
+    'setcolor': setcolor_stmt,
+    'repeat'  : repeat_stmt,
+    'assign'  : assign_stmt,
+    'print'   : unary_stmt(PRINT),
+    'cs'      : simple_stmt(CS),
+    'declfunc': declfunc_stmt,
+    'callfunc': callfunc_stmt,
+    'end'     : nil,
+    'if'      : if_stmt,
+    '+'       : binary_exp(ADD),
+    '-'       : binary_exp(SUB),
+    '*'       : binary_exp(MUL),
+    '/'       : binary_exp(DIV),
+    '<='      : binary_exp(LEQ),
+    '=='      : binary_exp(EQ),
+    '>='      : binary_exp(GEQ),
+    'integer' : integer_exp,
+    'id'      : id_exp,
+    'paren'   : paren_exp,
+    'uminus'  : uminus_exp
+}
+
+#########################################################################
+def compile_program(AST):
+    # compile the top-level program into a code object
+    code = Code('<program>', ())
+    emit(AST, code)
+    code.emit(HALT)
+    return code
+
+#########################################################################
+def dis(code, out=print):
+    # print a listing of the code object and of all procedures it declares
+    out("code object {} ({})".format(code.name, ', '.join(code.formals)))
+    nested = []
+    for pc in range(0, len(code.code), 2):
+        op = code.code[pc]
+        arg = code.code[pc+1]
+        line = "{:6d} {:<14}".format(pc, opnames[op])
+        if op in (LOAD_CONST, CALL, TAIL_CALL):
+            line += "{:4d} ({!r})".format(arg, code.consts[arg])
+        elif op in (LOAD_NAME, STORE_NAME):
+            line += "{:4d} ({})".format(arg, code.names[arg])
+        elif op == MAKE_FUNCTION:
+            fcode = code.consts[arg]
+            line += "{:4d} ({})".format(arg, fcode.name)
+            nested.append(fcode)
+        elif op in jump_ops:
+            line += "{:4d}".format(arg)
+        out(line.rstrip())
+    for fcode in nested:
+        out("")
+        dis(fcode, out)
+
+#########################################################################
+def execute(code):
+    # run a code object produced by compile_program
+    symtab = state.symbol_table
+    backend = state.backend
+
+    stack = []
+    # frames hold (code, pc, saved symtab config, stack base) of the callers
+    frames = []
+
+    instrs = code.code
+    consts = code.consts
+    names = code.names
+    pc = 0
+
+    while True:
+        op = instrs[pc]
+        arg = instrs[pc+1]
+        pc += 2
+
+        if op == LOAD_CONST:
+            stack.append(consts[arg])
+        elif op == LOAD_NAME:
+            stack.append(symtab.lookup_sym(names[arg])[1])
+        elif op == ADD:
+            v2 = stack.pop()
+            stack[-1] = stack[-1] + v2
+        elif op == SUB:
+            v2 = stack.pop()
+            stack[-1] = stack[-1] - v2
+        elif op == MUL:
+            v2 = stack.pop()
+            stack[-1] = stack[-1] * v2
+        elif op == DIV:
+            v2 = stack.pop()
+            stack[-1] = stack[-1] // v2
+        elif op == LEQ:
+            v2 = stack.pop()
+            stack[-1] = 1 if stack[-1] <= v2 else 0
+        elif op == EQ:
+            v2 = stack.pop()
+            stack[-1] = 1 if stack[-1] == v2 else 0
+        elif op == GEQ:
+            v2 = stack.pop()
+            stack[-1] = 1 if stack[-1] >= v2 else 0
+        elif op == NEG:
+            stack[-1] = -stack[-1]
+        elif op == FOR_ITER:
+            n = stack[-1]
+            if n > 0:
+                stack[-1] = n - 1
+            else:
+                stack.pop()
+                pc = arg
+        elif op == JUMP:
+            pc = arg
+        elif op == JUMP_IF_ZERO:
+            if stack.pop() == 0:
+                pc = arg
+        elif op == FD:
+            backend.forward(stack.pop())
+        elif op == BK:
+            backend.backward(stack.pop())
+        elif op == RT:
+            backend.right(stack.pop())
+        elif op == LT:
+            backend.left(stack.pop())
+        elif op == CALL or op == TAIL_CALL:
+            (name, argc) = consts[arg]
+            (form, val) = symtab.lookup_sym(name)
+
+            if form != 'function':
+                raise ValueError("{} is not a function".format(name))
+
+            (FUNVAL, fcode, context) = val
+
+            if len(fcode.formals) != argc:
+                raise ValueError("function {} expects {} arguments".format(name, len(fcode.formals)))
+
+            # the actual arguments are on top of the stack
+            base = len(stack) - argc
+            args = stack[base:]
+            del stack[base:]
+
+            if op == CALL:
+                frames.append((code, pc, symtab.get_config(), base))
+            else:
+                # drop repeat counters of the current call, the new one
+                # returns to its caller
+                del stack[frames[-1][3]:]
+            symtab.set_config(context)
+            symtab.push_scope()
+            for (sym, value) in zip(fcode.formals, args):
+                symtab.declare_scalar(sym, value)
+
+            code = fcode
+            instrs = code.code
+            consts = code.consts
+            names = code.names
+            pc = 0
+        elif op == RETURN:
+            if not frames:
+                # 'stop' outside of a procedure ends the program
+                return
+
+            (code, pc, config, base) = frames.pop()
+            # drop repeat counters left behind by a 'stop' inside a loop
+            del stack[base:]
+            symtab.set_config(config)
+
+            instrs = code.code
+            consts = code.consts
+            names = code.names
+        elif op == STORE_NAME:
+            value = stack.pop()
+            try:
+                symtab.declare_scalar(names[arg], value)
+            except ValueError:
+                symtab.update_sym(names[arg], ('scalar', value))
+        elif op == MAKE_FUNCTION:
+            fcode = consts[arg]
+            funval = ('funval', fcode, symtab.get_config())
+            symtab.declare_fun(fcode.name, funval)
+        elif op == CIRCLE:
+            backend.circle(stack.pop())
+        elif op == SETX:
+            backend.setx(stack.pop())
+        elif op == SETY:
+            backend.sety(stack.pop())
+        elif op == SETANGLE:
+            backend.setheading(stack.pop())
+        elif op == PENCOLOR:
+            b = int(stack.pop())
+            g = int(stack.pop())
+            r = int(stack.pop())
+            backend.setcolor(r, g, b)
+        elif op == PD:
+            backend.pendown()
+        elif op == PU:
+            backend.penup()
+        elif op == CS:
+            backend.clearscreen()
+        elif op == PRINT:
+            print(stack.pop())
+        elif op == HALT:
+            return
+        else:
+            raise ValueError("execute: unknown opcode {}".format(op))
+
+#########################################################################
+def run(AST):
+    execute(compile_program(AST))
+
+#########################################################################
+if __name__ == "__main__":
+    # print the disassembly of a LOGO program
+    from argparse import ArgumentParser
+    from logo_parse import parse
+
+    aparser = ArgumentParser()
+    aparser.add_argument('input')
+    args = vars(aparser.parse_args())
+
+    f = open(args['input'], 'r')
+    input_stream = f.read()
+    f.close()
+
+    state.initialize()
+    dis(compile_program(parse(input_stream)))
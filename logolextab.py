@@ -0,0 +1,10 @@
+# logolextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('BK', 'CIRCLE', 'CS', 'DIVIDE', 'END', 'EQ', 'FD', 'GEQ', 'ID', 'IF', 'INTEGER', 'LEQ', 'LT', 'MINUS', 'PD', 'PLUS', 'PRINT', 'PU', 'REPEAT', 'RT', 'SETANGLE', 'SETCOLOR', 'SETX', 'SETY', 'STOP', 'TIMES', 'TO'))
+_lexreflags   = 64
+_lexliterals  = '[]=():,'
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_ID>[a-zA-Z_][a-zA-Z_0-9]*)|(?P<t_INTEGER>[0-9]+)|(?P<t_NEWLINE>\\n)|(?P<t_COMMENT>//.*)|(?P<t_PLUS>\\+)|(?P<t_TIMES>\\*)|(?P<t_GEQ>>=)|(?P<t_LEQ><=)|(?P<t_EQ>==)|(?P<t_MINUS>-)|(?P<t_DIVIDE>/)', [None, ('t_ID', 'ID'), ('t_INTEGER', 'INTEGER'), ('t_NEWLINE', 'NEWLINE'), ('t_COMMENT', 'COMMENT'), (None, 'PLUS'), (None, 'TIMES'), (None, 'GEQ'), (None, 'LEQ'), (None, 'EQ'), (None, 'MINUS'), (None, 'DIVIDE')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
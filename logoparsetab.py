@@ -0,0 +1,72 @@
+
+# logoparsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = "leftEQLEQGEQleftPLUSMINUSleftTIMESDIVIDErightUMINUSBK CIRCLE CS DIVIDE END EQ FD GEQ ID IF INTEGER LEQ LT MINUS PD PLUS PRINT PU REPEAT RT SETANGLE SETCOLOR SETX SETY STOP TIMES TO\n    program : stmt_list\n    \n    stmt_list : stmt_list stmt\n              | empty\n    \n    stmt : FD exp\n         | BK exp\n         | RT exp\n         | LT exp\n         | CIRCLE exp\n         | SETX exp\n         | SETY exp\n         | SETANGLE exp\n         | PD\n         | PU\n         | STOP\n         | SETCOLOR exp exp exp\n         | REPEAT exp '[' stmt_list ']'\n         | ID '=' exp\n         | PRINT exp\n         | CS\n         | TO ID opt_formal_args stmt_list END\n         | ID ':' opt_actual_args\n         | IF exp '[' stmt_list ']'\n    \n    exp : exp PLUS exp\n        | exp MINUS exp\n        | exp TIMES exp\n        | exp DIVIDE exp\n        | exp LEQ exp\n        | exp EQ exp\n        | exp GEQ exp\n    \n    exp : INTEGER\n    \n    exp : ID\n    \n    exp : '(' exp ')'\n    \n    opt_formal_args : formal_args\n                    | empty\n    \n    formal_args : formal_args ',' ID\n                | ID\n    \n    opt_actual_args : actual_args\n                    | empty\n    \n    actual_args : actual_args ',' exp\n                | exp\n    \n    exp : MINUS exp %prec UMINUS\n    \n    empty : \n    "
+    
+_lr_action_items = {'FD':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,5,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,5,5,5,-16,-39,-20,-35,-22,]),'BK':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,6,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,6,6,6,-16,-39,-20,-35,-22,]),'RT':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,7,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,7,7,7,-16,-39,-20,-35,-22,]),'LT':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,8,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,8,8,8,-16,-39,-20,-35,-22,]),'CIRCLE':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,9,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,9,9,9,-16,-39,-20,-35,-22,]),'SETX':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,10,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,10,10,10,-16,-39,-20,-35,-22,]),'SETY':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,11,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,11,11,11,-16,-39,-20,-35,-22,]),'SETANGLE':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,12,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,12,12,12,-16,-39,-20,-35,-22,]),'PD':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,13,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,13,13,13,-16,-39,-20,-35,-22,]),'PU':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,14,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,14,14,14,-16,-39,-20,-35,-22,]),'STOP':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,15,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,15,15,15,-16,-39,-20,-35,-22,]),'SETCOLOR':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,16,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,16,16,16,-16,-39,-20,-35,-22,]),'REPEAT':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,17,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,17,17,17,-16,-39,-20,-35,-22,]),'ID':([0,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,19,20,21,22,23,24,25,26,27,28,29,30,31,32,33,34,35,37,38,39,40,42,43,44,45,46,47,48,49,51,52,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,75,76,77,78,79,80,81,82,83,],[-42,18,-3,-2,26,26,26,26,26,26,26,26,-12,-13,-14,26,26,26,-19,40,26,-4,26,-30,-31,26,-5,-6,-7,-8,-9,-10,-11,26,26,26,-18,59,26,26,26,26,26,26,26,-41,26,26,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-24,18,26,18,82,18,-16,-39,-20,-35,-22,]),'PRINT':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,19,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,19,19,19,-16,-39,-20,-35,-22,]),'CS':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,20,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,20,20,20,-16,-39,-20,-35,-22,]),'TO':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,21,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,21,21,21,-16,-39,-20,-35,-22,]),'IF':([0,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,69,70,71,72,73,74,76,78,79,80,81,82,83,],[-42,22,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-42,-17,-21,-37,-38,-40,-36,-42,-33,-34,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,22,22,22,-16,-39,-20,-35,-22,]),'$end':([0,1,2,3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,49,54,55,56,57,58,64,65,66,67,68,69,70,71,72,73,79,80,81,83,],[-42,0,-1,-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-41,-17,-21,-37,-38,-40,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,-16,-39,-20,-22,]),']':([3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,49,53,54,55,56,57,58,63,64,65,66,67,68,69,70,71,72,73,74,78,79,80,81,83,],[-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-41,-42,-17,-21,-37,-38,-40,-42,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,79,83,-16,-39,-20,-22,]),'END':([3,4,13,14,15,20,23,25,26,28,29,30,31,32,33,34,38,39,40,49,54,55,56,57,58,59,60,61,62,64,65,66,67,68,69,70,71,72,73,76,79,80,81,82,83,],[-3,-2,-12,-13,-14,-19,-4,-30,-31,-5,-6,-7,-8,-9,-10,-11,-42,-18,-42,-41,-17,-21,-37,-38,-40,-36,-42,-33,-34,-23,-24,-25,-26,-27,-28,-29,-32,-15,-41,81,-16,-39,-20,-35,-22,]),'INTEGER':([5,6,7,8,9,10,11,12,16,17,19,22,24,25,26,27,35,37,38,42,43,44,45,46,47,48,49,51,52,64,65,66,67,68,69,70,71,73,75,],[25,25,25,25,25,25,25,25,25,25,25,25,25,-30,-31,25,25,25,25,25,25,25,25,25,25,25,-41,25,25,-23,-24,-25,-26,-27,-28,-29,-32,-24,25,]),'(':([5,6,7,8,9,10,11,12,16,17,19,22,24,25,26,27,35,37,38,42,43,44,45,46,47,48,49,51,52,64,65,66,67,68,69,70,71,73,75,],[27,27,27,27,27,27,27,27,27,27,27,27,27,-30,-31,27,27,27,27,27,27,27,27,27,27,27,-41,27,27,-23,-24,-25,-26,-27,-28,-29,-32,-24,27,]),'MINUS':([5,6,7,8,9,10,11,12,16,17,19,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,39,41,42,43,44,45,46,47,48,49,50,51,52,54,58,64,65,66,67,68,69,70,71,72,73,75,80,],[24,24,24,24,24,24,24,24,24,24,24,24,43,24,-30,-31,24,43,43,43,43,43,43,43,52,43,24,24,43,43,24,24,24,24,24,24,24,-41,43,52,24,43,43,-23,-24,-25,-26,43,43,43,-32,43,-24,24,43,]),'=':([18,],[37,]),':':([18,],[38,]),'PLUS':([23,25,26,28,29,30,31,32,33,34,35,36,39,41,49,50,51,54,58,64,65,66,67,68,69,70,71,72,73,80,],[42,-30,-31,42,42,42,42,42,42,42,42,42,42,42,-41,42,42,42,42,-23,-24,-25,-26,42,42,42,-32,42,-24,42,]),'TIMES':([23,25,26,28,29,30,31,32,33,34,35,36,39,41,49,50,51,54,58,64,65,66,67,68,69,70,71,72,73,80,],[44,-30,-31,44,44,44,44,44,44,44,44,44,44,44,-41,44,44,44,44,44,44,-25,-26,44,44,44,-32,44,44,44,]),'DIVIDE':([23,25,26,28,29,30,31,32,33,34,35,36,39,41,49,50,51,54,58,64,65,66,67,68,69,70,71,72,73,80,],[45,-30,-31,45,45,45,45,45,45,45,45,45,45,45,-41,45,45,45,45,45,45,-25,-26,45,45,45,-32,45,45,45,]),'LEQ':([23,25,26,28,29,30,31,32,33,34,35,36,39,41,49,50,51,54,58,64,65,66,67,68,69,70,71,72,73,80,],[46,-30,-31,46,46,46,46,46,46,46,46,46,46,46,-41,46,46,46,46,-23,-24,-25,-26,-27,-28,-29,-32,46,-24,46,]),'EQ':([23,25,26,28,29,30,31,32,33,34,35,36,39,41,49,50,51,54,58,64,65,66,67,68,69,70,71,72,73,80,],[47,-30,-31,47,47,47,47,47,47,47,47,47,47,47,-41,47,47,47,47,-23,-24,-25,-26,-27,-28,-29,-32,47,-24,47,]),'GEQ':([23,25,26,28,29,30,31,32,33,34,35,36,39,41,49,50,51,54,58,64,65,66,67,68,69,70,71,72,73,80,],[48,-30,-31,48,48,48,48,48,48,48,48,48,48,48,-41,48,48,48,48,-23,-24,-25,-26,-27,-28,-29,-32,48,-24,48,]),'[':([25,26,36,41,49,64,65,66,67,68,69,70,71,],[-30,-31,53,63,-41,-23,-24,-25,-26,-27,-28,-29,-32,]),')':([25,26,49,50,64,65,66,67,68,69,70,71,],[-30,-31,-41,71,-23,-24,-25,-26,-27,-28,-29,-32,]),',':([25,26,49,56,58,59,61,64,65,66,67,68,69,70,71,80,82,],[-30,-31,-41,75,-40,-36,77,-23,-24,-25,-26,-27,-28,-29,-32,-39,-35,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'stmt_list':([0,53,60,63,],[2,74,76,78,]),'empty':([0,38,40,53,60,63,],[3,57,62,3,3,3,]),'stmt':([2,74,76,78,],[4,4,4,4,]),'exp':([5,6,7,8,9,10,11,12,16,17,19,22,24,27,35,37,38,42,43,44,45,46,47,48,51,52,75,],[23,28,29,30,31,32,33,34,35,36,39,41,49,50,51,54,58,64,65,66,67,68,69,70,72,73,80,]),'opt_actual_args':([38,],[55,]),'actual_args':([38,],[56,]),'opt_formal_args':([40,],[60,]),'formal_args':([40,],[61,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> stmt_list','program',1,'p_program','logo_interp_gram.py',14),
+  ('stmt_list -> stmt_list stmt','stmt_list',2,'p_stmt_list','logo_interp_gram.py',20),
+  ('stmt_list -> empty','stmt_list',1,'p_stmt_list','logo_interp_gram.py',21),
+  ('stmt -> FD exp','stmt',2,'p_stmt','logo_interp_gram.py',32),
+  ('stmt -> BK exp','stmt',2,'p_stmt','logo_interp_gram.py',33),
+  ('stmt -> RT exp','stmt',2,'p_stmt','logo_interp_gram.py',34),
+  ('stmt -> LT exp','stmt',2,'p_stmt','logo_interp_gram.py',35),
+  ('stmt -> CIRCLE exp','stmt',2,'p_stmt','logo_interp_gram.py',36),
+  ('stmt -> SETX exp','stmt',2,'p_stmt','logo_interp_gram.py',37),
+  ('stmt -> SETY exp','stmt',2,'p_stmt','logo_interp_gram.py',38),
+  ('stmt -> SETANGLE exp','stmt',2,'p_stmt','logo_interp_gram.py',39),
+  ('stmt -> PD','stmt',1,'p_stmt','logo_interp_gram.py',40),
+  ('stmt -> PU','stmt',1,'p_stmt','logo_interp_gram.py',41),
+  ('stmt -> STOP','stmt',1,'p_stmt','logo_interp_gram.py',42),
+  ('stmt -> SETCOLOR exp exp exp','stmt',4,'p_stmt','logo_interp_gram.py',43),
+  ('stmt -> REPEAT exp [ stmt_list ]','stmt',5,'p_stmt','logo_interp_gram.py',44),
+  ('stmt -> ID = exp','stmt',3,'p_stmt','logo_interp_gram.py',45),
+  ('stmt -> PRINT exp','stmt',2,'p_stmt','logo_interp_gram.py',46),
+  ('stmt -> CS','stmt',1,'p_stmt','logo_interp_gram.py',47),
+  ('stmt -> TO ID opt_formal_args stmt_list END','stmt',5,'p_stmt','logo_interp_gram.py',48),
+  ('stmt -> ID : opt_actual_args','stmt',3,'p_stmt','logo_interp_gram.py',49),
+  ('stmt -> IF exp [ stmt_list ]','stmt',5,'p_stmt','logo_interp_gram.py',50),
+  ('exp -> exp PLUS exp','exp',3,'p_exp','logo_interp_gram.py',95),
+  ('exp -> exp MINUS exp','exp',3,'p_exp','logo_interp_gram.py',96),
+  ('exp -> exp TIMES exp','exp',3,'p_exp','logo_interp_gram.py',97),
+  ('exp -> exp DIVIDE exp','exp',3,'p_exp','logo_interp_gram.py',98),
+  ('exp -> exp LEQ exp','exp',3,'p_exp','logo_interp_gram.py',99),
+  ('exp -> exp EQ exp','exp',3,'p_exp','logo_interp_gram.py',100),
+  ('exp -> exp GEQ exp','exp',3,'p_exp','logo_interp_gram.py',101),
+  ('exp -> INTEGER','exp',1,'p_integer_exp','logo_interp_gram.py',107),
+  ('exp -> ID','exp',1,'p_id_exp','logo_interp_gram.py',113),
+  ('exp -> ( exp )','exp',3,'p_paren_exp','logo_interp_gram.py',119),
+  ('opt_formal_args -> formal_args','opt_formal_args',1,'p_opt_formal_args','logo_interp_gram.py',125),
+  ('opt_formal_args -> empty','opt_formal_args',1,'p_opt_formal_args','logo_interp_gram.py',126),
+  ('formal_args -> formal_args , ID','formal_args',3,'p_formal_args','logo_interp_gram.py',135),
+  ('formal_args -> ID','formal_args',1,'p_formal_args','logo_interp_gram.py',136),
+  ('opt_actual_args -> actual_args','opt_actual_args',1,'p_opt_actual_args','logo_interp_gram.py',147),
+  ('opt_actual_args -> empty','opt_actual_args',1,'p_opt_actual_args','logo_interp_gram.py',148),
+  ('actual_args -> actual_args , exp','actual_args',3,'p_actual_args','logo_interp_gram.py',157),
+  ('actual_args -> exp','actual_args',1,'p_actual_args','logo_interp_gram.py',158),
+  ('exp -> MINUS exp','exp',2,'p_uminus_exp','logo_interp_gram.py',169),
+  ('empty -> <empty>','empty',0,'p_empty','logo_interp_gram.py',175),
+]